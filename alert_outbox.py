@@ -0,0 +1,333 @@
+# alert_outbox.py
+# Durable alert outbox (SQLite, WAL mode).
+# - Semua alert ditulis ke outbox dulu, baru dikirim (tidak hilang saat uplink putus)
+# - Idempotency key: alert yang sama tidak dikirim dua kali
+# - Priority: tsunami > gempa > ombak tinggi (angka kecil = dikirim duluan)
+# - OutboxSender: thread background yang drain outbox per batch, dengan backoff
+# - Baris yang di-claim membawa lease (claimed_at): hanya lease kedaluwarsa (proses pengirim mati)
+#   yang diambil ulang, jadi proses lain yang membuka outbox tidak memicu kirim ganda
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+OUTBOX_PATH = os.getenv("ALERT_OUTBOX_PATH", "alert_outbox.db")
+
+PRIORITY_TSUNAMI = 0
+PRIORITY_EARTHQUAKE = 10
+PRIORITY_WAVE = 20
+
+CHANNELS = ("whatsapp", "sms")
+
+# Retry backoff (detik): base * 2^attempts, dibatasi max
+RETRY_BASE_SEC = 5
+RETRY_MAX_SEC = 300
+MAX_ATTEMPTS = 100
+# Baris 'sending' lebih lama dari ini dianggap milik pengirim yang mati dan boleh di-claim ulang
+SENDING_LEASE_SEC = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT    NOT NULL UNIQUE,
+    channel         TEXT    NOT NULL,
+    recipients      TEXT,
+    body            TEXT    NOT NULL,
+    media_url       TEXT,
+    priority        INTEGER NOT NULL,
+    status          TEXT    NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    created_at      REAL    NOT NULL,
+    next_attempt_at REAL    NOT NULL,
+    sent_at         REAL,
+    sids            TEXT    NOT NULL DEFAULT '[]',
+    last_error      TEXT,
+    claimed_at      REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, priority, next_attempt_at);
+"""
+
+
+def _resolve_sender(channel: str):
+    """Ambil fungsi bulk send per channel (import lazy, modul notify butuh kredensial)."""
+    if channel == "whatsapp":
+        from notify_whatsapp import send_whatsapp_bulk
+        return send_whatsapp_bulk
+    if channel == "sms":
+        from notify_sms import send_sms_bulk
+        return send_sms_bulk
+    raise ValueError(f"Unknown outbox channel: {channel}")
+
+
+def _join_recipients(to: Optional[Union[str, Iterable[str]]]) -> Optional[str]:
+    if to is None:
+        return None
+    if isinstance(to, str):
+        return to.strip() or None
+    return ",".join(t.strip() for t in to if t.strip()) or None
+
+
+class AlertOutbox:
+    """
+    Outbox persisten untuk alert WhatsApp/SMS.
+
+    Args:
+        path: file SQLite outbox
+        sender_resolver: fungsi channel -> bulk send (default: notify_whatsapp / notify_sms)
+        retry_base_sec / retry_max_sec: backoff kirim ulang (base * 2^attempts, max)
+        lease_sec: baris 'sending' yang di-claim lebih lama dari ini di-claim ulang (pengirim mati)
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, sender_resolver=_resolve_sender,
+                 retry_base_sec: float = RETRY_BASE_SEC, retry_max_sec: float = RETRY_MAX_SEC,
+                 lease_sec: float = SENDING_LEASE_SEC):
+        self.path = path
+        self._resolve = sender_resolver
+        self.retry_base_sec = retry_base_sec
+        self.retry_max_sec = retry_max_sec
+        self.lease_sec = lease_sec
+        self._local = threading.local()
+        self._listeners = []
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        # Outbox lama tanpa kolom lease: claimed_at NULL = lease kedaluwarsa
+        if "claimed_at" not in {r["name"] for r in conn.execute("PRAGMA table_info(outbox)")}:
+            conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_listener(self, callback):
+        """callback() dipanggil setiap ada alert baru (dipakai OutboxSender untuk bangun)."""
+        self._listeners.append(callback)
+
+    # ===== Writer side =====
+    def enqueue(self, channel: str, message: str, to: Optional[Union[str, Iterable[str]]] = None,
+                priority: int = PRIORITY_WAVE, idempotency_key: Optional[str] = None,
+                media_url: Optional[str] = None) -> int:
+        """
+        Tulis alert ke outbox. Return id baris (id lama jika idempotency_key sudah ada).
+
+        Args:
+            channel: "whatsapp" atau "sms"
+            message: isi pesan
+            to: tujuan (None = default dari env modul notify)
+            priority: PRIORITY_TSUNAMI / PRIORITY_EARTHQUAKE / PRIORITY_WAVE
+            idempotency_key: kunci unik alert; default hash(channel, tujuan, isi)
+        """
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown outbox channel: {channel}")
+        recipients = _join_recipients(to)
+        if not idempotency_key:
+            raw = f"{channel}|{recipients or ''}|{message}|{media_url or ''}"
+            idempotency_key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR IGNORE INTO outbox (idempotency_key, channel, recipients, body, media_url, "
+            "priority, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (idempotency_key, channel, recipients, message, media_url, priority, now, now),
+        )
+        row = conn.execute("SELECT id FROM outbox WHERE idempotency_key=?", (idempotency_key,)).fetchone()
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception:
+                pass
+        return int(row["id"])
+
+    # ===== Sender side =====
+    def _claim(self, limit: int, alert_id: Optional[int] = None) -> List[sqlite3.Row]:
+        now = time.time()
+        # pending yang jatuh tempo, atau 'sending' yang lease-nya habis (pengirimnya crash / restart)
+        claimable = ("(status='pending' OR (status='sending' AND "
+                     "(claimed_at IS NULL OR claimed_at<=?)))")
+        expired = now - self.lease_sec
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if alert_id is not None:
+                rows = conn.execute(
+                    f"SELECT * FROM outbox WHERE id=? AND {claimable}", (alert_id, expired)).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT * FROM outbox WHERE {claimable} AND next_attempt_at<=? "
+                    "ORDER BY priority, created_at LIMIT ?", (expired, now, limit)).fetchall()
+            if rows:
+                conn.executemany("UPDATE outbox SET status='sending', claimed_at=? WHERE id=?",
+                                 [(now, r["id"]) for r in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _deliver(self, row: sqlite3.Row) -> Dict:
+        """Kirim satu baris outbox ke semua tujuan; tidak pernah raise."""
+        try:
+            send_bulk = self._resolve(row["channel"])
+            kwargs = {"media_url": row["media_url"]} if row["media_url"] else {}
+            results = send_bulk(row["body"], row["recipients"], **kwargs)
+        except Exception as e:
+            return {"id": row["id"], "sids": [], "failed": None, "error": str(e)}
+        sids = [r["sid"] for r in results if r["error"] is None]
+        failed = [r["to"] for r in results if r["error"] is not None]
+        error = "; ".join(f"{r['to']}: {r['error']}" for r in results if r["error"] is not None)
+        return {"id": row["id"], "sids": sids, "failed": failed, "error": error or None}
+
+    def _record(self, rows: List[sqlite3.Row], results: List[Dict]):
+        """Simpan hasil kirim satu batch dalam satu transaksi."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row, res in zip(rows, results):
+                sids = json.loads(row["sids"]) + res["sids"]
+                if res["error"] is None:
+                    conn.execute("UPDATE outbox SET status='sent', sent_at=?, sids=?, last_error=NULL, "
+                                 "attempts=attempts+1 WHERE id=?", (now, json.dumps(sids), row["id"]))
+                    continue
+                attempts = row["attempts"] + 1
+                # Kirim ulang hanya ke tujuan yang gagal
+                recipients = ",".join(res["failed"]) if res["failed"] else row["recipients"]
+                status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+                delay = min(self.retry_base_sec * (2 ** min(attempts - 1, 16)), self.retry_max_sec)
+                conn.execute("UPDATE outbox SET status=?, attempts=?, next_attempt_at=?, recipients=?, "
+                             "sids=?, last_error=? WHERE id=?",
+                             (status, attempts, now + delay, recipients, json.dumps(sids), res["error"], row["id"]))
+            if any(res["sids"] for res in results):
+                # Uplink kembali: backlog yang sedang backoff langsung di-flush
+                conn.execute("UPDATE outbox SET next_attempt_at=? WHERE status='pending' AND next_attempt_at>?",
+                             (now, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def send_now(self, alert_id: int) -> Dict:
+        """
+        Kirim satu alert secara sinkron (dipakai saat pemanggil butuh SID langsung).
+
+        Returns:
+            Dict: {"id", "status", "sids", "error"}; status 'pending' berarti
+            gagal dan tetap di outbox untuk dikirim ulang oleh OutboxSender.
+        """
+        rows = self._claim(1, alert_id=alert_id)
+        if rows:
+            self._record(rows, [self._deliver(rows[0])])
+        return self.get(alert_id)
+
+    def drain(self, batch_size: int = 20, max_workers: int = 4, max_batches: Optional[int] = None) -> Dict:
+        """
+        Kirim semua alert yang jatuh tempo, per batch, urut prioritas.
+        Berhenti jika satu batch gagal total (uplink masih mati).
+
+        Returns:
+            Dict: jumlah sent / failed / batches
+        """
+        stats = {"sent": 0, "failed": 0, "batches": 0}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="outbox") as pool:
+            while max_batches is None or stats["batches"] < max_batches:
+                rows = self._claim(batch_size)
+                if not rows:
+                    break
+                results = list(pool.map(self._deliver, rows))
+                self._record(rows, results)
+                stats["batches"] += 1
+                stats["sent"] += sum(1 for r in results if r["error"] is None)
+                stats["failed"] += sum(1 for r in results if r["error"] is not None)
+                if not any(r["sids"] for r in results):
+                    break
+        return stats
+
+    # ===== Queries =====
+    def get(self, alert_id: int) -> Dict:
+        row = self._conn().execute(
+            "SELECT id, status, sids, last_error, attempts FROM outbox WHERE id=?", (alert_id,)).fetchone()
+        if row is None:
+            return {"id": alert_id, "status": "missing", "sids": [], "error": None, "attempts": 0}
+        return {"id": row["id"], "status": row["status"], "sids": json.loads(row["sids"]),
+                "error": row["last_error"], "attempts": row["attempts"]}
+
+    def pending_count(self) -> int:
+        row = self._conn().execute("SELECT COUNT(*) FROM outbox WHERE status IN ('pending','sending')").fetchone()
+        return int(row[0])
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {r[0]: int(r[1]) for r in rows}
+
+
+class OutboxSender(threading.Thread):
+    """
+    Thread background yang drain outbox.
+    Bangun segera saat ada enqueue baru, selain itu cek tiap poll_interval detik.
+    """
+
+    def __init__(self, outbox: AlertOutbox, poll_interval: float = 5.0, batch_size: int = 20):
+        super().__init__(name="alert-outbox-sender", daemon=True)
+        self.outbox = outbox
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        outbox.add_listener(self._wake.set)
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.outbox.drain(batch_size=self.batch_size)
+            except Exception as e:
+                print(f"❌ Outbox sender error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        self._wake.set()
+        self.join(timeout)
+
+
+_outbox = None
+_sender = None
+_lock = threading.Lock()
+
+
+def get_outbox() -> AlertOutbox:
+    """Singleton outbox per proses."""
+    global _outbox
+    with _lock:
+        if _outbox is None:
+            _outbox = AlertOutbox(OUTBOX_PATH)
+        return _outbox
+
+
+def start_sender(poll_interval: float = 5.0) -> OutboxSender:
+    """Start (sekali saja) thread sender untuk outbox singleton."""
+    global _sender
+    outbox = get_outbox()
+    with _lock:
+        if _sender is None or not _sender.is_alive():
+            _sender = OutboxSender(outbox, poll_interval=poll_interval)
+            _sender.start()
+        return _sender
+
+
+if __name__ == "__main__":
+    # Flush manual: python alert_outbox.py
+    box = get_outbox()
+    print(f"📦 Outbox {OUTBOX_PATH}: {box.stats()}")
+    print(f"📤 Drain: {box.drain()}")
+    print(f"📦 Outbox {OUTBOX_PATH}: {box.stats()}")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start (import time) untuk dashboard dan worker headless di Pi.
+
+Setiap pengukuran dijalankan di proses Python baru (cold import), diulang
+beberapa kali, lalu diambil median-nya.
+
+Contoh:
+    python bench_startup.py             # modul notifikasi / worker headless
+    python bench_startup.py --dashboard # + first run dashboard Streamlit (AppTest)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import set yang dipakai worker headless (tanpa Streamlit)
+IMPORT_TARGETS = {
+    "notify_whatsapp": "import notify_whatsapp",
+    "notify_sms": "import notify_sms",
+    "notify_earthquake": "import notify_earthquake",
+    "headless_worker": "import notify_whatsapp, notify_sms, notify_earthquake, alert_outbox",
+}
+
+_TIMER = """
+import time
+_t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - _t0)
+"""
+
+_DASHBOARD_RUN = """
+import time
+_t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=120)
+at.run()
+print(time.perf_counter() - _t0)
+"""
+
+
+def _run(code: str, cwd: str, env: Dict[str, str]) -> float:
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                         capture_output=True, text=True, timeout=300)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "benchmark failed")
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def benchmark_startup(repeat: int = 5, dashboard: bool = False) -> Dict[str, Dict]:
+    """
+    Ukur waktu cold import per target.
+
+    Returns:
+        Dict: {target: {"median_ms", "min_ms", "runs"} atau {"error"}}
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    # Kredensial dummy: versi lama modul notify raise RuntimeError tanpa kredensial
+    env.setdefault("TWILIO_ACCOUNT_SID", "ACbenchmark")
+    env.setdefault("TWILIO_AUTH_TOKEN", "benchmark")
+
+    targets = {name: _TIMER.format(stmt=stmt) for name, stmt in IMPORT_TARGETS.items()}
+    if dashboard:
+        script = os.path.join(REPO_DIR, "ombak_dashboard_streamlit.py")
+        targets["dashboard_first_run"] = _DASHBOARD_RUN.format(script=script)
+
+    results = {}
+    # Jalankan di folder sementara supaya config / CSV / outbox repo tidak tersentuh
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        for name, code in targets.items():
+            runs: List[float] = []
+            try:
+                _run(code, workdir, env)  # warm-up: compile .pyc / disk cache
+                for _ in range(repeat):
+                    runs.append(_run(code, workdir, env))
+            except Exception as e:
+                results[name] = {"error": str(e)}
+                continue
+            results[name] = {
+                "median_ms": round(statistics.median(runs) * 1000, 1),
+                "min_ms": round(min(runs) * 1000, 1),
+                "runs": len(runs),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold start import")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dashboard", action="store_true", help="ukur juga first run dashboard (butuh streamlit)")
+    args = parser.parse_args()
+
+    print("🔍 Benchmark cold start...")
+    for name, res in benchmark_startup(args.repeat, args.dashboard).items():
+        print(f"   {name}: {res}")
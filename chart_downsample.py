@@ -0,0 +1,119 @@
+# chart_downsample.py
+# Downsampling deret waktu untuk grafik TAB_LOG.
+# - LTTB (Largest-Triangle-Three-Buckets): bentuk grafik (puncak/lembah) tetap terjaga
+#   walau jumlah titik dipotong ke budget sesuai lebar grafik
+# - Titik wajib (EXTREME / alert) selalu ikut, tidak pernah dibuang
+# - Figure memakai trace WebGL (Scattergl) supaya browser tetap ringan
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+# ~1 titik per pixel untuk grafik selebar layar
+DEFAULT_POINT_BUDGET = 1500
+# Di bawah jumlah ini marker tetap digambar (seperti px.line(markers=True) sebelumnya)
+MARKER_MAX_POINTS = 500
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Index titik terpilih LTTB (x harus urut naik, tanpa NaN).
+
+    Titik pertama & terakhir selalu dipilih; sisanya satu titik per bucket,
+    yaitu titik yang membentuk segitiga terbesar dengan titik terpilih
+    sebelumnya dan rata-rata bucket berikutnya.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (n_out - 2)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_frame(df, x_col: str, y_col: str, n_out: int = DEFAULT_POINT_BUDGET,
+                     keep_mask: Optional[Sequence[bool]] = None):
+    """
+    Downsample DataFrame (urut x_col) dengan LTTB pada y_col.
+
+    Args:
+        keep_mask: boolean per row; row True selalu ikut (mis. EXTREME / alert)
+
+    Returns:
+        DataFrame subset (urut waktu); row dengan y NaN dibuang.
+    """
+    valid = df[x_col].notna() & df[y_col].notna()
+    if keep_mask is not None:
+        keep_mask = np.asarray(keep_mask, dtype=bool)[valid.to_numpy()]
+    df = df.loc[valid]
+    order = np.argsort(df[x_col].to_numpy(), kind="stable")
+    df = df.iloc[order]
+    if len(df) <= n_out:
+        return df
+    x = df[x_col].to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    idx = lttb_indices(x, df[y_col].to_numpy(), n_out)
+    if keep_mask is not None:
+        idx = np.union1d(idx, np.flatnonzero(keep_mask[order]))
+    return df.iloc[idx]
+
+
+def series_figure(x, y, title: str, y_label: str, name: Optional[str] = None,
+                  lines: Sequence[dict] = (), highlights: Sequence[dict] = (),
+                  threshold: Optional[float] = None):
+    """
+    Figure WebGL: satu deret utama + deret garis tambahan + deret sorotan (hanya marker).
+
+    Args:
+        lines: list dict {"x", "y", "name"} (mis. min/max rollup di sekitar mean)
+        highlights: list dict {"x", "y", "name", "color"} (mis. titik EXTREME / alert)
+        threshold: garis horizontal putus-putus (mis. batas alert extreme count)
+    """
+    import plotly.graph_objects as go
+    mode = "lines+markers" if len(x) <= MARKER_MAX_POINTS else "lines"
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode=mode, name=name or y_label,
+                                 marker=dict(size=5), line=dict(width=1.5)))
+    for extra in lines:
+        fig.add_trace(go.Scattergl(x=extra["x"], y=extra["y"], mode="lines", name=extra["name"],
+                                   line=dict(width=1, dash="dot")))
+    for h in highlights:
+        if len(h["x"]):
+            fig.add_trace(go.Scattergl(x=h["x"], y=h["y"], mode="markers", name=h["name"],
+                                       marker=dict(size=7, color=h.get("color", "red"))))
+    if threshold is not None:
+        fig.add_hline(y=threshold, line_dash="dash", line_color="red",
+                      annotation_text=f"Alert Threshold: {threshold}")
+    fig.update_layout(title=title, xaxis_title="Waktu", yaxis_title=y_label,
+                      dragmode="select", legend=dict(orientation="h", y=-0.2))
+    return fig
+
+
+def benchmark_lttb(rows: int = 500000, n_out: int = DEFAULT_POINT_BUDGET) -> dict:
+    """Waktu LTTB untuk deret 2 detik berbulan-bulan."""
+    import time
+    x = np.arange(rows, dtype=np.float64) * 2.0
+    y = 200 + 50 * np.sin(x / 3600) + np.random.default_rng(0).normal(0, 10, rows)
+    t0 = time.perf_counter()
+    idx = lttb_indices(x, y, n_out)
+    return {"rows": rows, "points": len(idx), "lttb_ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark LTTB downsampling...")
+    print(benchmark_lttb())
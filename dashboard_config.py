@@ -1,9 +1,13 @@
 # dashboard_config.py - Persistent Configuration untuk Dashboard
 # Menyimpan dan memuat konfigurasi dashboard secara otomatis
+# - ConfigStore: config di-cache di memori, file dibaca ulang hanya jika mtime / ukuran berubah
+# - Simpan hanya jika isi berbeda, atomik (tmp + os.replace)
+# - Listener dipanggil saat ada key yang berubah (dari proses ini atau file diubah proses lain)
 
 import json
 import os
-from typing import Dict, Any
+import threading
+from typing import Callable, Dict, Any, List, Optional
 
 CONFIG_FILE = "dashboard_config.json"
 
@@ -41,32 +45,220 @@ DEFAULT_CONFIG = {
     "tsunami_threshold": 6.0,
     "earthquake_check_interval": 300,
     "enable_earthquake_wa": True,
-    "enable_earthquake_sms": True
+    "enable_earthquake_sms": True,
+    # Background log writer (log_writer.py)
+    "log_flush_interval_sec": 5.0,
+    "log_flush_every_rows": 50,
+    "log_fsync_interval_sec": 60.0,
+    # Backend penyimpanan log: "csv", "parquet" (log_parquet.py, butuh pyarrow), "sqlite" (log_sqlite.py)
+    # atau "runs" (log_runs.py)
+    "log_backend": "csv",
+    "parquet_dir": "deteksi_ombak_parquet",
+    # Row Parquet ditulis sebagai part paling lambat tiap N detik (jeda maksimum Logs tab / API)
+    "parquet_part_max_age_sec": 10.0,
+    "sqlite_path": "deteksi_ombak.db",
+    # Rollup menit/jam/hari saat tulis (log_rollup.py), disimpan di <log>.rollup.db
+    "enable_rollups": True,
+    # Rotasi CSV (log_rotation.py): per hari dan/atau ukuran (0 = tanpa batas), segmen di-gzip
+    "log_rotate_daily": True,
+    "log_rotate_max_mb": 50,
+    "log_compress_segments": True,
+    # Backend "runs" (log_runs.py): simpan run saat status / peak_y berubah atau tiap heartbeat
+    "runs_path": "deteksi_ombak.runs.db",
+    "run_peak_delta": 10,
+    "run_heartbeat_sec": 300,
+    # Run diputus jika jeda antar sampel > faktor x sample_every_sec (periode detektor mati tetap kosong)
+    "run_max_gap_factor": 3,
+    # Rekam peak_y tiap frame terdeteksi ke file biner harian (frame_store.py, dibaca via np.memmap)
+    "enable_frame_store": False,
+    "frame_store_dir": "deteksi_ombak_frames",
+    # Cache laporan PDF (log_report.py): dibuat di background, satu file per (log, rentang, versi data)
+    "report_dir": "reports",
+    # Laporan harian / mingguan terjadwal (report_scheduler.py): dibuat 00:00 + grace menit
+    "report_grace_min": 10,
+    "report_catchup_days": 14,
+    # Koneksi RTSP (stream_capture.py): timeout connect, percobaan awal, deteksi putus & backoff reconnect
+    "rtsp_connect_timeout_sec": 10,
+    "rtsp_transport": "tcp",
+    "rtsp_connect_retries": 3,
+    "rtsp_stall_sec": 60,
+    "rtsp_backoff_base_sec": 1.0,
+    "rtsp_backoff_max_sec": 60,
+    # Riwayat kualitas stream per kamera (stream_health.py): sampel FPS / jitter / drop / umur frame
+    "stream_health_enabled": True,
+    "stream_health_path": "stream_health.db",
+    "stream_health_interval_sec": 10,
+    "stream_health_keep_days": 30,
+    # JSON API status / riwayat (status_api.py) untuk sistem luar; di balik nginx pada /api/
+    "api_host": "127.0.0.1",
+    "api_port": 8502,
+    "api_cache_sec": 2.0
 }
 
+class ConfigStore:
+    """
+    Cache config dashboard untuk satu file JSON.
+
+    Args:
+        path: file config
+        defaults: nilai default yang digabung di bawah isi file
+    """
+
+    def __init__(self, path: str = CONFIG_FILE, defaults: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.defaults = dict(DEFAULT_CONFIG if defaults is None else defaults)
+        self._lock = threading.RLock()
+        self._signature = None
+        self._file: Optional[Dict[str, Any]] = None  # isi file terakhir (tanpa default)
+        self._config: Dict[str, Any] = dict(self.defaults)
+        self._listeners: List[Callable[[Dict[str, Any], Dict[str, Any]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.reads = 0
+        self.writes = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def add_listener(self, callback: Callable[[Dict[str, Any], Dict[str, Any]], None]):
+        """callback(config, changed) dipanggil setelah ada key berubah; changed = {key: nilai baru}."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _apply(self, file_config: Dict[str, Any], signature) -> Dict[str, Any]:
+        """Set cache dari isi file; return key yang berubah (dipanggil dengan lock)."""
+        merged = dict(self.defaults)
+        merged.update(file_config)
+        changed = {k: merged.get(k) for k in set(merged) | set(self._config)
+                   if merged.get(k) != self._config.get(k)}
+        self._file = file_config
+        self._config = merged
+        self._signature = signature
+        return changed
+
+    def _notify(self, changed: Dict[str, Any]):
+        if not changed:
+            return
+        config = dict(self._config)
+        for callback in list(self._listeners):
+            try:
+                callback(config, changed)
+            except Exception as e:
+                print(f"Error in config listener: {e}")
+
+    def reload(self) -> Dict[str, Any]:
+        """Baca ulang file jika berubah (1x os.stat jika tidak). Return key yang berubah."""
+        with self._lock:
+            signature = self._stat()
+            if signature is not None and signature == self._signature:
+                return {}
+            if signature is None:
+                return {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    file_config = json.load(f)
+            except Exception as e:
+                # Config terakhir yang valid tetap dipakai
+                print(f"Error loading config: {e}")
+                self._signature = signature
+                return {}
+            self.reads += 1
+            changed = self._apply(file_config, signature)
+        self._notify(changed)
+        return changed
+
+    def load(self) -> Dict[str, Any]:
+        """Salinan config (default + file). File dibuat dengan default config jika belum ada."""
+        self.reload()
+        with self._lock:
+            if self._file is None and self._stat() is None:
+                self._write(self.defaults)
+            return dict(self._config)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self.reload()
+        return self._config.get(key, default)
+
+    def _write(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.writes += 1
+        return self._apply(dict(config), self._stat())
+
+    def save(self, config: Dict[str, Any]) -> bool:
+        """Tulis config ke file hanya jika isinya berbeda. Return True jika file ditulis."""
+        with self._lock:
+            self.reload()
+            if self._file is not None and config == self._file:
+                return False
+            changed = self._write(config)
+        self._notify(changed)
+        return True
+
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Gabung beberapa key ke config lalu simpan (jika ada yang berbeda)."""
+        self.reload()
+        with self._lock:
+            config = dict(self._file if self._file is not None else self._config)
+        config.update(values)
+        return self.save(config)
+
+    def start_watcher(self, interval_sec: float = 2.0) -> threading.Thread:
+        """Thread daemon: cek perubahan file (os.stat) tiap interval, panggil listener jika berubah."""
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._stop.clear()
+                self._watcher = threading.Thread(target=self._watch, args=(interval_sec,),
+                                                 name="config-watcher", daemon=True)
+                self._watcher.start()
+            return self._watcher
+
+    def _watch(self, interval_sec: float):
+        while not self._stop.wait(interval_sec):
+            self.reload()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+
+_stores: Dict[str, ConfigStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_store(path: Optional[str] = None) -> ConfigStore:
+    """ConfigStore bersama per path (default CONFIG_FILE)."""
+    path = os.path.abspath(path or CONFIG_FILE)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ConfigStore(path)
+        return _stores[path]
+
+
 def load_config() -> Dict[str, Any]:
-    """Load konfigurasi dari file JSON."""
+    """Load konfigurasi (dari cache; file dibaca ulang hanya jika berubah)."""
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                # Merge dengan default config untuk memastikan semua key ada
-                merged_config = DEFAULT_CONFIG.copy()
-                merged_config.update(config)
-                return merged_config
-        else:
-            # Jika file tidak ada, buat dengan default config
-            save_config(DEFAULT_CONFIG)
-            return DEFAULT_CONFIG.copy()
+        return get_config_store().load()
     except Exception as e:
         print(f"Error loading config: {e}")
         return DEFAULT_CONFIG.copy()
 
 def save_config(config: Dict[str, Any]) -> bool:
-    """Simpan konfigurasi ke file JSON."""
+    """Simpan konfigurasi ke file JSON (tidak menulis jika isinya sama)."""
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        get_config_store().save(config)
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
@@ -75,9 +267,8 @@ def save_config(config: Dict[str, Any]) -> bool:
 def update_config(key: str, value: Any) -> bool:
     """Update satu nilai konfigurasi."""
     try:
-        config = load_config()
-        config[key] = value
-        return save_config(config)
+        get_config_store().update({key: value})
+        return True
     except Exception as e:
         print(f"Error updating config: {e}")
         return False
@@ -85,8 +276,7 @@ def update_config(key: str, value: Any) -> bool:
 def get_config_value(key: str, default: Any = None) -> Any:
     """Ambil satu nilai konfigurasi."""
     try:
-        config = load_config()
-        return config.get(key, default)
+        return get_config_store().get(key, default)
     except Exception as e:
         print(f"Error getting config value: {e}")
         return default
@@ -120,6 +310,32 @@ def import_config(config_json: str) -> bool:
         print(f"Error importing config: {e}")
         return False
 
+def benchmark_config_store(calls: int = 2000) -> Dict[str, Any]:
+    """load_config berulang & auto-save tanpa perubahan: baca/parse JSON tiap panggil vs ConfigStore."""
+    import tempfile
+    import time
+    path = os.path.join(tempfile.mkdtemp(prefix="config_bench_"), CONFIG_FILE)
+    store = ConfigStore(path)
+    config = store.load()
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        with open(path, 'r', encoding='utf-8') as f:
+            merged = DEFAULT_CONFIG.copy()
+            merged.update(json.load(f))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=4, ensure_ascii=False)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        store.save(dict(store.load()))
+    cached = time.perf_counter() - t0
+    return {"calls": calls, "legacy_ms_per_call": round(legacy * 1000 / calls, 3),
+            "store_ms_per_call": round(cached * 1000 / calls, 3), "file_reads": store.reads,
+            "file_writes": store.writes, "unchanged_saves_skipped": calls - (store.writes - 1)}
+
+
 if __name__ == "__main__":
     # Test functions
     print("Testing dashboard config...")
@@ -138,3 +354,5 @@ if __name__ == "__main__":
     print(f"Exported config length: {len(exported)} chars")
     
     print("Config test completed!")
+    print("🔍 Benchmark config store...")
+    print(benchmark_config_store())
@@ -106,6 +106,15 @@ server {
         proxy_read_timeout 86400;
     }
 
+    # JSON API status / riwayat (status_api.py) untuk kontroler sirene & peta pusat
+    location /api/ {
+        proxy_pass http://127.0.0.1:8502;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_set_header Host \$host;
+        proxy_set_header X-Real-IP \$remote_addr;
+    }
+
     # Static files caching
     location ~* \.(js|css|png|jpg|jpeg|gif|ico|svg)\$ {
         proxy_pass http://127.0.0.1:8501;
@@ -158,6 +167,45 @@ RestartSec=10
 WantedBy=multi-user.target
 EOF
 
+# Scheduler laporan harian & mingguan (report_scheduler.py), terpisah dari dashboard
+sudo tee /etc/systemd/system/wave-reports.service > /dev/null <<EOF
+[Unit]
+Description=Wave Monitoring Daily/Weekly Reports
+After=network.target
+
+[Service]
+Type=simple
+User=$USER
+WorkingDirectory=/opt/wave-monitoring
+Environment=PATH=/usr/bin:/usr/local/bin
+ExecStart=/usr/bin/python3 report_scheduler.py
+Restart=always
+RestartSec=30
+Nice=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+# JSON API status / riwayat (status_api.py), ringan dibanding sesi Streamlit untuk polling
+sudo tee /etc/systemd/system/wave-api.service > /dev/null <<EOF
+[Unit]
+Description=Wave Monitoring JSON API
+After=network.target
+
+[Service]
+Type=simple
+User=$USER
+WorkingDirectory=/opt/wave-monitoring
+Environment=PATH=/usr/bin:/usr/local/bin
+ExecStart=/usr/bin/python3 status_api.py --host 127.0.0.1 --port 8502
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 print_status "Step 11: Creating environment template..."
 tee .env.template > /dev/null <<EOF
 # Twilio Configuration
@@ -184,6 +232,8 @@ EOF
 print_status "Step 12: Enabling and starting service..."
 sudo systemctl daemon-reload
 sudo systemctl enable wave-monitoring.service
+sudo systemctl enable wave-reports.service
+sudo systemctl enable wave-api.service
 
 print_status "Step 13: Setting up fail2ban..."
 sudo systemctl enable fail2ban
@@ -194,7 +244,7 @@ echo ""
 print_status "📋 Next steps:"
 echo "1. Copy your project files to /opt/wave-monitoring/"
 echo "2. Copy .env.template to .env and configure your settings"
-echo "3. Start the service: sudo systemctl start wave-monitoring.service"
+echo "3. Start the services: sudo systemctl start wave-monitoring.service wave-reports.service wave-api.service"
 echo "4. Check status: sudo systemctl status wave-monitoring.service"
 echo "5. Access dashboard: https://wave-monitoring.lppm-upiyptk.site/"
 echo ""
@@ -0,0 +1,200 @@
+# fake_twilio.py
+# Fake Twilio Messages API lokal untuk benchmark / load test tanpa kredensial asli.
+# Implementasi: POST /2010-04-01/Accounts/{AccountSid}/Messages.json
+# - latency_ms (+ jitter), error_rate (HTTP 500), rate_limit_per_sec (HTTP 429)
+# Arahkan notify_whatsapp / notify_sms ke server ini dengan:
+#   TWILIO_API_BASE_URL=http://127.0.0.1:8765
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+MESSAGES_PATH = re.compile(r"^/2010-04-01/Accounts/(?P<account_sid>[^/]+)/Messages\.json$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, supaya pooling koneksi terukur
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections_opened += 1
+
+    def log_message(self, format, *args):
+        pass  # jangan spam stdout
+
+    def _send_json(self, code: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, code: int, message: str):
+        with self.server.lock:
+            self.server.responses[status] = self.server.responses.get(status, 0) + 1
+        self._send_json(status, {"code": code, "message": message, "more_info": "", "status": status})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        match = MESSAGES_PATH.match(self.path.split("?")[0])
+        if not match:
+            self._send_error(404, 20404, "The requested resource was not found")
+            return
+
+        if not self.server.take_token():
+            self._send_error(429, 20429, "Too Many Requests")
+            return
+
+        latency = self.server.latency_ms + random.uniform(-1, 1) * self.server.latency_jitter_ms
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+        if self.server.error_rate > 0 and random.random() < self.server.error_rate:
+            self._send_error(500, 20500, "Internal Server Error")
+            return
+
+        now = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        sid = "SM" + uuid.uuid4().hex
+        account_sid = match.group("account_sid")
+        msg = {
+            "sid": sid,
+            "account_sid": account_sid,
+            "to": form.get("To", [""])[0],
+            "from": form.get("From", [None])[0],
+            "messaging_service_sid": form.get("MessagingServiceSid", [None])[0],
+            "body": form.get("Body", [""])[0],
+            "status": "queued",
+            "num_segments": "1",
+            "num_media": str(len(form.get("MediaUrl", []))),
+            "direction": "outbound-api",
+            "api_version": "2010-04-01",
+            "date_created": now,
+            "date_updated": now,
+            "date_sent": None,
+            "error_code": None,
+            "error_message": None,
+            "price": None,
+            "price_unit": "USD",
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}.json",
+        }
+        with self.server.lock:
+            self.server.messages.append(msg)
+            self.server.responses[201] = self.server.responses.get(201, 0) + 1
+        self._send_json(201, msg)
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def take_token(self) -> bool:
+        """Token bucket global: False jika melebihi rate_limit_per_sec (-> HTTP 429)."""
+        if not self.rate_limit_per_sec:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate_burst, self.tokens + (now - self.tokens_at) * self.rate_limit_per_sec)
+            self.tokens_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FakeTwilioServer:
+    """
+    Fake Twilio server di thread background.
+
+    Args:
+        latency_ms: latency rata-rata per request
+        latency_jitter_ms: variasi latency (uniform +/-)
+        error_rate: probabilitas 0..1 request dibalas HTTP 500
+        rate_limit_per_sec: batas request/detik (0 = tanpa batas), selebihnya HTTP 429
+        rate_burst: kapasitas burst token bucket (default = rate_limit_per_sec)
+
+    Contoh:
+        with FakeTwilioServer(latency_ms=100) as server:
+            client = make_twilio_client("ACtest", "test", base_url=server.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 latency_jitter_ms: float = 0, error_rate: float = 0,
+                 rate_limit_per_sec: float = 0, rate_burst: float = 0):
+        self.httpd = _FakeHTTPServer((host, port), _Handler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.latency_ms = latency_ms
+        self.httpd.latency_jitter_ms = latency_jitter_ms
+        self.httpd.error_rate = error_rate
+        self.httpd.rate_limit_per_sec = rate_limit_per_sec
+        self.httpd.rate_burst = rate_burst or max(1.0, rate_limit_per_sec)
+        self.httpd.tokens = self.httpd.rate_burst
+        self.httpd.tokens_at = time.monotonic()
+        self.httpd.messages = []
+        self.httpd.responses = {}
+        self.httpd.connections_opened = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def messages(self) -> List[Dict]:
+        with self.httpd.lock:
+            return list(self.httpd.messages)
+
+    @property
+    def connections_opened(self) -> int:
+        return self.httpd.connections_opened
+
+    @property
+    def responses(self) -> Dict[int, int]:
+        """Jumlah response per HTTP status (201 / 429 / 500 / 404)."""
+        with self.httpd.lock:
+            return dict(self.httpd.responses)
+
+    def start(self) -> "FakeTwilioServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-twilio", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Twilio Messages API lokal")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="request/detik, 0 = tanpa batas")
+    args = parser.parse_args()
+
+    server = FakeTwilioServer(args.host, args.port, latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate, rate_limit_per_sec=args.rate_limit)
+    print(f"🧪 Fake Twilio berjalan di {server.url} (Ctrl+C untuk berhenti)")
+    print(f"   Set TWILIO_API_BASE_URL={server.url} untuk mengarahkan notify_whatsapp / notify_sms")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,267 @@
+# frame_store.py
+# Penyimpanan biner per frame (full frame rate) untuk sinyal peak_y.
+# - Record fixed-width NumPy (13 byte): waktu lokal (datetime64[us]), peak_y, kode status, jumlah garis
+# - File append-only per hari: <root>/frames-YYYY-MM-DD.bin (tanpa header, layout = frame_dtype())
+# - Pembaca memakai np.memmap: slice rentang waktu tanpa parsing dan tanpa copy
+# - FrameRecorder menulis per blok dari live loop (buffer NumPy, tanpa thread)
+# - numpy di-import lazy (modul ini di-import dashboard saat start)
+
+import atexit
+import bisect
+import functools
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from log_writer import STATUS_LEVELS
+
+STATUS_UNKNOWN = 255
+_STATUS_CODES = {s: i for i, s in enumerate(STATUS_LEVELS)}
+
+DEFAULT_BUFFER_RECORDS = 256
+DEFAULT_FLUSH_INTERVAL_SEC = 2.0
+
+
+@functools.lru_cache(maxsize=1)
+def frame_dtype():
+    """Layout record (np.dtype) per frame."""
+    import numpy as np
+    return np.dtype([
+        ("ts", "<M8[us]"),     # waktu lokal (sama dengan timestamp log CSV)
+        ("peak_y", "<i2"),
+        ("status", "u1"),      # index STATUS_LEVELS, STATUS_UNKNOWN jika lain
+        ("lines", "<u2"),      # jumlah garis Hough terdeteksi
+    ])
+
+
+def status_code(status: str) -> int:
+    return _STATUS_CODES.get(status, STATUS_UNKNOWN)
+
+
+def day_file(root: str, day: date) -> str:
+    return os.path.join(root, f"frames-{day.isoformat()}.bin")
+
+
+class FrameRecorder:
+    """
+    Tulis record per frame ke file harian (append-only).
+
+    Args:
+        root: folder file harian
+        buffer_records: record ditulis ke file per blok sebesar ini
+        flush_interval_sec: blok yang belum penuh ditulis paling lambat tiap N detik
+    """
+
+    def __init__(self, root: str, buffer_records: int = DEFAULT_BUFFER_RECORDS,
+                 flush_interval_sec: float = DEFAULT_FLUSH_INTERVAL_SEC):
+        self.root = root
+        import numpy as np
+        self.flush_interval_sec = flush_interval_sec
+        self.recorded = 0
+        self._buf = np.empty(max(1, buffer_records), dtype=frame_dtype())
+        self._n = 0
+        self._f = None
+        self._day: Optional[date] = None
+        self._next_day: Optional[datetime] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def record(self, peak_y: int, status: str, lines: int = 0, ts: Optional[datetime] = None):
+        """Tambah satu record (dipanggil tiap frame yang dideteksi)."""
+        ts = ts or datetime.now()
+        with self._lock:
+            if self._next_day is None or ts >= self._next_day:
+                self._flush_locked()
+                self._open_day(ts.date())
+            rec = self._buf[self._n]
+            rec["ts"] = ts  # datetime -> datetime64[us] oleh field dtype
+            rec["peak_y"] = max(-32768, min(32767, int(peak_y)))
+            rec["status"] = status_code(status)
+            rec["lines"] = max(0, min(65535, int(lines or 0)))
+            self._n += 1
+            self.recorded += 1
+            if self._n >= len(self._buf) or time.monotonic() - self._last_flush >= self.flush_interval_sec:
+                self._flush_locked()
+
+    def _open_day(self, day: date):
+        if self._f is not None:
+            self._f.close()
+        path = day_file(self.root, day)
+        self._f = open(path, "ab")
+        # Buang sisa record terpotong (proses mati di tengah write) supaya layout tetap rata
+        size = self._f.tell()
+        if size % frame_dtype().itemsize:
+            self._f.truncate(size - size % frame_dtype().itemsize)
+            self._f.seek(0, os.SEEK_END)
+        self._day = day
+        self._next_day = datetime.combine(day + timedelta(days=1), datetime.min.time())
+
+    def _flush_locked(self):
+        if self._n and self._f is not None:
+            self._f.write(self._buf[:self._n].tobytes())
+            self._f.flush()
+        self._n = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+            self._next_day = None
+
+
+class FrameStore:
+    """
+    Pembaca file harian per frame via np.memmap (read-only, zero-copy).
+
+    Args:
+        root: folder file harian
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def days(self) -> List[date]:
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for name in os.listdir(self.root):
+            if name.startswith("frames-") and name.endswith(".bin"):
+                try:
+                    out.append(date.fromisoformat(name[7:-4]))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def day_array(self, day: date):
+        """Semua record satu hari sebagai memmap (record terakhir yang belum lengkap diabaikan)."""
+        import numpy as np
+        path = day_file(self.root, day)
+        try:
+            n = os.path.getsize(path) // frame_dtype().itemsize
+        except FileNotFoundError:
+            n = 0
+        if n == 0:
+            return np.empty(0, dtype=frame_dtype())
+        return np.memmap(path, dtype=frame_dtype(), mode="r", shape=(n,))
+
+    def slice_range(self, start: datetime, end: datetime) -> List:
+        """View memmap per hari untuk [start, end] (tanpa copy; ts urut naik karena append-only)."""
+        import numpy as np
+        lo, hi = np.datetime64(start, "us"), np.datetime64(end, "us")
+        out = []
+        day = start.date()
+        while day <= end.date():
+            arr = self.day_array(day)
+            if len(arr):
+                ts = arr["ts"]
+                # bisect langsung di memmap: hanya ~log2(n) record yang disentuh
+                i = bisect.bisect_left(ts, lo)
+                j = bisect.bisect_right(ts, hi)
+                if j > i:
+                    out.append(arr[i:j])
+            day += timedelta(days=1)
+        return out
+
+    def last_timestamp(self) -> Optional[datetime]:
+        for day in reversed(self.days()):
+            arr = self.day_array(day)
+            if len(arr):
+                return arr["ts"][-1].astype(datetime)
+        return None
+
+    def read_range(self, start: datetime, end: datetime):
+        """Rentang sebagai pandas.DataFrame: waktu, puncak_ombak_y, status_ombak, jumlah_garis_terdeteksi."""
+        import numpy as np
+        import pandas as pd
+        parts = self.slice_range(start, end)
+        arr = np.concatenate(parts) if parts else np.empty(0, dtype=frame_dtype())
+        names = np.array(STATUS_LEVELS + [""] * (STATUS_UNKNOWN + 1 - len(STATUS_LEVELS)), dtype=object)
+        return pd.DataFrame({
+            "waktu": arr["ts"].astype("datetime64[us]"),
+            "puncak_ombak_y": arr["peak_y"],
+            "status_ombak": pd.Categorical(names[arr["status"]], categories=STATUS_LEVELS + [""]),
+            "jumlah_garis_terdeteksi": arr["lines"],
+        })
+
+
+_recorders: Dict[str, FrameRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def get_frame_recorder(root: str, **options) -> FrameRecorder:
+    """Recorder singleton per folder (dipakai ulang lintas rerun Streamlit)."""
+    key = os.path.abspath(root)
+    with _recorders_lock:
+        recorder = _recorders.get(key)
+        if recorder is None:
+            recorder = FrameRecorder(root, **options)
+            _recorders[key] = recorder
+        return recorder
+
+
+def close_all_recorders():
+    with _recorders_lock:
+        recorders = list(_recorders.values())
+        _recorders.clear()
+    for recorder in recorders:
+        recorder.close()
+
+
+atexit.register(close_all_recorders)
+
+
+def benchmark_frame_store(hours: float = 6, fps: float = 25) -> Dict:
+    """Ukuran + waktu baca: file memmap per frame vs CSV berisi data yang sama."""
+    import tempfile
+    import numpy as np
+    import pandas as pd
+
+    tmpdir = tempfile.mkdtemp(prefix="frame_store_bench_")
+    n = int(hours * 3600 * fps)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    recorder = FrameRecorder(os.path.join(tmpdir, "frames"))
+    rng = np.random.default_rng(0)
+    ys = rng.integers(150, 350, n)
+    t0 = time.perf_counter()
+    for i in range(n):
+        recorder.record(int(ys[i]), STATUS_LEVELS[i % len(STATUS_LEVELS)], 3,
+                        ts=start + timedelta(seconds=i / fps))
+    record_us = (time.perf_counter() - t0) / n * 1e6
+    recorder.close()
+
+    csv_path = os.path.join(tmpdir, "frames.csv")
+    store = FrameStore(os.path.join(tmpdir, "frames"))
+    store.read_range(start, start + timedelta(hours=hours)).to_csv(csv_path, index=False)
+
+    window = (start + timedelta(hours=hours / 2), start + timedelta(hours=hours / 2, minutes=10))
+    t0 = time.perf_counter()
+    views = store.slice_range(*window)
+    slice_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    w = pd.to_datetime(df["waktu"])
+    df[(w >= window[0]) & (w <= window[1])]
+    csv_ms = (time.perf_counter() - t0) * 1000
+
+    return {
+        "records": n, "record_us_per_frame": round(record_us, 2),
+        "bin_mb": round(os.path.getsize(day_file(store.root, start.date())) / 1e6, 2),
+        "csv_mb": round(os.path.getsize(csv_path) / 1e6, 2),
+        "slice_10min_records": sum(len(v) for v in views),
+        "memmap_slice_ms": round(slice_ms, 3), "csv_read_filter_ms": round(csv_ms, 1),
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark frame store (memmap vs CSV)...")
+    print(benchmark_frame_store())
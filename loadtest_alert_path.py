@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test jalur alert: deteksi -> outbox -> Twilio (fake server lokal).
+
+Mensimulasikan burst EXTREME beruntun seperti di live loop, lalu mengukur:
+- throughput pengiriman (pesan/detik)
+- latency deteksi -> terkirim per prioritas (tsunami vs ombak tinggi)
+- waktu blocking enqueue di detection loop
+
+Contoh:
+    python loadtest_alert_path.py --bursts 20 --recipients 30 --error-rate 0.05 --rate-limit 50
+"""
+
+import argparse
+import os
+import statistics
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+
+from fake_twilio import FakeTwilioServer
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"n": 0}
+    values = sorted(values)
+    q = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else [values[0]] * 99
+    return {
+        "n": len(values),
+        "p50_ms": round(q[49] * 1000, 1),
+        "p95_ms": round(q[94] * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1),
+    }
+
+
+def run_load_test(bursts: int = 10, burst_frames: int = 30, fps: float = 25, gap_sec: float = 0.5,
+                  extreme_threshold: int = 12, recipients: int = 20, wave_alert_every: int = 5,
+                  latency_ms: float = 150, jitter_ms: float = 50, error_rate: float = 0.0,
+                  rate_limit: float = 0, timeout_sec: float = 120) -> Dict:
+    """
+    Jalankan load test jalur alert.
+
+    Args:
+        bursts: jumlah burst EXTREME
+        burst_frames: jumlah frame EXTREME per burst
+        fps: frame rate simulasi deteksi
+        gap_sec: jeda tenang antar burst
+        extreme_threshold: EXTREME beruntun sebelum alert tsunami
+        recipients: jumlah nomor per alert (fan-out)
+        wave_alert_every: alert "ombak tinggi" tiap N frame EXTREME
+        latency_ms / jitter_ms / error_rate / rate_limit: perilaku fake Twilio
+
+    Returns:
+        Dict: ringkasan throughput dan latency
+    """
+    server = FakeTwilioServer(latency_ms=latency_ms, latency_jitter_ms=jitter_ms,
+                              error_rate=error_rate, rate_limit_per_sec=rate_limit).start()
+    numbers = ",".join(f"+62812{i:07d}" for i in range(recipients))
+    os.environ.update({
+        "TWILIO_API_BASE_URL": server.url,
+        "WHATSAPP_TO": numbers,
+        "SMS_TO": numbers,
+        "TWILIO_SMS_FROM": os.getenv("TWILIO_SMS_FROM") or "+15005550006",
+    })
+
+    # Import setelah env di-set (modul notify membaca konfigurasi saat import)
+    from alert_outbox import AlertOutbox, OutboxSender, PRIORITY_TSUNAMI, PRIORITY_WAVE
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="outbox_loadtest_"), "outbox.db")
+    outbox = AlertOutbox(db_path, retry_base_sec=0.2, retry_max_sec=2)
+    sender = OutboxSender(outbox, poll_interval=0.05)
+    sender.start()
+
+    enqueue_sec = []
+    t_start = time.perf_counter()
+    frame_idx = 0
+    for b in range(bursts):
+        extreme_count = 0
+        for _ in range(burst_frames):
+            frame_idx += 1
+            extreme_count += 1
+            t0 = time.perf_counter()
+            if extreme_count == extreme_threshold:
+                outbox.enqueue("whatsapp", f"TSUNAMI burst {b} frame {frame_idx}",
+                               priority=PRIORITY_TSUNAMI, idempotency_key=f"loadtest:tsunami:{b}")
+            if extreme_count % wave_alert_every == 0:
+                outbox.enqueue("sms", f"OMBAK TINGGI burst {b} frame {frame_idx}",
+                               priority=PRIORITY_WAVE, idempotency_key=f"loadtest:wave:{frame_idx}")
+            enqueue_sec.append(time.perf_counter() - t0)
+            time.sleep(1.0 / fps)
+        time.sleep(gap_sec)
+    t_detect_done = time.perf_counter()
+
+    deadline = time.time() + timeout_sec
+    while outbox.pending_count() and time.time() < deadline:
+        time.sleep(0.05)
+    t_end = time.perf_counter()
+    sender.stop()
+    server.stop()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT priority, created_at, sent_at FROM outbox WHERE status='sent'").fetchall()
+    conn.close()
+    latency_tsunami = [sent - created for prio, created, sent in rows if prio == PRIORITY_TSUNAMI]
+    latency_wave = [sent - created for prio, created, sent in rows if prio == PRIORITY_WAVE]
+    delivered = server.responses.get(201, 0)
+
+    return {
+        "alerts_sent": len(rows),
+        "alerts_pending": outbox.pending_count(),
+        "messages_delivered": delivered,
+        "responses": server.responses,
+        "detect_sec": round(t_detect_done - t_start, 2),
+        "total_sec": round(t_end - t_start, 2),
+        "throughput_msg_per_sec": round(delivered / max(t_end - t_start, 1e-9), 1),
+        "latency_tsunami": _percentiles(latency_tsunami),
+        "latency_wave": _percentiles(latency_wave),
+        "enqueue_block": _percentiles(enqueue_sec),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test jalur alert (fake Twilio lokal)")
+    parser.add_argument("--bursts", type=int, default=10)
+    parser.add_argument("--burst-frames", type=int, default=30)
+    parser.add_argument("--fps", type=float, default=25)
+    parser.add_argument("--recipients", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    args = parser.parse_args()
+
+    print("🔍 Load test jalur alert (deteksi -> outbox -> fake Twilio)...")
+    result = run_load_test(bursts=args.bursts, burst_frames=args.burst_frames, fps=args.fps,
+                           recipients=args.recipients, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, rate_limit=args.rate_limit)
+    for key, value in result.items():
+        print(f"   {key}: {value}")
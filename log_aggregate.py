@@ -0,0 +1,384 @@
+# log_aggregate.py
+# Agregasi log CSV per chunk dengan memori terbatas (untuk log bertahun-tahun di Pi).
+# - Hanya kolom yang dipakai yang di-parse; tanggal/jam/timestamp string dibuang setelah jadi 'waktu'
+# - dtype ringkas: Int16/Int32 nullable, status kategori, alert_sent bool (~20 byte/row vs ~300 byte object)
+# - LogAggregator: metrik terbaru, distribusi status, ringkasan laporan (format summarize_rows),
+#   riwayat alert & 500 row terakhir dihitung streaming per chunk
+# - Row untuk grafik dibatasi max_frame_rows: jika lebih, dikecilkan per bucket waktu (min/max y,
+#   row EXTREME / alert selalu ikut) sehingga puncak tetap terlihat
+# - Agregat per jam (n, min/mean/max y, max extreme, alert) untuk tabel laporan
+# - Hasil per segmen rotasi (immutable) di-cache per (path, mtime, rentang)
+
+import functools
+import os
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from log_writer import STATUS_LEVELS
+
+DateLike = Optional[Union[date, datetime]]
+
+DEFAULT_CHUNK_ROWS = 50000
+DEFAULT_MAX_FRAME_ROWS = 200000
+SEGMENT_FRAME_ROWS = 20000
+DEFAULT_TAIL_ROWS = 500
+DEFAULT_MAX_ALERT_ROWS = 1000
+
+LOG_COLUMNS = ["timestamp", "tanggal", "jam", "frame", "puncak_ombak_y", "status_ombak",
+               "jumlah_garis_terdeteksi", "extreme_count", "alert_sent"]
+COMPACT_DTYPES = {"frame": "Int32", "puncak_ombak_y": "Int16",
+                  "jumlah_garis_terdeteksi": "Int16", "extreme_count": "Int32"}
+
+
+def compact_frame(df):
+    """
+    DataFrame log -> dtype ringkas dengan kolom 'waktu' (dipakai juga oleh log_csv_cache).
+
+    Kolom string timestamp / tanggal / jam dibuang setelah 'waktu' terbentuk.
+    Nilai numerik yang tidak muat / pecahan jatuh ke float32.
+    """
+    import pandas as pd
+    from log_csv_cache import add_waktu_column
+    if 'waktu' not in df.columns:
+        df = add_waktu_column(df)
+    df = df.drop(columns=[c for c in ("timestamp", "tanggal", "jam") if c in df.columns])
+    for col, dtype in COMPACT_DTYPES.items():
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+            try:
+                df[col] = values.astype(dtype)
+            except (TypeError, ValueError, OverflowError):
+                df[col] = values.astype("float32")
+    if 'status_ombak' in df.columns and not isinstance(df['status_ombak'].dtype, pd.CategoricalDtype):
+        df['status_ombak'] = df['status_ombak'].astype("category")
+    if 'alert_sent' in df.columns and df['alert_sent'].dtype != bool:
+        df['alert_sent'] = df['alert_sent'].astype(str).str.strip().str.lower().isin(("true", "1"))
+    return df
+
+
+def concat_compact(frames: List):
+    """Concat frame ringkas tanpa kehilangan dtype kategori (kategori digabung dulu)."""
+    import pandas as pd
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    if all('status_ombak' in f.columns for f in frames):
+        cats = pd.api.types.union_categoricals(
+            [f['status_ombak'].astype("category") for f in frames], ignore_order=True).categories
+        frames = [f.assign(status_ombak=f['status_ombak'].astype("category").cat.set_categories(cats))
+                  for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _bounds(start: DateLike, end: DateLike):
+    """date -> hari penuh (end eksklusif hari berikutnya); datetime -> batas inklusif."""
+    import pandas as pd
+    lo = hi = None
+    if start is not None:
+        lo = pd.Timestamp(start if isinstance(start, datetime) else datetime.combine(start, dtime.min))
+    if end is not None:
+        hi = pd.Timestamp(end if isinstance(end, datetime) else datetime.combine(end + timedelta(days=1), dtime.min))
+    return lo, hi, isinstance(end, datetime)
+
+
+def iter_log_chunks(path: str, start: DateLike = None, end: DateLike = None,
+                    chunksize: int = DEFAULT_CHUNK_ROWS) -> Iterator:
+    """Chunk ringkas (lihat compact_frame) dari CSV log (.csv / .csv.gz), difilter ke rentang waktu."""
+    import pandas as pd
+    header = list(pd.read_csv(path, nrows=0).columns)
+    usecols = [c for c in header if c in LOG_COLUMNS
+               and not (c in ("tanggal", "jam") and "timestamp" in header)]
+    dtype = {"status_ombak": "category"} if "status_ombak" in usecols else None
+    lo, hi, hi_inclusive = _bounds(start, end)
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        chunk = compact_frame(chunk)
+        if lo is not None or hi is not None:
+            mask = chunk['waktu'].notna()
+            if lo is not None:
+                mask &= chunk['waktu'] >= lo
+            if hi is not None:
+                mask &= (chunk['waktu'] <= hi) if hi_inclusive else (chunk['waktu'] < hi)
+            chunk = chunk.loc[mask]
+        if len(chunk):
+            yield chunk
+
+
+def _min_max_reduce(df, n_buckets: int):
+    """Kecilkan frame: per bucket waktu ambil row pertama, terakhir, min y, max y (+ EXTREME / alert)."""
+    import numpy as np
+    import pandas as pd
+    df = df.loc[df['waktu'].notna()].sort_values('waktu', kind="stable").reset_index(drop=True)
+    if len(df) <= n_buckets * 4:
+        return df
+    t = df['waktu'].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    span = max(1, int(t[-1] - t[0]))
+    bucket = pd.Series((t - t[0]) * (n_buckets - 1) // span)
+    groups = bucket.groupby(bucket.to_numpy())
+    keep = [groups.head(1).index.to_numpy(), groups.tail(1).index.to_numpy()]
+    if 'puncak_ombak_y' in df.columns:
+        y = df['puncak_ombak_y'].astype("float64")
+        valid = y.notna()
+        by = y[valid].groupby(bucket[valid].to_numpy())
+        keep += [by.idxmin().to_numpy(), by.idxmax().to_numpy()]
+    if 'status_ombak' in df.columns:
+        keep.append(np.flatnonzero((df['status_ombak'] == STATUS_LEVELS[-1]).to_numpy()))
+    if 'alert_sent' in df.columns:
+        keep.append(np.flatnonzero(df['alert_sent'].to_numpy(dtype=bool)))
+    return df.iloc[np.unique(np.concatenate(keep))].reset_index(drop=True)
+
+
+_PERIOD_FREQ = {"hour": "h", "day": "D"}
+PERIOD_COLUMNS = ["waktu", "n", "min_y", "mean_y", "max_y", "max_extreme", "alerts"]
+
+
+def period_partials(df, resolution: str = "hour"):
+    """Agregat parsial per jam / hari (bisa digabung antar chunk, lihat merge_partials)."""
+    import numpy as np
+    import pandas as pd
+    if df is None or not len(df) or 'waktu' not in df.columns:
+        return None
+    nan = pd.Series(np.nan, index=df.index)
+    parts = pd.DataFrame({
+        "y": df['puncak_ombak_y'].astype("float64") if 'puncak_ombak_y' in df.columns else nan,
+        "extreme": df['extreme_count'].astype("float64") if 'extreme_count' in df.columns else nan,
+        "alert": df['alert_sent'].to_numpy(dtype=bool) if 'alert_sent' in df.columns else False,
+    })
+    g = parts.groupby(df['waktu'].dt.floor(_PERIOD_FREQ[resolution]).to_numpy())
+    return pd.DataFrame({"n": g.size(), "n_y": g["y"].count(), "sum_y": g["y"].sum(), "min_y": g["y"].min(),
+                         "max_y": g["y"].max(), "max_extreme": g["extreme"].max(), "alerts": g["alert"].sum()})
+
+
+def merge_partials(parts: List, resolution: Optional[str] = None):
+    """Gabung agregat parsial (opsional diturunkan ke resolusi lebih kasar, mis. jam -> hari)."""
+    import pandas as pd
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return None
+    merged = pd.concat(parts)
+    key = merged.index if resolution is None else merged.index.floor(_PERIOD_FREQ[resolution])
+    g = merged.groupby(key)
+    return pd.DataFrame({"n": g["n"].sum(), "n_y": g["n_y"].sum(), "sum_y": g["sum_y"].sum(),
+                         "min_y": g["min_y"].min(), "max_y": g["max_y"].max(),
+                         "max_extreme": g["max_extreme"].max(), "alerts": g["alerts"].sum()})
+
+
+def period_table(partials, resolution: str = "hour"):
+    """Agregat parsial -> tabel per periode (kolom PERIOD_COLUMNS, sama dengan RollupStore.read)."""
+    import pandas as pd
+    partials = merge_partials([partials], resolution)
+    if partials is None:
+        return pd.DataFrame(columns=PERIOD_COLUMNS)
+    out = partials.rename_axis("waktu").reset_index()
+    out["mean_y"] = (out["sum_y"] / out["n_y"].where(out["n_y"] > 0)).round(1)
+    return out[PERIOD_COLUMNS]
+
+
+class LogAggregator:
+    """
+    Agregasi streaming chunk log ringkas (urut waktu antar chunk).
+
+    Args:
+        max_frame_rows: batas row yang disimpan untuk grafik / tabel
+        tail_rows: jumlah row terakhir yang disimpan utuh (tabel data)
+        max_alert_rows: batas riwayat alert (yang terbaru disimpan)
+    """
+
+    def __init__(self, max_frame_rows: int = DEFAULT_MAX_FRAME_ROWS, tail_rows: int = DEFAULT_TAIL_ROWS,
+                 max_alert_rows: int = DEFAULT_MAX_ALERT_ROWS):
+        self.max_frame_rows = max_frame_rows
+        self.tail_rows = tail_rows
+        self.max_alert_rows = max_alert_rows
+        self.total = 0
+        self.reduced = False
+        self.latest = None
+        self.waktu_min = self.waktu_max = None
+        self.n_y, self.sum_y = 0, 0.0
+        self.min_y = self.max_y = self.max_extreme = None
+        self.alerts: Optional[int] = None
+        self.status_counts: Dict[str, int] = {}
+        self._frames: List = []
+        self._frame_rows = 0
+        self._tail = None
+        self._alert_rows = None
+        self._hourly = None
+
+    def add(self, chunk):
+        if chunk is None or not len(chunk):
+            return
+        import pandas as pd
+        self.total += len(chunk)
+        if 'waktu' in chunk.columns:
+            w = chunk['waktu']
+            lo, hi = w.min(), w.max()
+            if pd.notna(lo) and (self.waktu_min is None or lo < self.waktu_min):
+                self.waktu_min = lo
+            if pd.notna(hi) and (self.waktu_max is None or hi >= self.waktu_max):
+                self.waktu_max = hi
+                self.latest = chunk.loc[w[::-1].idxmax()]
+        if 'puncak_ombak_y' in chunk.columns:
+            y = chunk['puncak_ombak_y'].dropna()
+            if len(y):
+                self.n_y += len(y)
+                self.sum_y += float(y.astype("float64").sum())
+                self.min_y = int(y.min()) if self.min_y is None else min(self.min_y, int(y.min()))
+                self.max_y = int(y.max()) if self.max_y is None else max(self.max_y, int(y.max()))
+        if 'extreme_count' in chunk.columns and chunk['extreme_count'].notna().any():
+            m = int(chunk['extreme_count'].max())
+            self.max_extreme = m if self.max_extreme is None else max(self.max_extreme, m)
+        if 'status_ombak' in chunk.columns:
+            for status, n in chunk['status_ombak'].value_counts().items():
+                if n:
+                    self.status_counts[status] = self.status_counts.get(status, 0) + int(n)
+        if 'alert_sent' in chunk.columns:
+            alert_rows = chunk.loc[chunk['alert_sent'].to_numpy(dtype=bool)]
+            self.alerts = (self.alerts or 0) + len(alert_rows)
+            if len(alert_rows):
+                self._alert_rows = concat_compact([self._alert_rows, alert_rows]).tail(self.max_alert_rows)
+        self._tail = concat_compact([self._tail, chunk.tail(self.tail_rows)]).tail(self.tail_rows)
+        self._hourly = merge_partials([self._hourly, period_partials(chunk)])
+        self._add_frame(chunk)
+
+    def _add_frame(self, frame):
+        self._frames.append(frame)
+        self._frame_rows += len(frame)
+        if self._frame_rows > self.max_frame_rows:
+            reduced = _min_max_reduce(concat_compact(self._frames), max(1, self.max_frame_rows // 8))
+            self._frames, self._frame_rows, self.reduced = [reduced], len(reduced), True
+
+    def merge(self, other: "LogAggregator"):
+        """Gabung hasil agregator lain (data other lebih baru atau sama). other tidak diubah."""
+        self.total += other.total
+        if other.waktu_min is not None and (self.waktu_min is None or other.waktu_min < self.waktu_min):
+            self.waktu_min = other.waktu_min
+        if other.waktu_max is not None and (self.waktu_max is None or other.waktu_max >= self.waktu_max):
+            self.waktu_max, self.latest = other.waktu_max, other.latest
+        self.n_y += other.n_y
+        self.sum_y += other.sum_y
+        for attr, pick in (("min_y", min), ("max_y", max), ("max_extreme", max)):
+            a, b = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, b if a is None else a if b is None else pick(a, b))
+        if other.alerts is not None:
+            self.alerts = (self.alerts or 0) + other.alerts
+        for status, n in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + n
+        if other._alert_rows is not None:
+            self._alert_rows = concat_compact([self._alert_rows, other._alert_rows]).tail(self.max_alert_rows)
+        if other._tail is not None:
+            self._tail = concat_compact([self._tail, other._tail]).tail(self.tail_rows)
+        self._hourly = merge_partials([self._hourly, other._hourly])
+        self.reduced = self.reduced or other.reduced
+        for frame in other._frames:
+            self._add_frame(frame)
+
+    def frame(self):
+        """Row untuk grafik (semua row jika total <= max_frame_rows, lihat .reduced)."""
+        return concat_compact(self._frames)
+
+    def tail(self):
+        import pandas as pd
+        return self._tail if self._tail is not None else pd.DataFrame()
+
+    def alert_rows(self):
+        import pandas as pd
+        return self._alert_rows if self._alert_rows is not None else pd.DataFrame()
+
+    def period_table(self, resolution: str = "hour"):
+        """Tabel per jam / hari dari semua row (bukan dari frame grafik yang mungkin dikecilkan)."""
+        return period_table(self._hourly, resolution)
+
+    def summary(self) -> Dict:
+        """Ringkasan (format sama dengan log_rollup.summarize_rows / RollupStore.summary)."""
+        return {
+            "waktu_min": str(self.waktu_min) if self.waktu_min is not None else "-",
+            "waktu_max": str(self.waktu_max) if self.waktu_max is not None else "-",
+            "total": self.total,
+            "min_y": self.min_y,
+            "mean_y": round(self.sum_y / self.n_y, 1) if self.n_y else None,
+            "max_y": self.max_y,
+            "max_extreme": self.max_extreme,
+            "alerts": self.alerts,
+            "status_counts": dict(sorted(self.status_counts.items(), key=lambda kv: -kv[1])),
+        }
+
+
+def _resolve(path: str) -> str:
+    if not os.path.exists(path) and os.path.exists(path + ".gz"):
+        return path + ".gz"  # segmen dikompres sejak manifest dibaca
+    return path
+
+
+@functools.lru_cache(maxsize=64)
+def _aggregate_file_cached(path: str, mtime: float, start: DateLike, end: DateLike,
+                           max_frame_rows: int) -> LogAggregator:
+    agg = LogAggregator(max_frame_rows=max_frame_rows)
+    for chunk in iter_log_chunks(path, start, end):
+        agg.add(chunk)
+    return agg
+
+
+def aggregate_file(path: str, start: DateLike = None, end: DateLike = None,
+                   max_frame_rows: int = SEGMENT_FRAME_ROWS) -> LogAggregator:
+    """Agregat satu file immutable (segmen rotasi), di-cache per (path, mtime, rentang). Anggap read-only."""
+    path = _resolve(path)
+    return _aggregate_file_cached(path, os.path.getmtime(path), start, end, max_frame_rows)
+
+
+def aggregate_logs(paths: Iterable[str], start: DateLike = None, end: DateLike = None,
+                   max_frame_rows: int = DEFAULT_MAX_FRAME_ROWS) -> LogAggregator:
+    """Agregat beberapa file CSV log (urut waktu) tanpa cache; memori dibatasi per chunk."""
+    agg = LogAggregator(max_frame_rows=max_frame_rows)
+    for path in paths:
+        for chunk in iter_log_chunks(_resolve(path), start, end):
+            agg.add(chunk)
+    return agg
+
+
+def benchmark_aggregate(rows: int = 1000000) -> Dict:
+    """Puncak memori (tracemalloc): read_csv penuh + mask.copy() vs agregasi per chunk."""
+    import tempfile
+    import time
+    import tracemalloc
+    import numpy as np
+    import pandas as pd
+    from log_csv_cache import add_waktu_column
+    from log_rollup import summarize_rows
+
+    tmpdir = tempfile.mkdtemp(prefix="log_aggregate_bench_")
+    path = os.path.join(tmpdir, "deteksi_ombak.csv")
+    start = datetime(2024, 1, 1)
+    ts = pd.date_range(start, periods=rows, freq="2s")
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%f"), "tanggal": ts.strftime("%Y-%m-%d %H:%M:%S"),
+        "jam": ts.strftime("%H:%M:%S"), "frame": np.arange(rows), "puncak_ombak_y": rng.integers(0, 400, rows),
+        "status_ombak": np.array(STATUS_LEVELS)[rng.integers(0, len(STATUS_LEVELS), rows)],
+        "jumlah_garis_terdeteksi": rng.integers(0, 20, rows), "extreme_count": rng.integers(0, 5, rows),
+        "alert_sent": rng.random(rows) < 0.001,
+    }).to_csv(path, index=False)
+
+    def measure(fn):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, round(peak / 1e6, 1), round(elapsed, 2)
+
+    def naive():
+        df = add_waktu_column(pd.read_csv(path))
+        dff = df.loc[df['waktu'] >= pd.Timestamp(start)].copy()
+        return summarize_rows(dff)
+
+    full, full_mb, full_s = measure(naive)
+    chunked, chunked_mb, chunked_s = measure(lambda: aggregate_logs([path], start.date(), None).summary())
+    return {"rows": rows, "csv_mb": round(os.path.getsize(path) / 1e6, 1),
+            "full_peak_mb": full_mb, "full_s": full_s, "chunked_peak_mb": chunked_mb, "chunked_s": chunked_s,
+            "same_summary": full == chunked}
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark agregasi log per chunk...")
+    print(benchmark_aggregate())
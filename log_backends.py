@@ -0,0 +1,91 @@
+# log_backends.py
+# Pemilihan backend log deteksi dari konfigurasi (dipakai dashboard & tool CLI).
+# - backend_path: file / folder log mentah untuk backend
+# - sink_factory_for: factory sink (CSV berotasi, Parquet, SQLite, runs) + rollup jika aktif
+# - iter_backend_chunks: baca rentang tanggal dari backend mana pun sebagai chunk ringkas
+#   (log_aggregate.compact_frame), untuk agregasi / laporan di luar dashboard
+
+import os
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from log_writer import CsvLogSink
+
+LOG_BACKENDS = ["csv", "parquet", "sqlite", "runs"]
+
+
+def backend_path(backend: str, config: Dict[str, Any]) -> str:
+    """File / folder log mentah untuk backend (default sama dengan DEFAULT_CONFIG)."""
+    if backend == "parquet":
+        return config.get("parquet_dir", "deteksi_ombak_parquet")
+    if backend == "sqlite":
+        return config.get("sqlite_path", "deteksi_ombak.db")
+    if backend == "runs":
+        return config.get("runs_path", "deteksi_ombak.runs.db")
+    return config.get("csv_path", "deteksi_ombak.csv")
+
+
+def sink_factory_for(backend: str, config: Dict[str, Any]) -> Callable[[str], Any]:
+    """Factory sink (path -> sink) sesuai backend & opsi rotasi / rollup di config."""
+    from log_parquet import ParquetLogSink
+    from log_rollup import RollupSink, rollup_path_for
+    from log_rotation import RotatingCsvSink
+    from log_runs import RunLengthSink
+    from log_sqlite import SqliteLogSink
+
+    sink_factory = {"parquet": ParquetLogSink, "sqlite": SqliteLogSink}.get(backend, CsvLogSink)
+    if backend == "parquet":
+        sink_factory = lambda path: ParquetLogSink(path, part_max_age_sec=config.get("parquet_part_max_age_sec", 10.0))
+    if backend == "runs":
+        sink_factory = lambda path: RunLengthSink(
+            path, peak_delta=config.get("run_peak_delta", 10), heartbeat_sec=config.get("run_heartbeat_sec", 300),
+            max_gap_sec=config.get("run_max_gap_factor", 3) * config.get("sample_every_sec", 2))
+    rotate_bytes = int(float(config.get("log_rotate_max_mb", 50) or 0) * 1024 * 1024) or None
+    if sink_factory is CsvLogSink and (config.get("log_rotate_daily", True) or rotate_bytes):
+        sink_factory = lambda path: RotatingCsvSink(path, max_bytes=rotate_bytes,
+                                                    rotate_daily=config.get("log_rotate_daily", True),
+                                                    compress=config.get("log_compress_segments", True))
+    if config.get("enable_rollups", True):
+        # Rollup menit/jam/hari dihitung di thread writer, di samping log mentah
+        raw_factory = sink_factory
+        sink_factory = lambda path: RollupSink(raw_factory(path), rollup_path_for(path))
+    return sink_factory
+
+
+def iter_backend_chunks(backend: str, path: str, start: date, end: date,
+                        config: Optional[Dict[str, Any]] = None) -> Iterator:
+    """
+    Chunk ringkas (urut waktu) untuk [start, end] (date, inklusif) dari backend.
+    CSV dibaca per chunk dari segmen rotasi + file aktif; backend lain per hari.
+    """
+    from log_aggregate import compact_frame, iter_log_chunks
+    config = config or {}
+    if backend == "csv":
+        from log_rotation import list_segments
+        files = [seg["path"] for seg in list_segments(path, start, end)] + [path]
+        for file in files:
+            if not os.path.exists(file) and os.path.exists(file + ".gz"):
+                file += ".gz"  # segmen dikompres sejak manifest dibaca
+            if os.path.exists(file) and os.path.getsize(file) > 0:
+                yield from iter_log_chunks(file, start, end)
+        return
+    if not os.path.exists(path):
+        return
+    if backend == "parquet":
+        from log_parquet import ParquetLogStore
+        read_day = lambda day: ParquetLogStore(path).read_range(day, day)
+    elif backend == "sqlite":
+        from log_sqlite import get_sqlite_store
+        read_day = lambda day: get_sqlite_store(path).read_range(day, day)
+    elif backend == "runs":
+        from log_runs import RunLengthStore
+        read_day = lambda day: RunLengthStore(path).expand_range(day, day,
+                                                                 freq_sec=config.get("sample_every_sec", 2))
+    else:
+        raise ValueError(f"Unknown log backend: {backend}")
+    day = start
+    while day <= end:
+        df = read_day(day)
+        if len(df):
+            yield compact_frame(df)
+        day += timedelta(days=1)
@@ -0,0 +1,172 @@
+# log_csv_cache.py
+# Loader CSV log inkremental untuk TAB_LOG.
+# - Ingat byte offset + DataFrame hasil parse sebelumnya; rerun berikutnya hanya
+#   mem-parse baris yang ditambahkan sejak itu (termasuk pd.to_datetime)
+# - Invalidasi otomatis saat file dirotasi / dipotong / ditulis ulang
+#   (inode, ukuran, mtime, dan sidik byte sebelum offset)
+# - DataFrame disimpan dengan dtype ringkas (log_aggregate.compact_frame): tanpa kolom string
+#   timestamp / tanggal / jam, status kategori
+# - Cache di level modul: dipakai bersama semua sesi Streamlit dalam proses yang sama
+
+import io
+import os
+import threading
+from typing import Dict, List, Optional
+
+from log_aggregate import compact_frame, concat_compact
+
+_FINGERPRINT_BYTES = 64
+
+
+class _CsvState:
+    __slots__ = ("inode", "size", "mtime", "offset", "fingerprint", "header", "df", "lock")
+
+    def __init__(self):
+        self.inode = None
+        self.size = 0
+        self.mtime = 0.0
+        self.offset = 0
+        self.fingerprint = b""
+        self.header: Optional[List[str]] = None
+        self.df = None
+        self.lock = threading.Lock()
+
+
+_states: Dict[str, _CsvState] = {}
+_states_lock = threading.Lock()
+
+
+def add_waktu_column(df):
+    """Tambah kolom 'waktu' (datetime) dari timestamp, atau tanggal + jam untuk log lama."""
+    import pandas as pd
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format="ISO8601", errors='coerce')
+        df['waktu'] = df['timestamp']
+    elif {'tanggal', 'jam'}.issubset(df.columns):
+        df['waktu'] = pd.to_datetime(df['tanggal'].astype(str) + " " + df['jam'].astype(str), errors='coerce')
+    else:
+        df['waktu'] = pd.NaT
+    return df
+
+
+def _read_fingerprint(f, offset: int) -> bytes:
+    start = max(0, offset - _FINGERPRINT_BYTES)
+    f.seek(start)
+    return f.read(offset - start)
+
+
+def _parse(chunk: bytes, header: List[str]):
+    import pandas as pd
+    return compact_frame(pd.read_csv(io.BytesIO(chunk), header=None, names=header))
+
+
+def _reload(state: _CsvState, path: str, st):
+    import pandas as pd
+    with open(path, "rb") as f:
+        data = f.read()
+    end = data.rfind(b"\n") + 1  # baris terakhir yang belum lengkap ditunda ke read berikutnya
+    raw = pd.read_csv(io.BytesIO(data[:end])) if end else None
+    state.header = list(raw.columns) if end else None
+    state.df = compact_frame(raw) if end else pd.DataFrame()
+    state.offset = end
+    state.fingerprint = data[max(0, end - _FINGERPRINT_BYTES):end]
+    state.inode, state.size, state.mtime = st.st_ino, st.st_size, st.st_mtime
+
+
+def _append(state: _CsvState, path: str, st) -> bool:
+    """Parse baris baru setelah offset. Return False jika file ternyata ditulis ulang."""
+    with open(path, "rb") as f:
+        if _read_fingerprint(f, state.offset) != state.fingerprint:
+            return False
+        f.seek(state.offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if end:
+        new = _parse(data[:end], state.header)
+        state.df = concat_compact([state.df, new])
+        state.offset += end
+        state.fingerprint = (state.fingerprint + data[:end])[-_FINGERPRINT_BYTES:]
+    state.size, state.mtime = st.st_size, st.st_mtime
+    return True
+
+
+def load_csv_incremental(path: str):
+    """
+    Baca CSV log sebagai DataFrame (dengan kolom 'waktu'), inkremental.
+
+    DataFrame yang dikembalikan dipakai bersama antar sesi: anggap read-only
+    (pakai .copy() sebelum mengubah). Raise FileNotFoundError jika file tidak ada.
+    """
+    key = os.path.abspath(path)
+    with _states_lock:
+        state = _states.setdefault(key, _CsvState())
+
+    with state.lock:
+        st = os.stat(path)
+        if state.df is None or st.st_ino != state.inode or st.st_size < state.offset:
+            # Pertama kali, rotasi (inode baru), atau file dipotong
+            _reload(state, path, st)
+        elif st.st_size == state.size:
+            if st.st_mtime != state.mtime:
+                # Ukuran sama tapi mtime berubah: ditulis ulang di tempat
+                _reload(state, path, st)
+        elif state.header is None or not _append(state, path, st):
+            _reload(state, path, st)
+        return state.df
+
+
+def clear_csv_cache(path: Optional[str] = None):
+    """Buang cache satu path (atau semua)."""
+    with _states_lock:
+        if path is None:
+            _states.clear()
+        else:
+            _states.pop(os.path.abspath(path), None)
+
+
+def benchmark_csv_cache(rows: int = 300000, append_rows: int = 50) -> Dict:
+    """Bandingkan read_csv penuh tiap rerun vs loader inkremental setelah append kecil."""
+    import csv
+    import tempfile
+    import time
+    import pandas as pd
+    from log_writer import CSV_FIELDS, STATUS_LEVELS, make_log_row
+
+    path = os.path.join(tempfile.mkdtemp(prefix="log_csv_cache_bench_"), "log.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(make_log_row(i, 150 + i % 200, STATUS_LEVELS[i % len(STATUS_LEVELS)], 0) for i in range(rows))
+
+    t0 = time.perf_counter()
+    load_csv_incremental(path)
+    first_sec = time.perf_counter() - t0
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=CSV_FIELDS).writerows(
+            make_log_row(rows + i, 200, "Tenang", 0) for i in range(append_rows))
+
+    t0 = time.perf_counter()
+    full = add_waktu_column(pd.read_csv(path))
+    full_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    df = load_csv_incremental(path)
+    incr_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    load_csv_incremental(path)
+    unchanged_sec = time.perf_counter() - t0
+
+    return {
+        "rows": [len(full), len(df)],
+        "first_load_ms": round(first_sec * 1000, 1),
+        "full_reparse_ms": round(full_sec * 1000, 1),
+        "incremental_ms": round(incr_sec * 1000, 1),
+        "unchanged_ms": round(unchanged_sec * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark CSV loader (read_csv penuh vs inkremental)...")
+    print(benchmark_csv_cache())
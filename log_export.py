@@ -0,0 +1,257 @@
+# log_export.py
+# Export rentang log deteksi ke CSV / Parquet / NDJSON secara streaming.
+# - Data dibaca per chunk langsung dari backend log (log_backends.iter_backend_chunks)
+#   dan ditulis per chunk; rentang penuh tidak pernah dimuat ke memori
+# - Pilihan kolom dan resampling (mis. "1min", "1h"): bucket yang terpotong di batas chunk
+#   dibawa ke chunk berikutnya, jadi hasil sama dengan resample sekali jalan
+# - Resample: n, rata-rata / min / max peak Y, status paling parah, max extreme, ada alert
+#
+# CLI: python log_export.py --start 2025-10-01 --end 2025-10-31 --format parquet -o oktober.parquet
+
+import importlib.util
+import os
+import sys
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+from log_writer import STATUS_LEVELS
+
+EXPORT_FORMATS = ("csv", "parquet", "ndjson")
+RAW_COLUMNS = ["timestamp", "frame", "puncak_ombak_y", "status_ombak", "jumlah_garis_terdeteksi",
+               "extreme_count", "alert_sent"]
+RESAMPLED_COLUMNS = ["timestamp", "n", "frame", "puncak_ombak_y", "min_y", "max_y", "status_ombak",
+                     "jumlah_garis_terdeteksi", "extreme_count", "alert_sent"]
+_STATUS_LEVEL = {s: i for i, s in enumerate(STATUS_LEVELS)}
+
+DateLike = Union[date, datetime]
+
+
+def _as_bounds(start: DateLike, end: DateLike):
+    """date -> hari penuh (end eksklusif hari berikutnya); datetime -> batas inklusif."""
+    import pandas as pd
+    lo = pd.Timestamp(start if isinstance(start, datetime) else datetime.combine(start, dtime.min))
+    if isinstance(end, datetime):
+        return lo, pd.Timestamp(end), True
+    return lo, pd.Timestamp(datetime.combine(end + timedelta(days=1), dtime.min)), False
+
+
+def _day(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _resample_frame(df, key):
+    """Satu grup bucket -> satu row (kolom RESAMPLED_COLUMNS yang tersedia)."""
+    import numpy as np
+    import pandas as pd
+    g = df.groupby(key.to_numpy())
+    out = pd.DataFrame({"timestamp": g.size().index, "n": g.size().to_numpy()})
+    if 'frame' in df.columns:
+        out["frame"] = g["frame"].last().to_numpy()
+    if 'puncak_ombak_y' in df.columns:
+        y = df['puncak_ombak_y'].astype("float64").groupby(key.to_numpy())
+        out["puncak_ombak_y"] = y.mean().round(1).to_numpy()
+        out["min_y"] = y.min().to_numpy()
+        out["max_y"] = y.max().to_numpy()
+    if 'status_ombak' in df.columns:
+        # Status paling parah di bucket (urut STATUS_LEVELS); status lain dipakai jika tidak ada yang dikenal
+        level = df['status_ombak'].astype(str).map(_STATUS_LEVEL).fillna(-1).astype(int)
+        worst = level.groupby(key.to_numpy()).max().to_numpy()
+        first = g["status_ombak"].first().astype(str).to_numpy()
+        out["status_ombak"] = np.where(worst >= 0, np.array(STATUS_LEVELS, dtype=object)[np.maximum(worst, 0)], first)
+    if 'jumlah_garis_terdeteksi' in df.columns:
+        out["jumlah_garis_terdeteksi"] = df['jumlah_garis_terdeteksi'].astype("float64") \
+            .groupby(key.to_numpy()).mean().round(1).to_numpy()
+    if 'extreme_count' in df.columns:
+        out["extreme_count"] = g["extreme_count"].max().to_numpy()
+    if 'alert_sent' in df.columns:
+        out["alert_sent"] = g["alert_sent"].any().to_numpy()
+    return out
+
+
+def iter_export_chunks(backend: str, path: str, start: DateLike, end: DateLike,
+                       columns: Optional[Sequence[str]] = None, resample: Optional[str] = None,
+                       config: Optional[Dict[str, Any]] = None) -> Iterator:
+    """
+    Chunk DataFrame siap tulis untuk [start, end] (date = hari penuh, datetime = presisi waktu).
+
+    Args:
+        columns: subset RAW_COLUMNS (atau RESAMPLED_COLUMNS jika resample); default semua
+        resample: frekuensi tetap pandas ("30s", "1min", "1h", "1D"); None = row mentah
+    """
+    import pandas as pd
+    from log_aggregate import concat_compact
+    from log_backends import iter_backend_chunks
+
+    available = RESAMPLED_COLUMNS if resample else RAW_COLUMNS
+    if columns:
+        unknown = [c for c in columns if c not in available]
+        if unknown:
+            raise ValueError(f"Kolom tidak dikenal: {unknown} (tersedia: {', '.join(available)})")
+    if resample:
+        pd.Timestamp("2000-01-01").floor(resample)  # validasi: hanya frekuensi tetap
+
+    lo, hi, hi_inclusive = _as_bounds(start, end)
+
+    def clipped():
+        for chunk in iter_backend_chunks(backend, path, _day(start), _day(end), config):
+            w = chunk['waktu']
+            chunk = chunk.loc[(w >= lo) & ((w <= hi) if hi_inclusive else (w < hi))]
+            if len(chunk):
+                yield chunk
+
+    def finish(df):
+        if not resample:
+            df = df.rename(columns={"waktu": "timestamp"})
+        cols = [c for c in (columns or available) if c in df.columns]
+        df = df[cols]
+        if 'status_ombak' in df.columns:
+            df = df.assign(status_ombak=df['status_ombak'].astype(str))  # kategori beda per chunk
+        return df.reset_index(drop=True)
+
+    if not resample:
+        for chunk in clipped():
+            yield finish(chunk)
+        return
+
+    carry = None
+    for chunk in clipped():
+        if carry is not None:
+            chunk = concat_compact([carry, chunk])
+        key = chunk['waktu'].dt.floor(resample)
+        done = (key < key.iloc[-1]).to_numpy()  # bucket terakhir mungkin berlanjut di chunk berikutnya
+        carry = chunk.loc[~done]
+        if done.any():
+            yield finish(_resample_frame(chunk.loc[done], key[done]))
+    if carry is not None and len(carry):
+        yield finish(_resample_frame(carry, carry['waktu'].dt.floor(resample)))
+
+
+def export_range(out: str, backend: str, path: str, start: DateLike, end: DateLike, fmt: str = "csv",
+                 columns: Optional[Sequence[str]] = None, resample: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None, stream=None) -> Dict[str, int]:
+    """
+    Tulis rentang ke file out (atau stream teks untuk csv / ndjson, mis. sys.stdout).
+
+    Returns:
+        dict rows, chunks
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    stats = {"rows": 0, "chunks": 0}
+    chunks = iter_export_chunks(backend, path, start, end, columns, resample, config)
+
+    if fmt == "parquet":
+        if importlib.util.find_spec("pyarrow") is None:
+            raise RuntimeError("Export Parquet butuh paket pyarrow (pip install pyarrow)")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        tmp = out + ".tmp"
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp, schema, compression="zstd")
+                writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+                stats["rows"] += len(chunk)
+                stats["chunks"] += 1
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:  # rentang kosong: tetap buat file dengan kolom yang diminta
+            import pandas as pd
+            cols = list(columns or (RESAMPLED_COLUMNS if resample else RAW_COLUMNS))
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=cols), preserve_index=False), tmp)
+        os.replace(tmp, out)
+        return stats
+
+    f = stream or open(out, "w", newline="", encoding="utf-8")
+    try:
+        header = True
+        for chunk in chunks:
+            if fmt == "csv":
+                chunk.to_csv(f, header=header, index=False)
+            else:
+                f.write(chunk.to_json(orient="records", lines=True, date_format="iso", date_unit="us"))
+                if not chunk.empty:
+                    f.write("\n")
+            header = False
+            stats["rows"] += len(chunk)
+            stats["chunks"] += 1
+        if header and fmt == "csv":
+            f.write(",".join(columns or (RESAMPLED_COLUMNS if resample else RAW_COLUMNS)) + "\n")
+    finally:
+        if stream is None:
+            f.close()
+        else:
+            f.flush()
+    return stats
+
+
+def benchmark_export(rows: int = 1000000) -> Dict:
+    """Export CSV log besar ke Parquet & NDJSON (resample 1 menit): waktu + puncak memori (tracemalloc)."""
+    import tempfile
+    import time
+    import tracemalloc
+    import numpy as np
+    import pandas as pd
+
+    tmpdir = tempfile.mkdtemp(prefix="log_export_bench_")
+    path = os.path.join(tmpdir, "deteksi_ombak.csv")
+    ts = pd.date_range("2024-01-01", periods=rows, freq="2s")
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%f"), "tanggal": ts.strftime("%Y-%m-%d %H:%M:%S"),
+        "jam": ts.strftime("%H:%M:%S"), "frame": np.arange(rows), "puncak_ombak_y": rng.integers(0, 400, rows),
+        "status_ombak": np.array(STATUS_LEVELS)[rng.integers(0, len(STATUS_LEVELS), rows)],
+        "jumlah_garis_terdeteksi": rng.integers(0, 20, rows), "extreme_count": rng.integers(0, 5, rows),
+        "alert_sent": rng.random(rows) < 0.001,
+    }).to_csv(path, index=False)
+
+    result = {"rows": rows, "csv_mb": round(os.path.getsize(path) / 1e6, 1)}
+    for name, fmt, resample in (("parquet", "parquet", None), ("ndjson_1min", "ndjson", "1min")):
+        out = os.path.join(tmpdir, f"export.{fmt}")
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        stats = export_range(out, "csv", path, ts[0].date(), ts[-1].date(), fmt, resample=resample)
+        result[name] = {"rows": stats["rows"], "seconds": round(time.perf_counter() - t0, 2),
+                        "peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 1),
+                        "out_mb": round(os.path.getsize(out) / 1e6, 1)}
+        tracemalloc.stop()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from dashboard_config import load_config
+    from log_backends import LOG_BACKENDS, backend_path
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Export rentang log deteksi (streaming, per chunk)")
+    parser.add_argument("--start", help="YYYY-MM-DD atau YYYY-MM-DDTHH:MM[:SS] (default: hari ini)")
+    parser.add_argument("--end", help="YYYY-MM-DD atau YYYY-MM-DDTHH:MM[:SS] (default: sama dengan start)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--columns", help="kolom dipisah koma (default semua)")
+    parser.add_argument("--resample", help='frekuensi tetap pandas, mis. "30s", "1min", "1h"')
+    parser.add_argument("--backend", choices=LOG_BACKENDS, default=config.get("log_backend", "csv"))
+    parser.add_argument("--source", help="file / folder log (default: sesuai config backend)")
+    parser.add_argument("-o", "--output", default="-", help='file output ("-" = stdout untuk csv / ndjson)')
+    parser.add_argument("--benchmark", action="store_true", help="jalankan benchmark export saja")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("🔍 Benchmark export log...")
+        print(benchmark_export())
+        sys.exit(0)
+
+    parse = lambda s: datetime.fromisoformat(s) if "T" in s or " " in s else date.fromisoformat(s)
+    start = parse(args.start) if args.start else date.today()
+    end = parse(args.end) if args.end else start
+    source = args.source or backend_path(args.backend, config)
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    if args.output == "-" and args.format == "parquet":
+        parser.error("Parquet butuh file output (-o file.parquet)")
+    stream = sys.stdout if args.output == "-" else None
+    stats = export_range(args.output, args.backend, source, start, end, args.format, columns, args.resample,
+                         config, stream=stream)
+    print(f"✅ {stats['rows']} row ({stats['chunks']} chunk) -> {args.output}", file=sys.stderr)
@@ -0,0 +1,351 @@
+# log_import.py
+# Import / migrasi log deteksi lama ke backend log aktif (streaming, memori konstan).
+# - JSON array skema lama (deteksi_ombak.json, tanpa extreme_count / alert_sent), JSON lines,
+#   dan CSV (termasuk segmen .csv.gz hasil rotasi) dibaca per potongan, tidak dimuat utuh
+# - Row dinormalisasi ke skema CSV_FIELDS (make_log_row)
+# - Dedup per timestamp lewat tabel staging SQLite di disk (bukan set di RAM);
+#   jika timestamp sama, row skema baru menang atas row skema lama
+# - Timestamp yang sudah ada di backend tujuan dilewati, lalu row ditulis urut waktu per batch
+#   langsung ke sink (tanpa queue writer background yang bisa membuang row)
+# Jalankan saat dashboard berhenti (sink tujuan dibuka langsung oleh tool ini).
+
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from log_writer import make_log_row
+
+DEFAULT_BATCH_ROWS = 5000
+_READ_CHUNK = 1 << 16
+_SOURCE_PATTERNS = (".json", ".jsonl", ".ndjson", ".csv")
+
+_STAGING_SCHEMA = """
+CREATE TABLE staged (ts TEXT PRIMARY KEY, complete INTEGER NOT NULL, row TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE existing (ts TEXT PRIMARY KEY) WITHOUT ROWID;
+"""
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_json_records(path: str, chunk_size: int = _READ_CHUNK) -> Iterator[Dict]:
+    """
+    Object satu per satu dari JSON array ([{...}, ...]) atau JSON lines, dibaca per chunk.
+
+    Memori sebanding ukuran satu object, bukan ukuran file.
+    """
+    decoder = json.JSONDecoder()
+    with _open_text(path) as f:
+        buf, pos, eof, started = "", 0, False, False
+        while True:
+            # Lewati whitespace / pemisah ',' (isi ulang buffer jika habis)
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+            if pos >= len(buf) or buf[pos] == "]":
+                return
+            if not started:
+                started = True
+                if buf[pos] == "[":
+                    pos += 1
+                    continue
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if isinstance(obj, dict):
+                yield obj
+            pos = end
+
+
+def iter_csv_records(path: str) -> Iterator[Dict]:
+    """Row CSV (skema lama atau baru, .csv atau .csv.gz) sebagai dict."""
+    with _open_text(path) as f:
+        yield from csv.DictReader(f)
+
+
+def iter_source_records(path: str) -> Iterator[Dict]:
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return iter_csv_records(path)
+    return iter_json_records(path)
+
+
+def expand_sources(paths: Iterable[str]) -> List[str]:
+    """File log dari argumen (folder -> semua *.json/*.jsonl/*.ndjson/*.csv, juga versi .gz)."""
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                base = name[:-3] if name.endswith(".gz") else name
+                if base.endswith(_SOURCE_PATTERNS) and not base.endswith(".manifest.json"):
+                    out.append(os.path.join(path, name))
+        else:
+            out.append(path)
+    return out
+
+
+def _to_int(value, default: int = 0) -> int:
+    if value is None or value == "":
+        return default
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _parse_timestamp(raw: Dict) -> Optional[datetime]:
+    ts = raw.get("timestamp")
+    if ts:
+        try:
+            return datetime.fromisoformat(str(ts).strip())
+        except ValueError:
+            pass
+    # Skema lama tanpa timestamp: tanggal (YYYY-MM-DD atau YYYY-MM-DD HH:MM:SS) + jam
+    tanggal, jam = str(raw.get("tanggal") or "").strip(), str(raw.get("jam") or "").strip()
+    if not tanggal:
+        return None
+    text = tanggal if " " in tanggal or not jam else f"{tanggal} {jam}"
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def normalize_row(raw: Dict) -> Optional[Dict]:
+    """Row skema apa pun -> skema CSV_FIELDS; None jika waktu tidak bisa dibaca."""
+    ts = _parse_timestamp(raw)
+    if ts is None:
+        return None
+    return make_log_row(
+        _to_int(raw.get("frame")),
+        _to_int(raw.get("puncak_ombak_y")),
+        str(raw.get("status_ombak") or ""),
+        _to_int(raw.get("jumlah_garis_terdeteksi")),
+        _to_int(raw.get("extreme_count")),
+        _to_bool(raw.get("alert_sent", False)),
+        ts=ts,
+    )
+
+
+def _ts_key(value) -> str:
+    """Kunci dedup: ISO dengan mikrodetik tetap (sama dengan _ts_text log_sqlite)."""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat(timespec="microseconds")
+
+
+def existing_timestamps(backend: str, path: str) -> Iterator[str]:
+    """Kunci timestamp yang sudah ada di backend tujuan (dibaca streaming)."""
+    if backend == "sqlite":
+        if os.path.exists(path):
+            conn = sqlite3.connect(path)
+            try:
+                for (ts,) in conn.execute("SELECT timestamp FROM detections"):
+                    yield ts
+            except sqlite3.OperationalError:
+                pass  # database belum punya tabel
+            finally:
+                conn.close()
+    elif backend == "parquet":
+        from log_parquet import ParquetLogStore
+        for table in ParquetLogStore(path).iter_tables(columns=["timestamp"]):
+            for ts in table.column("timestamp").to_pylist():
+                yield _ts_key(ts)
+    elif backend == "csv":
+        from log_rotation import list_segments
+        files = [seg["path"] for seg in list_segments(path)] + [path]
+        for file in files:
+            if not os.path.exists(file) and os.path.exists(file + ".gz"):
+                file += ".gz"
+            if not os.path.exists(file):
+                continue
+            for raw in iter_csv_records(file):
+                ts = _parse_timestamp(raw)
+                if ts is not None:
+                    yield _ts_key(ts)
+
+
+def _runs_cutoff(path: str) -> Optional[str]:
+    """Backend runs hanya bisa ditambah di ujung: row <= akhir run terakhir dilewati."""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT MAX(end) FROM runs").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def import_logs(sources: Iterable[str], backend: str, path: str, config: Optional[Dict[str, Any]] = None,
+                batch_rows: int = DEFAULT_BATCH_ROWS, progress=None) -> Dict[str, int]:
+    """
+    Import file log lama ke backend (csv / parquet / sqlite / runs) di path.
+
+    Args:
+        sources: file atau folder log (JSON array, JSON lines, CSV, .gz)
+        config: opsi sink (rotasi, rollup, runs); default dashboard_config
+        progress: callback(stage, count) opsional
+
+    Returns:
+        dict read, invalid, duplicates, existing, written
+    """
+    from log_backends import sink_factory_for
+    if config is None:
+        from dashboard_config import load_config
+        config = load_config()
+
+    stats = {"read": 0, "invalid": 0, "duplicates": 0, "existing": 0, "written": 0}
+    staging_dir = tempfile.mkdtemp(prefix="log_import_")
+    staging_path = os.path.join(staging_dir, "staging.db")
+    conn = sqlite3.connect(staging_path, isolation_level=None)
+    try:
+        conn.executescript(_STAGING_SCHEMA)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+
+        # 1) Staging: normalisasi + dedup per timestamp (row skema baru menang)
+        upsert = ("INSERT INTO staged (ts, complete, row) VALUES (?, ?, ?) "
+                  "ON CONFLICT(ts) DO UPDATE SET complete = excluded.complete, row = excluded.row "
+                  "WHERE excluded.complete > staged.complete")
+        for source in expand_sources(sources):
+            batch = []
+            for raw in iter_source_records(source):
+                stats["read"] += 1
+                row = normalize_row(raw)
+                if row is None:
+                    stats["invalid"] += 1
+                    continue
+                complete = int("extreme_count" in raw and "alert_sent" in raw)
+                batch.append((_ts_key(row["timestamp"]), complete, json.dumps(row, ensure_ascii=False)))
+                if len(batch) >= batch_rows:
+                    with conn:
+                        conn.execute("BEGIN")
+                        conn.executemany(upsert, batch)
+                    batch = []
+                    if progress:
+                        progress("read", stats["read"])
+            if batch:
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany(upsert, batch)
+        staged = conn.execute("SELECT COUNT(*) FROM staged").fetchone()[0]
+        stats["duplicates"] = stats["read"] - stats["invalid"] - staged
+
+        # 2) Timestamp yang sudah ada di tujuan
+        cutoff = _runs_cutoff(path) if backend == "runs" else None
+        keys = existing_timestamps(backend, path)
+        while True:
+            batch = [(k,) for _, k in zip(range(batch_rows * 4), keys)]
+            if not batch:
+                break
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR IGNORE INTO existing (ts) VALUES (?)", batch)
+
+        # 3) Tulis urut waktu per batch langsung ke sink tujuan
+        query = "SELECT row FROM staged WHERE ts NOT IN (SELECT ts FROM existing)"
+        params = []
+        if cutoff:
+            query += " AND ts > ?"
+            params.append(cutoff)
+        sink = sink_factory_for(backend, config)(path)
+        try:
+            cursor = conn.execute(query + " ORDER BY ts", params)
+            while True:
+                rows = [json.loads(r[0]) for r in cursor.fetchmany(batch_rows)]
+                if not rows:
+                    break
+                sink.write_rows(rows)
+                sink.flush()
+                stats["written"] += len(rows)
+                if progress:
+                    progress("write", stats["written"])
+            sink.flush(fsync=True)
+        finally:
+            sink.close()
+        stats["existing"] = staged - stats["written"]
+    finally:
+        conn.close()
+        try:
+            os.remove(staging_path)
+            os.rmdir(staging_dir)
+        except OSError:
+            pass
+    return stats
+
+
+def benchmark_import(rows: int = 200000) -> Dict:
+    """Import JSON array skema lama berukuran besar (dengan duplikat) ke SQLite sementara."""
+    from datetime import timedelta
+    tmpdir = tempfile.mkdtemp(prefix="log_import_bench_")
+    src = os.path.join(tmpdir, "legacy.json")
+    start = datetime(2024, 1, 1)
+    with open(src, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(rows):
+            ts = start + timedelta(seconds=2 * (i % (rows - rows // 10)))  # ~10% duplikat
+            f.write(("," if i else "") + json.dumps({
+                "timestamp": ts.isoformat(), "tanggal": ts.strftime("%Y-%m-%d"), "jam": ts.strftime("%H:%M:%S"),
+                "frame": i, "puncak_ombak_y": 200 + i % 100, "status_ombak": "Tenang",
+                "jumlah_garis_terdeteksi": 3}, indent=4) + "\n")
+        f.write("]\n")
+    t0 = time.perf_counter()
+    stats = import_logs([src], "sqlite", os.path.join(tmpdir, "import.db"), config={"enable_rollups": False})
+    stats.update(source_mb=round(os.path.getsize(src) / 1e6, 1),
+                 seconds=round(time.perf_counter() - t0, 2))
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from dashboard_config import load_config
+    from log_backends import LOG_BACKENDS, backend_path
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Import log deteksi lama (JSON / CSV) ke backend log aktif")
+    parser.add_argument("sources", nargs="*", default=["deteksi_ombak.json"],
+                        help="file atau folder log (default: deteksi_ombak.json)")
+    parser.add_argument("--backend", choices=LOG_BACKENDS, default=config.get("log_backend", "csv"))
+    parser.add_argument("--target", help="file / folder tujuan (default: sesuai config backend)")
+    parser.add_argument("--benchmark", action="store_true", help="jalankan benchmark import saja")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("🔍 Benchmark import log lama...")
+        print(benchmark_import())
+    else:
+        target = args.target or backend_path(args.backend, config)
+        print(f"🔍 Import {', '.join(args.sources)} -> {args.backend}:{target}")
+        result = import_logs(args.sources, args.backend, target, config,
+                             progress=lambda stage, n: print(f"   {stage}: {n} row", end="\r"))
+        print(f"\n✅ {result}")
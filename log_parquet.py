@@ -0,0 +1,357 @@
+# log_parquet.py
+# Backend log deteksi berbasis Parquet, dipartisi per tanggal:
+#   <root>/date=YYYY-MM-DD/part-*.parquet   (ditulis writer selama hari berjalan)
+#   <root>/date=YYYY-MM-DD/day.parquet      (hasil compaction setelah hari berganti)
+# - Skema bertipe: status kategori (dictionary int8), int kecil, alert_sent bool
+# - Query rentang tanggal hanya membuka partisi + kolom yang dibutuhkan
+# - ParquetLogSink memakai interface sink log_writer (write_rows, flush, close)
+# Butuh paket pyarrow (opsional); tanggal/jam tidak disimpan (turunan dari timestamp).
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from log_writer import STATUS_LEVELS
+
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+PARQUET_COLUMNS = [
+    "timestamp", "frame", "puncak_ombak_y", "status_ombak",
+    "jumlah_garis_terdeteksi", "extreme_count", "alert_sent",
+]
+DEFAULT_ROWS_PER_PART = 5000
+DEFAULT_PART_MAX_AGE_SEC = 10.0  # row tertunda paling lama segini sebelum ditulis sebagai part
+DEFAULT_MAX_PARTS = 60           # lebih dari ini, partisi hari berjalan di-compact (jumlah file tetap kecil)
+COMPACT_FILE = "day.parquet"
+_COMPACTED_KEY = b"compacted_parts"
+_INT16_MAX = 32767
+
+DateLike = Union[date, datetime, str, None]
+
+
+def _pa():
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Backend Parquet butuh paket pyarrow (install: pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def parquet_schema():
+    """Skema Arrow untuk log deteksi."""
+    pa, _ = _pa()
+    return pa.schema([
+        ("timestamp", pa.timestamp("us")),
+        ("frame", pa.int32()),
+        ("puncak_ombak_y", pa.int16()),
+        ("status_ombak", pa.dictionary(pa.int8(), pa.string())),
+        ("jumlah_garis_terdeteksi", pa.int16()),
+        ("extreme_count", pa.int16()),
+        ("alert_sent", pa.bool_()),
+    ])
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _small_int(value) -> int:
+    # extreme_count bisa terus naik saat EXTREME berkepanjangan; saturasi di batas int16
+    return max(-_INT16_MAX, min(_INT16_MAX, int(value or 0)))
+
+
+def rows_to_table(rows: List[Dict]):
+    """Ubah row log (skema log_writer.CSV_FIELDS) menjadi pyarrow.Table bertipe."""
+    pa, _ = _pa()
+    schema = parquet_schema()
+    columns = {
+        "timestamp": [_to_datetime(r["timestamp"]) for r in rows],
+        "frame": [int(r.get("frame", 0) or 0) for r in rows],
+        "puncak_ombak_y": [_small_int(r.get("puncak_ombak_y")) for r in rows],
+        "status_ombak": [str(r.get("status_ombak", "")) for r in rows],
+        "jumlah_garis_terdeteksi": [_small_int(r.get("jumlah_garis_terdeteksi")) for r in rows],
+        "extreme_count": [_small_int(r.get("extreme_count")) for r in rows],
+        "alert_sent": [_to_bool(r.get("alert_sent", False)) for r in rows],
+    }
+    return pa.table({name: pa.array(columns[name], type=schema.field(name).type) for name in PARQUET_COLUMNS},
+                    schema=schema)
+
+
+def _as_day(value: DateLike, default: Optional[date]) -> Optional[date]:
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _to_datetime(value).date()
+
+
+class ParquetLogStore:
+    """
+    Pembaca log Parquet yang dipartisi per tanggal.
+
+    Args:
+        root: folder root partisi (dibuat saat penulisan pertama)
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _partition_dir(self, day: date) -> str:
+        return os.path.join(self.root, f"date={day.isoformat()}")
+
+    def partition_dates(self) -> List[date]:
+        """Daftar tanggal yang punya data (dari nama folder, tanpa membuka file)."""
+        if not os.path.isdir(self.root):
+            return []
+        days = []
+        for name in os.listdir(self.root):
+            if name.startswith("date="):
+                try:
+                    days.append(date.fromisoformat(name[5:]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def partition_files(self, day: date) -> List[str]:
+        """File aktif di satu partisi (part yang sudah masuk day.parquet dilewati)."""
+        _, pq = _pa()
+        folder = self._partition_dir(day)
+        try:
+            names = sorted(n for n in os.listdir(folder) if n.endswith(".parquet"))
+        except FileNotFoundError:
+            return []
+        skip = set()
+        if COMPACT_FILE in names:
+            meta = pq.read_schema(os.path.join(folder, COMPACT_FILE)).metadata or {}
+            skip = set(json.loads(meta.get(_COMPACTED_KEY, b"[]")))
+        return [os.path.join(folder, n) for n in names if n not in skip]
+
+    def iter_tables(self, start: DateLike = None, end: DateLike = None,
+                    columns: Optional[Sequence[str]] = None) -> Iterator:
+        """
+        Iterasi pyarrow.Table per file untuk rentang [start, end].
+        start/end berupa date (satu hari penuh, inklusif) atau datetime (presisi waktu).
+        Hanya partisi dalam rentang dan kolom yang diminta yang dibaca.
+        """
+        _, pq = _pa()
+        days = self.partition_dates()
+        if not days:
+            return
+        first = _as_day(start, days[0])
+        last = _as_day(end, days[-1])
+        filters = []
+        if isinstance(start, datetime):
+            filters.append(("timestamp", ">=", start))
+        if isinstance(end, datetime):
+            filters.append(("timestamp", "<=", end))
+        cols = list(columns) if columns else None
+
+        for day in days:
+            if day < first or day > last:
+                continue
+            for attempt in range(2):
+                try:
+                    tables = [pq.read_table(path, columns=cols, filters=filters or None)
+                              for path in self.partition_files(day)]
+                    break
+                except FileNotFoundError:
+                    # Part dihapus compaction di tengah pembacaan: baca ulang partisi
+                    if attempt:
+                        raise
+            yield from tables
+
+    def read_range(self, start: DateLike = None, end: DateLike = None,
+                   columns: Optional[Sequence[str]] = None):
+        """Baca rentang sebagai pandas.DataFrame (status_ombak bertipe category)."""
+        import pandas as pd
+        pa, _ = _pa()
+        tables = [t for t in self.iter_tables(start, end, columns) if t.num_rows]
+        if not tables:
+            return pd.DataFrame(columns=list(columns) if columns else PARQUET_COLUMNS)
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+
+class ParquetLogSink(ParquetLogStore):
+    """
+    Sink Parquet untuk BackgroundLogWriter.
+
+    Row dikumpulkan per tanggal lalu ditulis sebagai file part (atomic: tmp + rename)
+    saat flush() dan row tertua sudah menunggu part_max_age_sec, flush(fsync=True) (flush eksplisit /
+    interval fsync), close(), atau buffer satu tanggal mencapai rows_per_part. Partisi hari berjalan
+    di-compact jika part lebih dari max_parts; saat tanggal berganti, partisi hari sebelumnya digabung
+    menjadi day.parquet.
+
+    Args:
+        root: folder root partisi
+        rows_per_part: batas row per file part
+        part_max_age_sec: batas umur row di buffer (pembaca / API tertinggal paling lama segini)
+        max_parts: batas file part per partisi hari berjalan sebelum compaction
+    """
+
+    def __init__(self, root: str, rows_per_part: int = DEFAULT_ROWS_PER_PART,
+                 part_max_age_sec: float = DEFAULT_PART_MAX_AGE_SEC, max_parts: int = DEFAULT_MAX_PARTS):
+        _pa()
+        super().__init__(root)
+        self.rows_per_part = max(1, rows_per_part)
+        self.part_max_age_sec = part_max_age_sec
+        self.max_parts = max(2, max_parts)
+        self._pending: Dict[date, List[Dict]] = {}
+        self._pending_since: Dict[date, float] = {}
+        self._seq = 0
+        self._current_day: Optional[date] = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        # Partisi hari lalu yang belum sempat di-compact (mis. proses mati sebelum ganti hari)
+        today = date.today()
+        for day in self.partition_dates():
+            if day < today:
+                self.compact(day)
+
+    def write_rows(self, rows: List[Dict]):
+        with self._lock:
+            for row in rows:
+                day = _to_datetime(row["timestamp"]).date()
+                if day not in self._pending:
+                    self._pending[day] = []
+                    self._pending_since[day] = time.monotonic()
+                self._pending[day].append(row)
+                if self._current_day is None or day > self._current_day:
+                    previous, self._current_day = self._current_day, day
+                    if previous is not None:
+                        self._write_part(previous)
+                        self.compact(previous)
+            for day, pending in list(self._pending.items()):
+                if len(pending) >= self.rows_per_part:
+                    self._write_part(day)
+
+    def flush(self, fsync: bool = False):
+        # Parquet tidak bisa di-append: part ditulis jika buffer sudah cukup tua (pembaca tertinggal
+        # maks part_max_age_sec) atau pada flush "berat" (fsync); jumlah file dijaga lewat compaction.
+        now = time.monotonic()
+        with self._lock:
+            for day in list(self._pending):
+                if fsync or now - self._pending_since.get(day, now) >= self.part_max_age_sec:
+                    self._write_part(day)
+
+    def close(self):
+        self.flush(fsync=True)
+
+    def _write_part(self, day: date):
+        rows = self._pending.pop(day, None)
+        self._pending_since.pop(day, None)
+        if not rows:
+            return
+        _, pq = _pa()
+        folder = self._partition_dir(day)
+        os.makedirs(folder, exist_ok=True)
+        self._seq += 1
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._seq:04d}.parquet"
+        self._atomic_write(rows_to_table(rows), os.path.join(folder, name))
+        if day == self._current_day and len(self.partition_files(day)) > self.max_parts:
+            self.compact(day)
+
+    def _atomic_write(self, table, path: str):
+        _, pq = _pa()
+        tmp = path + ".tmp"
+        pq.write_table(table, tmp, compression="zstd", row_group_size=65536)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def compact(self, day: date) -> bool:
+        """Gabungkan semua file satu partisi menjadi day.parquet (urut timestamp)."""
+        pa, pq = _pa()
+        files = self.partition_files(day)
+        if len(files) <= 1 and (not files or os.path.basename(files[0]) == COMPACT_FILE):
+            return False
+        table = pa.concat_tables([pq.read_table(f) for f in files], promote_options="permissive")
+        table = table.sort_by("timestamp").cast(parquet_schema())
+        parts = [os.path.basename(f) for f in files if os.path.basename(f) != COMPACT_FILE]
+        # Daftar part yang sudah tergabung disimpan di metadata: pembaca melewati part
+        # tersebut walau file-nya belum sempat dihapus (tidak ada baris ganda). Compaction ulang
+        # (hari berjalan) mempertahankan daftar lama untuk part lama yang gagal dihapus.
+        compacted = os.path.join(self._partition_dir(day), COMPACT_FILE)
+        if os.path.exists(compacted):
+            meta = pq.read_schema(compacted).metadata or {}
+            leftover = [n for n in json.loads(meta.get(_COMPACTED_KEY, b"[]"))
+                        if os.path.exists(os.path.join(self._partition_dir(day), n))]
+        else:
+            leftover = []
+        skip = sorted(set(parts) | set(leftover))
+        table = table.replace_schema_metadata({_COMPACTED_KEY: json.dumps(skip).encode()})
+        self._atomic_write(table, os.path.join(self._partition_dir(day), COMPACT_FILE))
+        for name in parts:
+            try:
+                os.remove(os.path.join(self._partition_dir(day), name))
+            except FileNotFoundError:
+                pass
+        return True
+
+
+def get_parquet_writer(root: str, **options):
+    """BackgroundLogWriter singleton dengan sink Parquet (lihat log_writer.get_log_writer)."""
+    from log_writer import get_log_writer
+    return get_log_writer(root, sink_factory=ParquetLogSink, **options)
+
+
+def benchmark_range_query(rows_per_day: int = 40000, days: int = 7) -> Dict:
+    """Bandingkan baca CSV penuh + filter vs baca 1 partisi Parquet (satu hari, 3 kolom)."""
+    import csv
+    import tempfile
+    import pandas as pd
+    from log_writer import CSV_FIELDS, make_log_row
+
+    tmpdir = tempfile.mkdtemp(prefix="log_parquet_bench_")
+    csv_path = os.path.join(tmpdir, "log.csv")
+    sink = ParquetLogSink(os.path.join(tmpdir, "parquet"), rows_per_part=rows_per_day)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for d in range(days):
+            rows = [make_log_row(i, 150 + i % 200, STATUS_LEVELS[i % len(STATUS_LEVELS)], 0, i % 20, i % 997 == 0,
+                                 ts=start + timedelta(days=d, seconds=i * 86400 / rows_per_day))
+                    for i in range(rows_per_day)]
+            writer.writerows(rows)
+            sink.write_rows(rows)
+    sink.close()
+
+    target = (start + timedelta(days=days - 2)).date()
+    t0 = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    df["waktu"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    df = df[(df["waktu"] >= pd.to_datetime(target)) & (df["waktu"] < pd.to_datetime(target) + pd.Timedelta(days=1))]
+    csv_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    dfp = sink.read_range(target, target, columns=["timestamp", "puncak_ombak_y", "status_ombak"])
+    parquet_sec = time.perf_counter() - t0
+
+    size = lambda p: sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(p) for f in fs)
+    return {
+        "rows_total": rows_per_day * days,
+        "rows_selected": [len(df), len(dfp)],
+        "csv_read_filter_ms": round(csv_sec * 1000, 1),
+        "parquet_range_ms": round(parquet_sec * 1000, 1),
+        "csv_mb": round(os.path.getsize(csv_path) / 1e6, 2),
+        "parquet_mb": round(size(sink.root) / 1e6, 2),
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark query rentang tanggal (CSV penuh vs partisi Parquet)...")
+    print(benchmark_range_query())
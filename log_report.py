@@ -0,0 +1,372 @@
+# log_report.py
+# Laporan PDF deteksi ombak, dibuat di thread background dan di-cache di disk.
+# - Key cache: (sumber log, rentang, versi data); unduhan ulang tanpa perubahan data langsung dari file
+# - Isi: ringkasan, grafik peak Y & extreme count (LTTB, digambar langsung di canvas reportlab),
+#   tabel per jam / per hari multi-halaman, riwayat alert
+# - Tabel dibaca dari iterator row; halaman (pageCompression) tetap ditahan Canvas reportlab di memori
+#   sampai save(), lalu ditulis ke file tmp di folder cache
+
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+DEFAULT_REPORT_DIR = "reports"
+DEFAULT_MAX_CACHED = 20
+CHART_POINTS = 600
+
+
+def report_key(source: str, start, end, summary: Dict, extreme_threshold=None, period_res: str = "") -> str:
+    """Key cache laporan: sumber + rentang + versi data (jumlah row, waktu terakhir, jumlah alert)
+    + parameter yang mengubah isi PDF (garis threshold extreme, resolusi tabel periode)."""
+    version = f"{summary.get('total')}|{summary.get('waktu_max')}|{summary.get('alerts')}"
+    raw = f"{source}|{start}|{end}|{version}|{extreme_threshold}|{period_res}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _fmt(value, digits: int = 1) -> str:
+    if value is None:
+        return "-"
+    try:
+        if value != value:  # NaN
+            return "-"
+        if float(value).is_integer():
+            return str(int(value))
+        return f"{float(value):.{digits}f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class _PdfWriter:
+    """Canvas + posisi kursor; halaman baru otomatis saat ruang habis."""
+
+    def __init__(self, path: str, title: str):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import cm
+        from reportlab.pdfgen import canvas
+        self.cm = cm
+        self.W, self.H = A4
+        self.title = title
+        self.c = canvas.Canvas(path, pagesize=A4, pageCompression=1)
+        self.page = 0
+        self.y = 0.0
+        self.new_page()
+
+    def new_page(self):
+        c, cm = self.c, self.cm
+        if self.page:
+            self._footer()
+            c.showPage()
+        self.page += 1
+        c.setFont("Helvetica-Bold", 16 if self.page == 1 else 11)
+        c.drawString(2*cm, self.H-2*cm, self.title)
+        c.setFont("Helvetica", 10)
+        c.drawString(2*cm, self.H-2.6*cm, f"Dibuat: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        c.line(1.5*cm, self.H-2.8*cm, self.W-1.5*cm, self.H-2.8*cm)
+        self.y = self.H-3.6*cm
+
+    def _footer(self):
+        c, cm = self.c, self.cm
+        c.line(1.5*cm, 2*cm, self.W-1.5*cm, 2*cm)
+        c.setFont("Helvetica-Oblique", 9)
+        c.drawString(2*cm, 1.5*cm, "Generated by Ombak Dashboard + Tsunami Alert")
+        c.drawRightString(self.W-2*cm, 1.5*cm, f"Halaman {self.page}")
+
+    def ensure(self, height: float):
+        if self.y - height < 2.5*self.cm:
+            self.new_page()
+
+    def heading(self, text: str):
+        self.ensure(1.5*self.cm)
+        self.c.setFont("Helvetica-Bold", 12)
+        self.c.drawString(2*self.cm, self.y, text)
+        self.y -= 0.6*self.cm
+        self.c.setFont("Helvetica", 10)
+
+    def text(self, text: str, indent: float = 0.0, step: float = 0.6):
+        self.ensure(step*self.cm)
+        self.c.drawString((2+indent)*self.cm, self.y, text)
+        self.y -= step*self.cm
+
+    def chart(self, x, y, title: str, threshold: Optional[float] = None, height_cm: float = 6.0):
+        """Grafik garis sederhana (x datetime64, y numerik), sudah di-downsample oleh pemanggil."""
+        import numpy as np
+        cm, c = self.cm, self.c
+        self.ensure((height_cm + 1.6)*cm)
+        self.c.setFont("Helvetica-Bold", 10)
+        c.drawString(2*cm, self.y, title)
+        left, right = 3.2*cm, self.W-2*cm
+        top, bottom = self.y-0.4*cm, self.y-0.4*cm-height_cm*cm
+        t = np.asarray(x, dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+        v = np.asarray(y, dtype=np.float64)
+        ok = ~np.isnan(v)
+        t, v = t[ok], v[ok]
+        c.setFont("Helvetica", 8)
+        c.rect(left, bottom, right-left, top-bottom)
+        if len(v):
+            t0, t1 = t.min(), t.max()
+            v0, v1 = v.min(), v.max()
+            if threshold is not None:
+                v0, v1 = min(v0, threshold), max(v1, threshold)
+            if v1 == v0:
+                v0, v1 = v0-1, v1+1
+            px = left + (t - t0) / ((t1 - t0) or 1) * (right-left)
+            py = bottom + (v - v0) / (v1 - v0) * (top-bottom)
+            path = c.beginPath()
+            path.moveTo(px[0], py[0])
+            for a, b in zip(px[1:], py[1:]):
+                path.lineTo(a, b)
+            c.setStrokeColorRGB(0.1, 0.3, 0.8)
+            c.drawPath(path, stroke=1, fill=0)
+            if threshold is not None:
+                ty = bottom + (threshold - v0) / (v1 - v0) * (top-bottom)
+                c.setStrokeColorRGB(0.8, 0.1, 0.1)
+                c.setDash(4, 3)
+                c.line(left, ty, right, ty)
+                c.setDash()
+            c.setStrokeColorRGB(0, 0, 0)
+            c.drawRightString(left-0.1*cm, top-6, _fmt(v1))
+            c.drawRightString(left-0.1*cm, bottom, _fmt(v0))
+            fmt = lambda ns: str(np.datetime64(int(ns), "ns").astype("datetime64[s]")).replace("T", " ")
+            c.drawString(left, bottom-0.4*cm, fmt(t0))
+            c.drawRightString(right, bottom-0.4*cm, fmt(t1))
+        else:
+            c.drawString(left+0.3*cm, bottom+0.3*cm, "Tidak ada data")
+        self.y = bottom - 1.0*cm
+
+    def table(self, headers: Sequence[str], widths_cm: Sequence[float], rows: Iterable[Sequence]):
+        """Tabel multi-halaman; header diulang di tiap halaman. Row dibaca satu per satu."""
+        cm, c = self.cm, self.c
+        xs, x = [], 2*cm
+        for w in widths_cm:
+            xs.append(x)
+            x += w*cm
+
+        def header():
+            c.setFont("Helvetica-Bold", 9)
+            for xi, h in zip(xs, headers):
+                c.drawString(xi, self.y, h)
+            self.y -= 0.2*cm
+            c.line(2*cm, self.y, x, self.y)
+            self.y -= 0.4*cm
+            c.setFont("Helvetica", 9)
+
+        self.ensure(1.5*cm)
+        header()
+        for row in rows:
+            if self.y < 2.5*cm:
+                self.new_page()
+                header()
+            for xi, value in zip(xs, row):
+                c.drawString(xi, self.y, str(value)[:40])
+            self.y -= 0.45*cm
+        self.y -= 0.4*cm
+
+    def save(self):
+        self._footer()
+        self.c.showPage()
+        self.c.save()
+
+
+def render_report(path: str, summary: Dict, series=None, periods=None, alerts=None,
+                  period_label: str = "Per jam", extreme_threshold: Optional[float] = None,
+                  title: str = "Laporan Deteksi Ombak + Tsunami Alert") -> str:
+    """
+    Tulis laporan PDF ke path.
+
+    Args:
+        summary: ringkasan (format log_rollup.summarize_rows / RollupStore.summary)
+        series: DataFrame waktu, puncak_ombak_y, extreme_count (di-downsample LTTB ke CHART_POINTS)
+        periods: DataFrame / iterable row per periode (kolom log_aggregate.PERIOD_COLUMNS)
+        alerts: DataFrame riwayat alert (waktu, status_ombak, puncak_ombak_y, extreme_count)
+    """
+    pdf = _PdfWriter(path, title)
+
+    pdf.heading("Ringkasan")
+    pdf.text(f"Rentang data : {summary['waktu_min']}  s/d  {summary['waktu_max']}")
+    pdf.text(f"Jumlah entri : {summary['total']}")
+    if summary['min_y'] is not None:
+        pdf.text(f"Peak Y  (min/mean/max) : {summary['min_y']} / {summary['mean_y']} / {summary['max_y']}")
+    if summary['max_extreme'] is not None:
+        pdf.text(f"Maximum Extreme Count : {summary['max_extreme']}")
+    if summary['alerts'] is not None:
+        pdf.text(f"Jumlah Alert Tsunami : {summary['alerts']}")
+    if summary['status_counts']:
+        pdf.text("Distribusi status:", step=0.5)
+        for s, n in summary['status_counts'].items():
+            pdf.text(f"- {s}: {n}", indent=0.5, step=0.5)
+
+    if series is not None and len(series) and 'waktu' in series.columns:
+        from chart_downsample import downsample_frame
+        pdf.y -= 0.4*pdf.cm
+        pdf.heading("Grafik")
+        if 'puncak_ombak_y' in series.columns:
+            ds = downsample_frame(series, 'waktu', 'puncak_ombak_y', CHART_POINTS)
+            pdf.chart(ds['waktu'], ds['puncak_ombak_y'], "Puncak Ombak (Y) vs Waktu")
+        if 'extreme_count' in series.columns:
+            ds = downsample_frame(series, 'waktu', 'extreme_count', CHART_POINTS)
+            pdf.chart(ds['waktu'], ds['extreme_count'], "Extreme Count vs Waktu", threshold=extreme_threshold)
+
+    if periods is not None:
+        rows = periods.itertuples(index=False) if hasattr(periods, "itertuples") else periods
+        pdf.heading(f"Ringkasan {period_label.lower()}")
+        pdf.table(["Periode", "Jumlah", "Min Y", "Mean Y", "Max Y", "Max Extreme", "Alert"],
+                  [4.2, 2.0, 1.8, 1.8, 1.8, 2.4, 1.5],
+                  ((str(r[0])[:16], _fmt(r[1]), _fmt(r[2]), _fmt(r[3]), _fmt(r[4]), _fmt(r[5]), _fmt(r[6]))
+                   for r in rows))
+
+    if alerts is not None and len(alerts):
+        cols = [c for c in ('waktu', 'status_ombak', 'puncak_ombak_y', 'extreme_count') if c in alerts.columns]
+        pdf.heading("Riwayat Alert Tsunami")
+        pdf.table(["Waktu", "Status", "Peak Y", "Extreme Count"][:len(cols)], [4.2, 5.5, 2.0, 2.5][:len(cols)],
+                  ([str(v)[:19] if i == 0 else _fmt(v) for i, v in enumerate(r)]
+                   for r in alerts[cols].itertuples(index=False)))
+
+    pdf.save()
+    return path
+
+
+class ReportService:
+    """
+    Pembuat laporan di thread background + cache file PDF di disk.
+
+    Args:
+        cache_dir: folder PDF ({key}.pdf)
+        max_cached: jumlah PDF terbaru yang disimpan (yang lama dihapus)
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_REPORT_DIR, max_cached: int = DEFAULT_MAX_CACHED):
+        self.cache_dir = cache_dir
+        self.max_cached = max_cached
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def status(self, key: str) -> str:
+        """'done' (file ada), 'running', 'failed', atau 'missing' (belum dibuat / sudah terhapus _prune)."""
+        if os.path.exists(self.path_for(key)):
+            return "done"
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            return "missing"
+        if not job.done():
+            return "running"
+        return "failed" if job.exception() is not None else "missing"
+
+    def error(self, key: str) -> Optional[BaseException]:
+        with self._lock:
+            job = self._jobs.get(key)
+        return job.exception() if job is not None and job.done() else None
+
+    def submit(self, key: str, build: Callable[[str], None]) -> Optional[Future]:
+        """Antrikan build(path_tmp) jika PDF key belum ada / belum dibuat. None jika sudah ada di cache."""
+        if os.path.exists(self.path_for(key)):
+            return None
+        with self._lock:
+            # Job selesai tidak disimpan terus: yang gagal hanya diingat sampai ada submit lain
+            for other in [k for k, j in self._jobs.items() if k != key and j.done()]:
+                del self._jobs[other]
+            job = self._jobs.get(key)
+            if job is None or job.done():
+                job = self._pool.submit(self._run, key, build)
+                self._jobs[key] = job
+            return job
+
+    def _run(self, key: str, build: Callable[[str], None]):
+        path = self.path_for(key)
+        tmp = path + ".tmp"
+        t0 = time.perf_counter()
+        try:
+            build(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):  # build gagal: jangan tinggalkan PDF setengah jadi
+                os.remove(tmp)
+        with self._lock:
+            self._jobs.pop(key, None)  # status selanjutnya dari keberadaan file
+        print(f"📄 Laporan {key} selesai ({time.perf_counter() - t0:.1f} detik)")
+        self._prune()
+
+    def _prune(self):
+        files = sorted((os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".pdf")),
+                       key=os.path.getmtime, reverse=True)
+        for old in files[self.max_cached:]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Isi PDF; None jika file sudah terhapus (_prune dari build lain di antara status() dan read())."""
+        try:
+            with open(self.path_for(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+_services: Dict[str, ReportService] = {}
+_services_lock = threading.Lock()
+
+
+def get_report_service(cache_dir: str = DEFAULT_REPORT_DIR) -> ReportService:
+    """Service singleton per folder cache (dipakai bersama semua sesi Streamlit)."""
+    key = os.path.abspath(cache_dir)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = ReportService(cache_dir)
+            _services[key] = service
+        return service
+
+
+def benchmark_report(rows: int = 500000) -> Dict:
+    """Waktu buat PDF (cache dingin) vs ambil ulang dari cache untuk log 2 detik berminggu-minggu."""
+    import tempfile
+    import numpy as np
+    import pandas as pd
+    from log_aggregate import LogAggregator, compact_frame
+    from log_writer import STATUS_LEVELS
+
+    ts = pd.date_range("2024-01-01", periods=rows, freq="2s")
+    rng = np.random.default_rng(0)
+    agg = LogAggregator()
+    df = compact_frame(pd.DataFrame({
+        "timestamp": ts, "frame": np.arange(rows), "puncak_ombak_y": rng.integers(0, 400, rows),
+        "status_ombak": np.array(STATUS_LEVELS)[rng.integers(0, len(STATUS_LEVELS), rows)],
+        "extreme_count": rng.integers(0, 5, rows), "alert_sent": rng.random(rows) < 0.0005,
+    }))
+    for start in range(0, rows, 50000):
+        agg.add(df.iloc[start:start+50000])
+    summary = agg.summary()
+
+    service = ReportService(tempfile.mkdtemp(prefix="log_report_bench_"))
+    key = report_key("bench", ts[0].date(), ts[-1].date(), summary, 3, "hour")
+    build = lambda path: render_report(path, summary, agg.frame(), agg.period_table("hour"), agg.alert_rows(),
+                                       period_label="Per jam", extreme_threshold=3)
+    t0 = time.perf_counter()
+    service.submit(key, build).result()
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.submit(key, build)
+    data = service.read(key)
+    warm = time.perf_counter() - t0
+    return {"rows": rows, "pages": data.count(b"/Type /Page\n"), "pdf_kb": round(len(data) / 1024, 1),
+            "cold_s": round(cold, 2),
+            "cached_ms": round(warm * 1000, 2)}
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark laporan PDF (background + cache)...")
+    print(benchmark_report())
@@ -0,0 +1,325 @@
+# log_rollup.py
+# Rollup log deteksi per menit / jam / hari, dihitung saat tulis.
+# - RollupSink membungkus sink log apa pun (CSV / Parquet / SQLite): row tetap
+#   ditulis ke sink asli, statistik per bucket di-upsert ke <log>.rollup.db
+# - Per bucket: jumlah row, min/mean/max puncak_ombak_y, max extreme_count,
+#   jumlah alert, jumlah per status
+# - Grafik & ringkasan PDF untuk rentang minggu/bulan cukup membaca ratusan
+#   row rollup; resolusi dipilih otomatis dari rentang tanggal
+
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from log_writer import STATUS_LEVELS
+
+RESOLUTIONS = ("minute", "hour", "day")
+# Kolom jumlah per status (urutan sama dengan STATUS_LEVELS) + status lain
+STATUS_COLUMNS = ["s_tenang", "s_rendah", "s_sedang", "s_tinggi", "s_sangat_tinggi", "s_extreme"]
+_STATUS_TO_COLUMN = dict(zip(STATUS_LEVELS, STATUS_COLUMNS))
+OTHER_STATUS_COLUMN = "s_lain"
+_COUNT_COLUMNS = STATUS_COLUMNS + [OTHER_STATUS_COLUMN]
+
+DEFAULT_MAX_POINTS = 2000
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution  TEXT    NOT NULL,
+    bucket      TEXT    NOT NULL,
+    n           INTEGER NOT NULL,
+    n_y         INTEGER NOT NULL,
+    sum_y       REAL    NOT NULL,
+    min_y       INTEGER,
+    max_y       INTEGER,
+    max_extreme INTEGER NOT NULL,
+    alerts      INTEGER NOT NULL,
+    {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _COUNT_COLUMNS)},
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = f"""
+INSERT INTO rollups (resolution, bucket, n, n_y, sum_y, min_y, max_y, max_extreme, alerts, {", ".join(_COUNT_COLUMNS)})
+VALUES ({", ".join("?" * (9 + len(_COUNT_COLUMNS)))})
+ON CONFLICT(resolution, bucket) DO UPDATE SET
+    n = n + excluded.n,
+    n_y = n_y + excluded.n_y,
+    sum_y = sum_y + excluded.sum_y,
+    min_y = MIN(COALESCE(min_y, excluded.min_y), COALESCE(excluded.min_y, min_y)),
+    max_y = MAX(COALESCE(max_y, excluded.max_y), COALESCE(excluded.max_y, max_y)),
+    max_extreme = MAX(max_extreme, excluded.max_extreme),
+    alerts = alerts + excluded.alerts,
+    {", ".join(f"{c} = {c} + excluded.{c}" for c in _COUNT_COLUMNS)}
+"""
+
+
+def rollup_path_for(log_path: str) -> str:
+    """Lokasi database rollup di samping log mentah (file CSV/SQLite atau folder Parquet)."""
+    return os.path.normpath(log_path) + ".rollup.db"
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+
+def span_minutes(start: date, end: date) -> float:
+    """Panjang rentang dalam menit; date = hari penuh (inklusif), datetime = presisi waktu."""
+    if isinstance(start, datetime) and isinstance(end, datetime):
+        return max(1.0, (end - start).total_seconds() / 60)
+    return ((_as_day(end) - _as_day(start)).days + 1) * 24 * 60
+
+
+def choose_resolution(start: date, end: date, max_points: int = DEFAULT_MAX_POINTS) -> str:
+    """Resolusi terhalus yang jumlah bucket-nya untuk rentang [start, end] <= max_points."""
+    minutes = span_minutes(start, end)
+    if minutes <= max_points:
+        return "minute"
+    if minutes / 60 <= max_points:
+        return "hour"
+    return "day"
+
+
+def _as_day(value: date) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else int(value)
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+class RollupAggregator:
+    """Akumulasi delta per (resolusi, bucket) di memori; take() / reset() mengosongkan delta."""
+
+    def __init__(self, resolutions: Iterable[str] = RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self._buckets: Dict[Tuple[str, datetime], Dict] = {}
+
+    def add(self, row: Dict):
+        ts = _to_datetime(row["timestamp"])
+        y = _to_int(row.get("puncak_ombak_y"))
+        extreme = _to_int(row.get("extreme_count")) or 0
+        alert = _to_bool(row.get("alert_sent", False))
+        status_col = _STATUS_TO_COLUMN.get(str(row.get("status_ombak", "")), OTHER_STATUS_COLUMN)
+        for res in self.resolutions:
+            key = (res, bucket_start(ts, res))
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = {"n": 0, "n_y": 0, "sum_y": 0.0, "min_y": None, "max_y": None,
+                                          "max_extreme": 0, "alerts": 0, **{c: 0 for c in _COUNT_COLUMNS}}
+            b["n"] += 1
+            if y is not None:
+                b["n_y"] += 1
+                b["sum_y"] += y
+                b["min_y"] = y if b["min_y"] is None else min(b["min_y"], y)
+                b["max_y"] = y if b["max_y"] is None else max(b["max_y"], y)
+            b["max_extreme"] = max(b["max_extreme"], extreme)
+            b["alerts"] += alert
+            b[status_col] += 1
+
+    def params(self) -> List[tuple]:
+        """Delta sebagai parameter _UPSERT (delta tetap disimpan)."""
+        return [
+            (res, bucket.isoformat(), b["n"], b["n_y"], b["sum_y"], b["min_y"], b["max_y"],
+             b["max_extreme"], b["alerts"], *(b[c] for c in _COUNT_COLUMNS))
+            for (res, bucket), b in self._buckets.items()
+        ]
+
+    def reset(self):
+        self._buckets = {}
+
+    def take(self) -> List[tuple]:
+        """Ambil delta sebagai parameter _UPSERT, lalu reset."""
+        params = self.params()
+        self.reset()
+        return params
+
+
+class RollupStore:
+    """
+    Database rollup (SQLite WAL, satu koneksi per thread).
+
+    Args:
+        path: file database rollup (lihat rollup_path_for)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, params: List[tuple]):
+        if not params:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(_UPSERT, params)
+
+    def has_data(self, start: Optional[date] = None, end: Optional[date] = None) -> bool:
+        where, args = self._range("day", start, end)
+        return self._conn().execute(f"SELECT 1 FROM rollups{where} LIMIT 1", args).fetchone() is not None
+
+    @staticmethod
+    def _range(resolution: str, start: Optional[date], end: Optional[date]) -> Tuple[str, list]:
+        # date = hari penuh (inklusif); datetime = bucket yang beririsan dengan jendela waktu
+        where, args = ["resolution = ?"], [resolution]
+        if start is not None:
+            where.append("bucket >= ?")
+            if isinstance(start, datetime):
+                start = bucket_start(start, resolution)
+            else:
+                start = datetime.combine(start, dtime.min)
+            args.append(start.isoformat())
+        if end is not None:
+            if isinstance(end, datetime):
+                where.append("bucket <= ?")
+            else:
+                where.append("bucket < ?")
+                end = datetime.combine(end + timedelta(days=1), dtime.min)
+            args.append(end.isoformat())
+        return " WHERE " + " AND ".join(where), args
+
+    def read(self, resolution: str, start: Optional[date] = None, end: Optional[date] = None):
+        """
+        Rollup satu resolusi untuk rentang tanggal sebagai pandas.DataFrame:
+        waktu, n, min_y, mean_y, max_y, max_extreme, alerts, s_* (jumlah per status).
+        """
+        import pandas as pd
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown rollup resolution: {resolution}")
+        where, args = self._range(resolution, start, end)
+        df = pd.read_sql_query(
+            f"SELECT bucket, n, n_y, sum_y, min_y, max_y, max_extreme, alerts, {', '.join(_COUNT_COLUMNS)} "
+            f"FROM rollups{where} ORDER BY bucket", self._conn(), params=args)
+        df.insert(0, "waktu", pd.to_datetime(df.pop("bucket")))
+        df.insert(df.columns.get_loc("max_y"), "mean_y", (df["sum_y"] / df["n_y"].where(df["n_y"] > 0)).round(1))
+        return df.drop(columns=["sum_y"])
+
+    def summary(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+        """Ringkasan rentang dari rollup harian (lihat summarize_rows untuk format)."""
+        where, args = self._range("minute", start, end)
+        first, last = self._conn().execute(f"SELECT MIN(bucket), MAX(bucket) FROM rollups{where}", args).fetchone()
+        where, args = self._range("day", start, end)
+        row = self._conn().execute(
+            f"SELECT SUM(n), SUM(n_y), SUM(sum_y), MIN(min_y), MAX(max_y), "
+            f"MAX(max_extreme), SUM(alerts), {', '.join(f'SUM({c})' for c in _COUNT_COLUMNS)} FROM rollups{where}",
+            args).fetchone()
+        n, n_y, sum_y, min_y, max_y, max_extreme, alerts = row[:7]
+        counts = dict(zip(STATUS_LEVELS + ["Lainnya"], row[7:]))
+        return {
+            # Presisi menit (bucket rollup menit pertama / terakhir)
+            "waktu_min": first or "-", "waktu_max": last or "-", "total": n or 0,
+            "min_y": min_y, "mean_y": round(sum_y / n_y, 1) if n_y else None, "max_y": max_y,
+            "max_extreme": max_extreme, "alerts": alerts or 0,
+            "status_counts": {s: c for s, c in sorted(counts.items(), key=lambda kv: -(kv[1] or 0)) if c},
+        }
+
+
+def summarize_rows(df) -> Dict:
+    """Ringkasan dari DataFrame row mentah (format sama dengan RollupStore.summary)."""
+    has = lambda col: col in df.columns and len(df) > 0
+    return {
+        "waktu_min": str(df['waktu'].min()) if 'waktu' in df.columns else "-",
+        "waktu_max": str(df['waktu'].max()) if 'waktu' in df.columns else "-",
+        "total": len(df),
+        "min_y": int(df['puncak_ombak_y'].min()) if has('puncak_ombak_y') else None,
+        "mean_y": round(float(df['puncak_ombak_y'].mean()), 1) if has('puncak_ombak_y') else None,
+        "max_y": int(df['puncak_ombak_y'].max()) if has('puncak_ombak_y') else None,
+        "max_extreme": int(df['extreme_count'].max()) if has('extreme_count') else None,
+        "alerts": int((df['alert_sent'] == True).sum()) if has('alert_sent') else None,
+        "status_counts": {s: int(n) for s, n in df['status_ombak'].value_counts().items() if n} if has('status_ombak') else {},
+    }
+
+
+class RollupSink:
+    """
+    Bungkus sink log: write_rows diteruskan ke sink asli + diakumulasi ke rollup;
+    delta rollup di-upsert setiap flush (tiap batch BackgroundLogWriter).
+
+    Args:
+        inner: sink log asli (CsvLogSink / ParquetLogSink / SqliteLogSink)
+        rollup_path: file database rollup
+    """
+
+    def __init__(self, inner, rollup_path: str):
+        self.inner = inner
+        self.rollups = RollupStore(rollup_path)
+        self._agg = RollupAggregator()
+
+    def write_rows(self, rows: List[Dict]):
+        self.inner.write_rows(rows)
+        for row in rows:
+            self._agg.add(row)
+
+    def _upsert(self):
+        # Delta dikosongkan hanya setelah upsert commit: SQLite busy / locked -> dicoba lagi flush berikutnya
+        self.rollups.upsert(self._agg.params())
+        self._agg.reset()
+
+    def flush(self, fsync: bool = False):
+        self.inner.flush(fsync=fsync)
+        self._upsert()
+
+    def close(self):
+        self.inner.close()
+        self._upsert()
+
+
+def backfill_from_csv(csv_path: str, rollup_path: Optional[str] = None, chunksize: int = 100000) -> int:
+    """Bangun rollup dari CSV log lama (per chunk). Jalankan sekali pada database rollup kosong."""
+    import pandas as pd
+    store = RollupStore(rollup_path or rollup_path_for(csv_path))
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        if 'timestamp' not in chunk.columns:
+            chunk['timestamp'] = chunk['tanggal'].astype(str) + " " + chunk['jam'].astype(str)
+        chunk = chunk[pd.to_datetime(chunk['timestamp'], format="ISO8601", errors='coerce').notna()]
+        agg = RollupAggregator()
+        for row in chunk.to_dict("records"):
+            agg.add(row)
+        store.upsert(agg.take())
+        total += len(chunk)
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Bangun rollup dari CSV log deteksi yang sudah ada")
+    parser.add_argument("csv_path", nargs="?", default="deteksi_ombak.csv")
+    args = parser.parse_args()
+    print(f"🔍 Backfill rollup dari {args.csv_path}...")
+    print(f"   {backfill_from_csv(args.csv_path)} row -> {rollup_path_for(args.csv_path)}")
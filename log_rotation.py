@@ -0,0 +1,189 @@
+# log_rotation.py
+# Rotasi CSV log deteksi + kompresi segmen di background + manifest segmen.
+# - File aktif tetap <csv_path>; segmen tertutup: <nama>.<YYYYmmdd-HHMMSS>.csv(.gz)
+# - Rotasi saat ganti hari dan/atau ukuran file aktif >= max_bytes
+# - Segmen tertutup di-gzip oleh thread background (writer deteksi tidak menunggu)
+# - Manifest <nama>.manifest.json: rentang waktu, jumlah row, jumlah per status tiap segmen,
+#   sehingga pembaca (Logs tab, laporan, export) bisa memilih segmen tanpa membukanya
+
+import csv
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional
+
+from log_writer import CSV_FIELDS, CsvLogSink
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+def manifest_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".manifest.json"
+
+
+def load_manifest(csv_path: str) -> List[Dict]:
+    """Daftar segmen tertutup (urut waktu mulai); [] jika belum ada rotasi."""
+    try:
+        with open(manifest_path_for(csv_path), "r", encoding="utf-8") as f:
+            return json.load(f).get("segments", [])
+    except FileNotFoundError:
+        return []
+
+
+def _save_manifest(csv_path: str, segments: List[Dict]):
+    path = manifest_path_for(csv_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"segments": sorted(segments, key=lambda s: s["start"])}, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _segment_file(csv_path: str, seg: Dict) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), seg["file"])
+
+
+def list_segments(csv_path: str, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+    """
+    Segmen tertutup yang beririsan dengan [start, end] (date = hari penuh, inklusif).
+    Setiap dict berisi file, path, start, end, rows, status_counts, bytes, compressed.
+    """
+    lo = datetime.combine(start, dtime.min).isoformat() if start else None
+    hi = datetime.combine(end + timedelta(days=1), dtime.min).isoformat() if end else None
+    out = []
+    for seg in load_manifest(csv_path):
+        if (lo and seg["end"] < lo) or (hi and seg["start"] >= hi):
+            continue
+        out.append(dict(seg, path=_segment_file(csv_path, seg)))
+    return out
+
+
+class _SegmentStats:
+    def __init__(self):
+        self.start: Optional[str] = None
+        self.end: Optional[str] = None
+        self.rows = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def add(self, row: Dict):
+        ts = str(row.get("timestamp", ""))
+        if ts:
+            self.start = ts if self.start is None else min(self.start, ts)
+            self.end = ts if self.end is None else max(self.end, ts)
+        self.rows += 1
+        status = str(row.get("status_ombak", ""))
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+
+class RotatingCsvSink(CsvLogSink):
+    """
+    CsvLogSink dengan rotasi + kompresi + manifest.
+
+    Args:
+        path: file CSV aktif
+        max_bytes: rotasi jika file aktif >= max_bytes (None = tanpa batas ukuran)
+        rotate_daily: rotasi saat tanggal row berganti
+        compress: gzip segmen tertutup di thread background
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 rotate_daily: bool = True, compress: bool = True, fields: List[str] = CSV_FIELDS):
+        super().__init__(path, fields)
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self._manifest_lock = threading.Lock()
+        self._stats = self._scan_active()
+        self._compress_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._compressor = threading.Thread(target=self._compress_loop, name="log-compress", daemon=True)
+        self._compressor.start()
+        # Segmen yang belum sempat dikompres (proses berhenti sebelum selesai)
+        if compress:
+            for seg in load_manifest(path):
+                if not seg.get("compressed"):
+                    self._compress_queue.put(seg["file"])
+
+    def _scan_active(self) -> _SegmentStats:
+        """Statistik file aktif yang sudah ada (sekali saat start)."""
+        stats = _SegmentStats()
+        if os.path.getsize(self.path) > 0:
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    stats.add(row)
+        return stats
+
+    def write_rows(self, rows: List[Dict]):
+        for row in rows:
+            if self.rotate_daily and self._stats.start and \
+                    str(row.get("timestamp", ""))[:10] != self._stats.start[:10]:
+                self.rotate()
+            self._writer.writerow(row)
+            self._stats.add(row)
+        if self.max_bytes and self._f.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self) -> Optional[str]:
+        """Tutup file aktif menjadi segmen, catat di manifest, buka file aktif baru."""
+        if not self._stats.rows:
+            return None
+        self.flush(fsync=True)
+        self._f.close()
+        stamp = datetime.fromisoformat(self._stats.start).strftime("%Y%m%d-%H%M%S")
+        base, ext = os.path.splitext(os.path.basename(self.path))
+        name = f"{base}.{stamp}{ext}"
+        folder = os.path.dirname(os.path.abspath(self.path))
+        n = 1
+        while os.path.exists(os.path.join(folder, name)) or os.path.exists(os.path.join(folder, name + ".gz")):
+            n += 1
+            name = f"{base}.{stamp}-{n}{ext}"
+        os.replace(self.path, os.path.join(folder, name))
+
+        seg = {"file": name, "start": self._stats.start, "end": self._stats.end, "rows": self._stats.rows,
+               "status_counts": self._stats.status_counts,
+               "bytes": os.path.getsize(os.path.join(folder, name)), "compressed": False}
+        with self._manifest_lock:
+            _save_manifest(self.path, load_manifest(self.path) + [seg])
+
+        self._f = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=self.fields)
+        self._writer.writeheader()
+        self._stats = _SegmentStats()
+        if self.compress:
+            self._compress_queue.put(name)
+        return name
+
+    def close(self):
+        super().close()
+        self._compress_queue.put(None)
+        self._compressor.join(timeout=60)
+
+    # ===== Thread kompresi =====
+    def _compress_loop(self):
+        while True:
+            name = self._compress_queue.get()
+            if name is None:
+                return
+            try:
+                self._compress_segment(name)
+            except Exception as e:
+                print(f"❌ Kompresi segmen log gagal ({name}): {e}")
+
+    def _compress_segment(self, name: str):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        src = os.path.join(folder, name)
+        if not os.path.exists(src):
+            return
+        tmp = src + ".gz.tmp"
+        with open(src, "rb") as f_in, gzip.open(tmp, "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        os.replace(tmp, src + ".gz")
+        with self._manifest_lock:
+            segments = load_manifest(self.path)
+            for seg in segments:
+                if seg["file"] == name:
+                    seg.update(file=name + ".gz", compressed=True, bytes=os.path.getsize(src + ".gz"))
+            _save_manifest(self.path, segments)
+        os.remove(src)
@@ -0,0 +1,300 @@
+# log_runs.py
+# Logging berbasis perubahan: sampel berturut-turut yang "sama" digabung menjadi run
+# (start, end, status, min/max peak_y, count, ...) di SQLite.
+# - Run baru dimulai saat status berubah, rentang peak_y dalam run melebihi peak_delta,
+#   run sudah sepanjang heartbeat_sec, jeda sejak sampel terakhir > max_gap_sec (detektor / stream
+#   mati tidak diisi expand_runs), atau setelah row alert (alert tidak pernah tertelan)
+# - Jam tenang: ribuan row "Tenang" identik -> beberapa run saja
+# - expand_range(): kembalikan run ke deret reguler (tiap freq) saat dibutuhkan grafik/tabel
+# - RunLengthSink memakai interface sink log_writer (write_rows, flush, close)
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_PEAK_DELTA = 10
+DEFAULT_HEARTBEAT_SEC = 300
+DEFAULT_MAX_GAP_SEC = 6.0  # 3 x interval sampel default (2 detik)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    start       TEXT    NOT NULL,
+    end         TEXT    NOT NULL,
+    status      TEXT    NOT NULL,
+    count       INTEGER NOT NULL,
+    min_y       INTEGER,
+    max_y       INTEGER,
+    sum_y       REAL    NOT NULL DEFAULT 0,
+    first_frame INTEGER,
+    last_frame  INTEGER,
+    max_extreme INTEGER NOT NULL DEFAULT 0,
+    alerts      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_start ON runs(start);
+CREATE INDEX IF NOT EXISTS idx_runs_end ON runs(end);
+"""
+
+_RUN_FIELDS = ("start", "end", "status", "count", "min_y", "max_y", "sum_y",
+               "first_frame", "last_frame", "max_extreme", "alerts")
+
+DateLike = Union[date, datetime, None]
+
+
+def _ts_text(value) -> str:
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat(timespec="microseconds")
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+class RunLengthStore:
+    """
+    Pembaca run log (SQLite WAL, satu koneksi per thread).
+
+    Args:
+        path: file database run
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def date_bounds(self) -> Optional[Tuple[date, date]]:
+        row = self._conn().execute("SELECT MIN(start) AS lo, MAX(end) AS hi FROM runs").fetchone()
+        if row["lo"] is None:
+            return None
+        return datetime.fromisoformat(row["lo"]).date(), datetime.fromisoformat(row["hi"]).date()
+
+    def read_runs(self, start: DateLike = None, end: DateLike = None):
+        """Run yang beririsan dengan [start, end] sebagai pandas.DataFrame (date = hari penuh)."""
+        import pandas as pd
+        where, args = [], []
+        if start is not None:
+            if not isinstance(start, datetime):
+                start = datetime.combine(start, dtime.min)
+            where.append("end >= ?")
+            args.append(_ts_text(start))
+        if end is not None:
+            if not isinstance(end, datetime):
+                end = datetime.combine(end + timedelta(days=1), dtime.min) - timedelta(microseconds=1)
+            where.append("start <= ?")
+            args.append(_ts_text(end))
+        sql = f"SELECT {', '.join(_RUN_FIELDS)} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        df = pd.read_sql_query(sql + " ORDER BY start", self._conn(), params=args)
+        for col in ("start", "end"):
+            df[col] = pd.to_datetime(df[col], format="ISO8601")
+        return df
+
+    def expand_range(self, start: DateLike = None, end: DateLike = None, freq_sec: float = 2.0):
+        """
+        Deret reguler (satu row per freq_sec) dari run di rentang, dengan kolom seperti log mentah:
+        timestamp, waktu, frame, puncak_ombak_y (rata-rata run), status_ombak, extreme_count,
+        alert_sent (True di titik terakhir run yang berisi alert).
+        """
+        df = expand_runs(self.read_runs(start, end), freq_sec)
+        # Run di tepi rentang bisa melewati batas: potong ke [start, end]
+        if start is not None:
+            lo = start if isinstance(start, datetime) else datetime.combine(start, dtime.min)
+            df = df[df['timestamp'] >= lo]
+        if end is not None:
+            if isinstance(end, datetime):
+                df = df[df['timestamp'] <= end]
+            else:
+                df = df[df['timestamp'] < datetime.combine(end + timedelta(days=1), dtime.min)]
+        return df.reset_index(drop=True)
+
+
+def expand_runs(runs, freq_sec: float = 2.0):
+    """Ubah DataFrame run (read_runs) menjadi deret reguler; vektor penuh tanpa loop per run."""
+    import numpy as np
+    import pandas as pd
+    columns = ['timestamp', 'frame', 'puncak_ombak_y', 'status_ombak', 'extreme_count', 'alert_sent', 'waktu']
+    if runs.empty:
+        return pd.DataFrame(columns=columns)
+    step = np.int64(freq_sec * 1e9)
+    t0 = runs['start'].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    t1 = runs['end'].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    n = (t1 - t0) // step + 1
+    run_idx = np.repeat(np.arange(len(runs)), n)
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    ts = t0[run_idx] + offset * step
+    last = offset == (n[run_idx] - 1)
+    ts = np.where(last, t1[run_idx], ts)  # titik terakhir tepat di akhir run
+
+    mean_y = (runs['sum_y'] / runs['count']).round().to_numpy()
+    f0 = runs['first_frame'].to_numpy(dtype=float)
+    f1 = runs['last_frame'].to_numpy(dtype=float)
+    frac = np.where(n[run_idx] > 1, offset / np.maximum(n[run_idx] - 1, 1), 1.0)
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(ts),
+        'frame': np.round(f0[run_idx] + (f1[run_idx] - f0[run_idx]) * frac),
+        'puncak_ombak_y': mean_y[run_idx],
+        'status_ombak': runs['status'].to_numpy()[run_idx],
+        'extreme_count': runs['max_extreme'].to_numpy()[run_idx],
+        'alert_sent': last & (runs['alerts'].to_numpy()[run_idx] > 0),
+    })
+    df['waktu'] = df['timestamp']
+    return df
+
+
+class RunLengthSink(RunLengthStore):
+    """
+    Sink untuk BackgroundLogWriter: row digabung menjadi run, hanya run yang ditulis.
+    Run yang masih terbuka ikut di-upsert tiap flush supaya pembaca melihatnya.
+
+    Args:
+        path: file database run
+        peak_delta: run ditutup jika (max_y - min_y) dalam run akan melebihi nilai ini
+        heartbeat_sec: run ditutup jika sudah sepanjang ini (titik hidup minimal tiap heartbeat)
+        max_gap_sec: run ditutup jika jeda sejak sampel terakhir melebihi ini (sampling terputus)
+    """
+
+    def __init__(self, path: str, peak_delta: int = DEFAULT_PEAK_DELTA,
+                 heartbeat_sec: float = DEFAULT_HEARTBEAT_SEC, max_gap_sec: float = DEFAULT_MAX_GAP_SEC):
+        super().__init__(path)
+        self.peak_delta = peak_delta
+        self.heartbeat_sec = heartbeat_sec
+        self.max_gap_sec = max_gap_sec
+        self._run: Optional[Dict] = None
+        self._closed: List[Dict] = []
+
+    def _starts_new_run(self, ts: datetime, status: str, y: Optional[int]) -> bool:
+        run = self._run
+        if run is None or run["alerts"]:
+            return True
+        if status != run["status"]:
+            return True
+        if (ts - run["_start"]).total_seconds() >= self.heartbeat_sec:
+            return True
+        if (ts - run["_end"]).total_seconds() > self.max_gap_sec:
+            return True
+        if y is not None and run["min_y"] is not None and \
+                max(run["max_y"], y) - min(run["min_y"], y) > self.peak_delta:
+            return True
+        return False
+
+    def write_rows(self, rows: List[Dict]):
+        for row in rows:
+            ts = row["timestamp"]
+            ts = ts if isinstance(ts, datetime) else datetime.fromisoformat(str(ts))
+            status = str(row.get("status_ombak", ""))
+            y = _to_int(row.get("puncak_ombak_y"))
+            frame = _to_int(row.get("frame"))
+            if self._starts_new_run(ts, status, y):
+                if self._run is not None:
+                    self._closed.append(self._run)
+                self._run = {"_start": ts, "_id": None, "start": _ts_text(ts), "status": status, "count": 0,
+                             "min_y": y, "max_y": y, "sum_y": 0.0, "first_frame": frame,
+                             "max_extreme": 0, "alerts": 0}
+            run = self._run
+            run["_end"] = ts
+            run["end"] = _ts_text(ts)
+            run["count"] += 1
+            if y is not None:
+                run["min_y"] = y if run["min_y"] is None else min(run["min_y"], y)
+                run["max_y"] = y if run["max_y"] is None else max(run["max_y"], y)
+                run["sum_y"] += y
+            run["last_frame"] = frame
+            run["max_extreme"] = max(run["max_extreme"], _to_int(row.get("extreme_count")) or 0)
+            run["alerts"] += _to_bool(row.get("alert_sent", False))
+
+    def flush(self, fsync: bool = False):
+        conn = self._conn()
+        inserted = []
+        with conn:
+            conn.execute("BEGIN")
+            for run in self._closed + ([self._run] if self._run else []):
+                values = [run[k] for k in _RUN_FIELDS]
+                if run["_id"] is None:
+                    cur = conn.execute(f"INSERT INTO runs ({', '.join(_RUN_FIELDS)}) "
+                                       f"VALUES ({', '.join('?' * len(_RUN_FIELDS))})", values)
+                    inserted.append((run, cur.lastrowid))
+                else:
+                    conn.execute(f"UPDATE runs SET {', '.join(f'{k} = ?' for k in _RUN_FIELDS)} WHERE id = ?",
+                                 values + [run["_id"]])
+        # id baru dipakai hanya setelah commit: rollback -> run di-INSERT ulang pada flush berikutnya
+        for run, run_id in inserted:
+            run["_id"] = run_id
+        self._closed = []
+        if fsync:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        self.flush(fsync=True)
+        self._run = None
+
+
+def benchmark_runs(hours: int = 24, sample_sec: float = 2.0) -> Dict:
+    """Hari tenang (status sama, noise kecil, sesekali ombak tinggi): CSV per sampel vs run."""
+    import csv
+    import random
+    import tempfile
+    import time
+    import pandas as pd
+    from log_writer import CSV_FIELDS, make_log_row
+
+    rng = random.Random(0)
+    tmpdir = tempfile.mkdtemp(prefix="log_runs_bench_")
+    csv_path, db_path = os.path.join(tmpdir, "log.csv"), os.path.join(tmpdir, "runs.db")
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    rows = []
+    for i in range(int(hours * 3600 / sample_sec)):
+        burst = (i // 1800) % 12 == 5 and i % 1800 < 60  # ombak tinggi 2 menit tiap ~12 jam
+        y = rng.randint(230, 245) if burst else rng.randint(340, 346)
+        rows.append(make_log_row(i * 25, y, "2,5 Meter (Tinggi)" if burst else "Tenang", 0,
+                                 ts=start + timedelta(seconds=i * sample_sec)))
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    sink = RunLengthSink(db_path)
+    sink.write_rows(rows)
+    sink.close()
+    sink._conn().execute("VACUUM")
+
+    t0 = time.perf_counter()
+    pd.read_csv(csv_path)
+    csv_sec = time.perf_counter() - t0
+    store = RunLengthStore(db_path)
+    t0 = time.perf_counter()
+    runs = store.read_runs()
+    runs_sec = time.perf_counter() - t0
+    expanded = expand_runs(runs, sample_sec)
+    return {
+        "samples": len(rows), "runs": len(runs), "expanded_rows": len(expanded),
+        "csv_kb": round(os.path.getsize(csv_path) / 1024, 1), "runs_kb": round(os.path.getsize(db_path) / 1024, 1),
+        "csv_read_ms": round(csv_sec * 1000, 1), "runs_read_ms": round(runs_sec * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark logging berbasis run (hari tenang)...")
+    print(benchmark_runs())
@@ -0,0 +1,245 @@
+# log_sqlite.py
+# Backend log deteksi berbasis SQLite (WAL mode).
+# - Index timestamp / status / alert: rentang tanggal, row terbaru, dan riwayat
+#   alert jadi query ber-index (bukan scan DataFrame seluruh histori)
+# - WAL: dashboard yang membaca tidak memblok writer deteksi (dan sebaliknya)
+# - SqliteLogSink memakai interface sink log_writer (write_rows, flush, close)
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+SQLITE_COLUMNS = [
+    "timestamp", "frame", "puncak_ombak_y", "status_ombak",
+    "jumlah_garis_terdeteksi", "extreme_count", "alert_sent",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id                      INTEGER PRIMARY KEY,
+    timestamp               TEXT    NOT NULL,
+    frame                   INTEGER,
+    puncak_ombak_y          INTEGER,
+    status_ombak            TEXT,
+    jumlah_garis_terdeteksi INTEGER,
+    extreme_count           INTEGER,
+    alert_sent              INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON detections(timestamp);
+CREATE INDEX IF NOT EXISTS idx_detections_status ON detections(status_ombak, timestamp);
+CREATE INDEX IF NOT EXISTS idx_detections_alert ON detections(timestamp) WHERE alert_sent = 1;
+"""
+
+DateLike = Union[date, datetime, None]
+
+
+def _ts_text(value) -> str:
+    """Timestamp ISO dengan mikrodetik tetap (lebar sama -> urutan teks = urutan waktu)."""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat(timespec="microseconds")
+
+
+def _to_bool(value) -> int:
+    if isinstance(value, str):
+        return int(value.strip().lower() in ("true", "1", "yes"))
+    return int(bool(value))
+
+
+def _range_clause(start: DateLike, end: DateLike) -> Tuple[str, list]:
+    """WHERE untuk rentang; date = satu hari penuh (inklusif), datetime = presisi waktu."""
+    where, args = [], []
+    if start is not None:
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, dtime.min)
+        where.append("timestamp >= ?")
+        args.append(_ts_text(start))
+    if end is not None:
+        if isinstance(end, datetime):
+            where.append("timestamp <= ?")
+        else:
+            end = datetime.combine(end + timedelta(days=1), dtime.min)
+            where.append("timestamp < ?")
+        args.append(_ts_text(end))
+    return (" WHERE " + " AND ".join(where)) if where else "", args
+
+
+class SqliteLogStore:
+    """
+    Pembaca log deteksi SQLite (satu koneksi per thread).
+
+    Args:
+        path: file database SQLite
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def date_bounds(self) -> Optional[Tuple[date, date]]:
+        """(tanggal pertama, tanggal terakhir) dari index timestamp; None jika kosong."""
+        row = self._conn().execute("SELECT MIN(timestamp) AS lo, MAX(timestamp) AS hi FROM detections").fetchone()
+        if row["lo"] is None:
+            return None
+        return datetime.fromisoformat(row["lo"]).date(), datetime.fromisoformat(row["hi"]).date()
+
+    def count(self, start: DateLike = None, end: DateLike = None) -> int:
+        where, args = _range_clause(start, end)
+        return self._conn().execute(f"SELECT COUNT(*) FROM detections{where}", args).fetchone()[0]
+
+    def latest(self, start: DateLike = None, end: DateLike = None) -> Optional[Dict]:
+        """Row terbaru di rentang (ORDER BY timestamp DESC LIMIT 1 lewat index)."""
+        where, args = _range_clause(start, end)
+        row = self._conn().execute(
+            f"SELECT {', '.join(SQLITE_COLUMNS)} FROM detections{where} ORDER BY timestamp DESC LIMIT 1", args
+        ).fetchone()
+        if row is None:
+            return None
+        latest = dict(row)
+        latest["alert_sent"] = bool(latest["alert_sent"])
+        return latest
+
+    def status_counts(self, start: DateLike = None, end: DateLike = None) -> Dict[str, int]:
+        where, args = _range_clause(start, end)
+        rows = self._conn().execute(
+            f"SELECT status_ombak, COUNT(*) AS n FROM detections{where} GROUP BY status_ombak ORDER BY n DESC", args
+        ).fetchall()
+        return {r["status_ombak"]: r["n"] for r in rows}
+
+    def read_range(self, start: DateLike = None, end: DateLike = None,
+                   columns: Optional[Sequence[str]] = None, alerts_only: bool = False,
+                   limit: Optional[int] = None):
+        """
+        Baca rentang sebagai pandas.DataFrame (urut timestamp).
+
+        Args:
+            start/end: date (hari penuh, inklusif) atau datetime
+            columns: subset SQLITE_COLUMNS (default semua)
+            alerts_only: hanya row alert_sent (pakai partial index)
+            limit: ambil N row terakhir saja
+        """
+        import pandas as pd
+        cols = [c for c in (columns or SQLITE_COLUMNS) if c in SQLITE_COLUMNS]
+        if limit and "timestamp" not in cols:
+            cols.insert(0, "timestamp")
+        where, args = _range_clause(start, end)
+        if alerts_only:
+            where += (" AND " if where else " WHERE ") + "alert_sent = 1"
+        sql = f"SELECT {', '.join(cols)} FROM detections{where} ORDER BY timestamp"
+        if limit:
+            sql = f"SELECT * FROM ({sql} DESC LIMIT {int(limit)}) ORDER BY timestamp"
+        df = pd.read_sql_query(sql, self._conn(), params=args)
+        if "timestamp" in df.columns:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+        if "alert_sent" in df.columns:
+            df["alert_sent"] = df["alert_sent"].astype(bool)
+        return df
+
+
+class SqliteLogSink(SqliteLogStore):
+    """
+    Sink SQLite untuk BackgroundLogWriter: satu transaksi per batch.
+    flush(fsync=True) menjalankan checkpoint WAL (PASSIVE, tidak menunggu pembaca).
+    """
+
+    def write_rows(self, rows: List[Dict]):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                f"INSERT INTO detections ({', '.join(SQLITE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(_ts_text(r["timestamp"]), r.get("frame"), r.get("puncak_ombak_y"), r.get("status_ombak"),
+                  r.get("jumlah_garis_terdeteksi"), r.get("extreme_count"), _to_bool(r.get("alert_sent", False)))
+                 for r in rows],
+            )
+
+    def flush(self, fsync: bool = False):
+        if fsync:
+            self._conn().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self.flush(fsync=True)
+            conn.close()
+            self._local.conn = None
+
+
+_stores: Dict[str, SqliteLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: str) -> SqliteLogStore:
+    """Store pembaca singleton per path (dipakai ulang lintas rerun Streamlit)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SqliteLogStore(path)
+            _stores[key] = store
+        return store
+
+
+def benchmark_queries(rows: int = 200000, days: int = 30) -> Dict:
+    """Bandingkan scan CSV (cara TAB_LOG lama) vs query ber-index: row terbaru, alert, satu hari."""
+    import csv
+    import tempfile
+    import time
+    import pandas as pd
+    from log_writer import CSV_FIELDS, STATUS_LEVELS, make_log_row
+
+    tmpdir = tempfile.mkdtemp(prefix="log_sqlite_bench_")
+    csv_path = os.path.join(tmpdir, "log.csv")
+    sink = SqliteLogSink(os.path.join(tmpdir, "log.db"))
+    start = datetime.now() - timedelta(days=days)
+    step = days * 86400 / rows
+    data = [make_log_row(i, 150 + i % 200, STATUS_LEVELS[i % len(STATUS_LEVELS)], 0, i % 20, i % 5000 == 0,
+                         ts=start + timedelta(seconds=i * step)) for i in range(rows)]
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(data)
+    sink.write_rows(data)
+    sink.flush(fsync=True)
+    day = (start + timedelta(days=days // 2)).date()
+
+    t0 = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    df["waktu"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    dff = df[(df["waktu"] >= pd.to_datetime(day)) & (df["waktu"] < pd.to_datetime(day) + pd.Timedelta(days=1))]
+    dff.sort_values("waktu").tail(1)
+    dff[dff["alert_sent"] == True]
+    csv_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sink.read_range(day, day)
+    sink.latest(day, day)
+    sink.read_range(day, day, alerts_only=True)
+    sqlite_sec = time.perf_counter() - t0
+    sink.close()
+
+    return {
+        "rows_total": rows,
+        "rows_selected": len(dff),
+        "csv_scan_ms": round(csv_sec * 1000, 1),
+        "sqlite_indexed_ms": round(sqlite_sec * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark query log (scan CSV vs SQLite ber-index)...")
+    print(benchmark_queries())
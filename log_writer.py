@@ -0,0 +1,285 @@
+# log_writer.py
+# Background log writer untuk log deteksi ombak.
+# - Detection loop hanya memasukkan row ke queue (tidak ada I/O di loop)
+# - Thread background menulis per batch, file handle tetap terbuka
+# - Flush berdasarkan waktu (flush_interval_sec) atau jumlah row (flush_every_rows)
+# - fsync dibatasi (fsync_interval_sec) supaya SD card Pi tidak tersendat
+# - Flush bersih saat close() / proses berhenti (atexit)
+# - Sink gagal (SQLite terkunci, disk penuh): batch disimpan dan dicoba lagi tiap flush_interval_sec
+#   (maks max_pending_rows row, yang tertua dibuang jika lewat batas)
+
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+CSV_FIELDS = [
+    "timestamp","tanggal","jam","frame",
+    "puncak_ombak_y","status_ombak","jumlah_garis_terdeteksi","extreme_count","alert_sent"
+]
+
+# Status yang dihasilkan classify_main_style (urut dari tenang ke EXTREME)
+STATUS_LEVELS = [
+    "Tenang",
+    "0,5 Meter (Rendah)",
+    "1,25 Meter (Sedang)",
+    "2,5 Meter (Tinggi)",
+    "4 Meter (SANGAT TINGGI)",
+    "> 4 Meter (EXTREME)",
+]
+
+DEFAULT_FLUSH_INTERVAL_SEC = 5.0
+DEFAULT_FLUSH_EVERY_ROWS = 50
+DEFAULT_FSYNC_INTERVAL_SEC = 60.0
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_MAX_PENDING_ROWS = 10000
+
+
+def make_log_row(frame_idx: int, peak_y: int, status: str, num_lines: int, extreme_count: int = 0,
+                 alert_sent: bool = False, ts: Optional[datetime] = None) -> Dict:
+    """Buat satu row log (skema CSV_FIELDS)."""
+    ts = ts or datetime.now()
+    return {
+        "timestamp": ts.isoformat(),
+        "tanggal": ts.strftime("%Y-%m-%d %H:%M:%S"),
+        "jam": ts.strftime("%H:%M:%S"),
+        "frame": frame_idx,
+        "puncak_ombak_y": peak_y,
+        "status_ombak": status,
+        "jumlah_garis_terdeteksi": num_lines,
+        "extreme_count": extreme_count,
+        "alert_sent": alert_sent,
+    }
+
+
+class CsvLogSink:
+    """
+    Sink CSV: file dibuka sekali (append), header ditulis jika file baru/kosong.
+    Interface sink: write_rows(rows), flush(fsync), close().
+    """
+
+    def __init__(self, path: str, fields: List[str] = CSV_FIELDS):
+        self.path = path
+        self.fields = fields
+        self._f = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=fields)
+        if self._f.tell() == 0:
+            self._writer.writeheader()
+
+    def write_rows(self, rows: List[Dict]):
+        self._writer.writerows(rows)
+
+    def flush(self, fsync: bool = False):
+        self._f.flush()
+        if fsync:
+            os.fsync(self._f.fileno())
+
+    def close(self):
+        if not self._f.closed:
+            self.flush(fsync=True)
+            self._f.close()
+
+
+class BackgroundLogWriter:
+    """
+    Tulis row log di thread background, per batch.
+
+    Args:
+        sink: objek dengan write_rows(rows), flush(fsync), close()
+        flush_interval_sec: batch ditulis paling lambat tiap N detik
+        flush_every_rows: batch ditulis begitu terkumpul N row
+        fsync_interval_sec: fsync paling sering tiap N detik (None = tidak pernah, kecuali close)
+        max_queue: batas row di memori; jika penuh, row baru dibuang (dihitung di `dropped`)
+        max_pending_rows: batas row yang menunggu retry saat sink gagal (tertua dibuang, dihitung di `dropped`)
+    """
+
+    def __init__(self, sink, flush_interval_sec: float = DEFAULT_FLUSH_INTERVAL_SEC,
+                 flush_every_rows: int = DEFAULT_FLUSH_EVERY_ROWS,
+                 fsync_interval_sec: Optional[float] = DEFAULT_FSYNC_INTERVAL_SEC,
+                 max_queue: int = DEFAULT_MAX_QUEUE, max_pending_rows: int = DEFAULT_MAX_PENDING_ROWS):
+        self.sink = sink
+        self.max_pending_rows = max(1, max_pending_rows)
+        self.flush_interval_sec = flush_interval_sec
+        self.flush_every_rows = max(1, flush_every_rows)
+        self.fsync_interval_sec = fsync_interval_sec
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._retry_at = 0.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    # ===== Dipanggil dari detection loop =====
+    def write(self, row: Dict):
+        """Masukkan row ke queue (tidak pernah blocking)."""
+        if self._closed:
+            raise RuntimeError("Log writer sudah ditutup")
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Tunggu semua row di queue tertulis + flush + fsync (sink Parquet: part ditulis).
+        Return False jika timeout / sink gagal."""
+        done = threading.Event()
+        done.ok = False
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout) and done.ok
+
+    def close(self, timeout: float = 10.0):
+        """Flush sisa row, fsync, tutup sink."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # ===== Thread background =====
+    def _write_batch(self, batch: List[Dict], force_fsync: bool = False):
+        """Tulis + flush; batch dikosongkan hanya jika write_rows berhasil (gagal -> tetap untuk retry)."""
+        if batch:
+            self.sink.write_rows(batch)
+            self.written += len(batch)
+            batch.clear()
+        now = time.monotonic()
+        fsync = force_fsync or (self.fsync_interval_sec is not None and
+                                now - self._last_fsync >= self.fsync_interval_sec)
+        self.sink.flush(fsync=fsync)
+        if fsync:
+            self._last_fsync = now
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval_sec
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # waktu flush tercapai
+
+            if item is None:  # close(): coba tulis sisa, sink selalu ditutup
+                try:
+                    self._write_batch(batch, force_fsync=True)
+                except Exception as e:
+                    self._failed(e, batch)
+                try:
+                    self.sink.close()
+                except Exception as e:
+                    print(f"❌ Log writer close error: {e}")
+                if batch:
+                    print(f"❌ Log writer: {len(batch)} row tidak tertulis saat close")
+                return
+            if isinstance(item, threading.Event):  # flush() eksplisit (mis. stop stream): tahan crash
+                try:
+                    self._write_batch(batch, force_fsync=True)
+                    item.ok = True
+                except Exception as e:
+                    self._failed(e, batch)
+                finally:
+                    item.set()
+                continue
+            if item is not False:
+                batch.append(item)
+            due = item is False or (len(batch) >= self.flush_every_rows and time.monotonic() >= self._retry_at)
+            if due:
+                try:
+                    # Tanpa row baru pun sink tetap di-flush per interval (part Parquet yang sudah tua)
+                    self._write_batch(batch)
+                except Exception as e:
+                    self._failed(e, batch)
+                deadline = time.monotonic() + self.flush_interval_sec
+
+    def _failed(self, error: Exception, batch: List[Dict]):
+        """Sink gagal: batch tetap untuk retry (dibatasi max_pending_rows), retry berikutnya setelah
+        flush_interval_sec."""
+        self.errors += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        self._retry_at = time.monotonic() + self.flush_interval_sec
+        overflow = len(batch) - self.max_pending_rows
+        if overflow > 0:
+            del batch[:overflow]
+            self.dropped += overflow
+        print(f"❌ Log writer error ({len(batch)} row menunggu retry): {error}")
+
+
+_writers: Dict[str, BackgroundLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(path: str, sink_factory: Callable = CsvLogSink, **options) -> BackgroundLogWriter:
+    """
+    Writer singleton per path (dipakai ulang lintas rerun Streamlit).
+    sink_factory(path) membuat sink (default CSV); options diteruskan ke
+    BackgroundLogWriter saat pertama dibuat.
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = BackgroundLogWriter(sink_factory(path), **options)
+            _writers[key] = writer
+        return writer
+
+
+def close_all_writers():
+    """Flush + tutup semua writer (dipanggil otomatis saat proses berhenti)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_writers)
+
+
+def benchmark_log_writer(rows: int = 5000, path: Optional[str] = None) -> Dict:
+    """Bandingkan append per row (cara lama) vs BackgroundLogWriter: waktu blocking di loop."""
+    import tempfile
+    tmpdir = tempfile.mkdtemp(prefix="log_writer_bench_")
+    old_path = os.path.join(tmpdir, "old.csv")
+    new_path = path or os.path.join(tmpdir, "new.csv")
+
+    t0 = time.perf_counter()
+    for i in range(rows):
+        # Cara lama: stat + open + DictWriter + close per row
+        if not os.path.exists(old_path):
+            with open(old_path, "w", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=CSV_FIELDS).writeheader()
+        with open(old_path, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=CSV_FIELDS).writerow(make_log_row(i, 200, "Tenang", 0))
+    old_sec = time.perf_counter() - t0
+
+    writer = BackgroundLogWriter(CsvLogSink(new_path))
+    t0 = time.perf_counter()
+    for i in range(rows):
+        writer.write(make_log_row(i, 200, "Tenang", 0))
+    loop_sec = time.perf_counter() - t0
+    writer.close()
+    total_sec = time.perf_counter() - t0
+
+    return {
+        "rows": rows,
+        "old_loop_ms_per_row": round(old_sec / rows * 1000, 4),
+        "new_loop_ms_per_row": round(loop_sec / rows * 1000, 4),
+        "new_total_sec": round(total_sec, 3),
+        "written": writer.written,
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark log writer (append per row vs background batch)...")
+    print(benchmark_log_writer())
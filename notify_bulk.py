@@ -0,0 +1,219 @@
+# notify_bulk.py
+# Shared helpers for notify_whatsapp / notify_sms.
+# - Lazy settings: env -> .env -> Streamlit secrets (tanpa copy semua secret ke os.environ)
+# - Lazy Twilio client singleton (twilio baru di-import saat kirim pertama)
+# - One pooled keep-alive HTTP session shared by all sends (pooled http client)
+# - Bounded thread pool per bulk send (bulk_dispatch)
+# - Per-recipient result: {"to", "sid", "error"}
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+TWILIO_API_HOST = "https://api.twilio.com"
+
+# Maksimal request paralel per bulk send (dan ukuran pool koneksi HTTP)
+DEFAULT_MAX_WORKERS = 8
+
+# Kredensial dummy saat TWILIO_API_BASE_URL diarahkan ke fake_twilio.py
+FAKE_ACCOUNT_SID, FAKE_AUTH_TOKEN = "ACfake00000000000000000000000000", "fake"
+
+_dotenv_loaded = False
+_client = None
+_client_lock = threading.Lock()
+_http_client_cls = None
+
+
+def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Baca satu setting: environment variable -> .env -> Streamlit secrets.
+    Streamlit hanya dipakai jika sudah di-import (dashboard); worker headless tidak ikut memuatnya.
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        _dotenv_loaded = True
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()  # load .env if present
+        except Exception:
+            pass
+    value = os.environ.get(key)
+    if value:
+        return value
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            if key in st.secrets:
+                return str(st.secrets[key])
+        except Exception:
+            pass
+    return default
+
+
+def _credentials():
+    account_sid = get_setting("TWILIO_ACCOUNT_SID")
+    auth_token = get_setting("TWILIO_AUTH_TOKEN")
+    # Optional: local fake Twilio (fake_twilio.py), e.g. TWILIO_API_BASE_URL=http://127.0.0.1:8765
+    base_url = (get_setting("TWILIO_API_BASE_URL", "") or "").strip() or None
+    if base_url and (not account_sid or not auth_token):
+        account_sid, auth_token = FAKE_ACCOUNT_SID, FAKE_AUTH_TOKEN
+    return account_sid, auth_token, base_url
+
+
+def twilio_configured() -> bool:
+    """True jika kredensial Twilio (atau fake server) tersedia; tidak membuat client."""
+    account_sid, auth_token, _ = _credentials()
+    return bool(account_sid and auth_token)
+
+
+def _pooled_http_client_class():
+    """Buat class PooledTwilioHttpClient saat pertama dipakai (import twilio/requests lazy)."""
+    global _http_client_cls
+    if _http_client_cls is not None:
+        return _http_client_cls
+
+    from requests.adapters import HTTPAdapter
+    from twilio.http.http_client import TwilioHttpClient
+
+    class PooledTwilioHttpClient(TwilioHttpClient):
+        """
+        TwilioHttpClient dengan connection pool yang cukup besar untuk fan-out paralel.
+
+        Args:
+            pool_maxsize: jumlah koneksi keep-alive per host
+            base_url: opsional, ganti https://api.twilio.com (mis. fake server lokal)
+            timeout: timeout per request (detik)
+        """
+
+        def __init__(self, pool_maxsize: int = DEFAULT_MAX_WORKERS, base_url: Optional[str] = None,
+                     timeout: Optional[float] = 15):
+            super().__init__(pool_connections=True, timeout=timeout)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, pool_maxsize))
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self.base_url = base_url.rstrip("/") if base_url else None
+
+        def request(self, method, url, *args, **kwargs):
+            if self.base_url and url.startswith(TWILIO_API_HOST):
+                url = self.base_url + url[len(TWILIO_API_HOST):]
+            return super().request(method, url, *args, **kwargs)
+
+    _http_client_cls = PooledTwilioHttpClient
+    return _http_client_cls
+
+
+def make_twilio_client(account_sid: str, auth_token: str, pool_maxsize: int = DEFAULT_MAX_WORKERS,
+                       base_url: Optional[str] = None, timeout: Optional[float] = 15):
+    """Twilio Client baru dengan pooled keep-alive http client."""
+    from twilio.rest import Client
+    http_client = _pooled_http_client_class()(pool_maxsize=pool_maxsize, base_url=base_url, timeout=timeout)
+    return Client(account_sid, auth_token, http_client=http_client)
+
+
+def get_twilio_client():
+    """
+    Twilio Client singleton (dibuat saat kirim pertama, dipakai ulang lintas rerun Streamlit
+    karena modul hanya di-import sekali per proses).
+    Raise RuntimeError jika kredensial belum di-set.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                account_sid, auth_token, base_url = _credentials()
+                if not account_sid or not auth_token:
+                    raise RuntimeError("TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN are not set. Please configure in Streamlit secrets or .env file.")
+                _client = make_twilio_client(account_sid, auth_token, base_url=base_url)
+    return _client
+
+
+def bulk_dispatch(send_one: Callable[[str], str], targets: List[str],
+                  max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict]:
+    """
+    Panggil send_one(dest) untuk setiap tujuan secara paralel.
+
+    Args:
+        send_one: fungsi kirim satu pesan, return message SID
+        targets: daftar tujuan (sudah dinormalisasi)
+        max_workers: batas thread paralel
+
+    Returns:
+        List[Dict]: satu dict per tujuan (urutan sama dengan targets):
+            {"to": dest, "sid": str | None, "error": Exception | None}
+    """
+    def _one(dest: str) -> Dict:
+        try:
+            return {"to": dest, "sid": send_one(dest), "error": None}
+        except Exception as e:
+            return {"to": dest, "sid": None, "error": e}
+
+    if len(targets) <= 1:
+        return [_one(dest) for dest in targets]
+
+    workers = max(1, min(max_workers, len(targets)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify-bulk") as pool:
+        return list(pool.map(_one, targets))
+
+
+def raise_first_error(results: List[Dict]) -> List[str]:
+    """Return semua SID, atau raise error pertama jika ada tujuan yang gagal."""
+    for r in results:
+        if r["error"] is not None:
+            raise r["error"]
+    return [r["sid"] for r in results]
+
+
+def benchmark_bulk_send(recipients: int = 50, latency_ms: float = 150, workers: int = DEFAULT_MAX_WORKERS) -> Dict:
+    """
+    Bandingkan kirim sekuensial vs bulk paralel terhadap fake Twilio lokal.
+
+    Returns:
+        Dict: waktu (detik) dan throughput (pesan/detik) kedua mode
+    """
+    from fake_twilio import FakeTwilioServer
+
+    with FakeTwilioServer(latency_ms=latency_ms) as server:
+        targets = [f"+62812000{i:05d}" for i in range(recipients)]
+
+        def make_sender(pool_maxsize):
+            client = make_twilio_client("ACbenchmark", "benchmark", pool_maxsize=pool_maxsize, base_url=server.url)
+            return lambda dest: client.messages.create(from_="+15005550006", to=dest, body="benchmark").sid
+
+        # Sekuensial, pool default (perilaku lama: satu per satu)
+        send_seq = make_sender(1)
+        conn_before = server.connections_opened
+        t0 = time.perf_counter()
+        for dest in targets:
+            send_seq(dest)
+        seq_sec = time.perf_counter() - t0
+        seq_conns = server.connections_opened - conn_before
+
+        # Bulk paralel dengan pooled keep-alive session
+        send_bulk = make_sender(workers)
+        conn_before = server.connections_opened
+        t0 = time.perf_counter()
+        results = bulk_dispatch(send_bulk, targets, max_workers=workers)
+        bulk_sec = time.perf_counter() - t0
+        bulk_conns = server.connections_opened - conn_before
+
+    return {
+        "recipients": recipients,
+        "latency_ms": latency_ms,
+        "workers": workers,
+        "sequential_sec": round(seq_sec, 3),
+        "bulk_sec": round(bulk_sec, 3),
+        "sequential_msg_per_sec": round(recipients / seq_sec, 1),
+        "bulk_msg_per_sec": round(recipients / bulk_sec, 1),
+        "errors": sum(1 for r in results if r["error"] is not None),
+        "sequential_connections": seq_conns,
+        "bulk_connections": bulk_conns,
+    }
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark bulk send vs sekuensial (fake Twilio lokal)...")
+    for n in (10, 50):
+        print(benchmark_bulk_send(recipients=n))
@@ -7,63 +7,62 @@ import os
 from datetime import datetime
 from typing import Optional, List
 from dotenv import load_dotenv
+from sms_format import format_earthquake_sms, sms_segments
 
 # Import modul notifikasi yang sudah ada
 try:
-    from notify_whatsapp import send_whatsapp
+    from notify_whatsapp import send_whatsapp, is_configured as wa_configured
     SEND_WA_AVAILABLE = True
 except ImportError:
     SEND_WA_AVAILABLE = False
     print("⚠️ Modul notify_whatsapp.py tidak ditemukan")
 
 try:
-    from notify_sms import send_sms
+    from notify_sms import send_sms, is_configured as sms_configured
     SEND_SMS_AVAILABLE = True
 except ImportError:
     SEND_SMS_AVAILABLE = False
     print("⚠️ Modul notify_sms.py tidak ditemukan")
 
-# Import modul gempa BMKG
+# Modul gempa BMKG (cek saja, import requests ditunda sampai dipakai)
+import importlib.util
+BMKG_API_AVAILABLE = importlib.util.find_spec("earthquake_bmkg") is not None
+if not BMKG_API_AVAILABLE:
+    print("⚠️ Modul earthquake_bmkg.py tidak ditemukan")
+
+# Outbox persisten: alert ditulis dulu, dikirim ulang jika uplink putus
 try:
-    from earthquake_bmkg import BMKGEarthquakeAPI
-    BMKG_API_AVAILABLE = True
+    from alert_outbox import get_outbox, PRIORITY_TSUNAMI, PRIORITY_EARTHQUAKE
+    OUTBOX_AVAILABLE = True
 except ImportError:
-    BMKG_API_AVAILABLE = False
-    print("⚠️ Modul earthquake_bmkg.py tidak ditemukan")
+    OUTBOX_AVAILABLE = False
+    print("⚠️ Modul alert_outbox.py tidak ditemukan")
 
 load_dotenv()
 
-def send_earthquake_alert_whatsapp(earthquake_data: dict, 
-                                 alert_level: str = "EARTHQUAKE",
-                                 to: Optional[str] = None) -> List[str]:
+def format_earthquake_alert_whatsapp(earthquake_data: dict, alert_level: str = "EARTHQUAKE") -> str:
     """
-    Kirim alert gempa via WhatsApp
+    Format pesan alert gempa untuk WhatsApp (format kaya: bold, emoji)
     
     Args:
         earthquake_data: Data gempa yang sudah di-parse
         alert_level: Level alert (EARTHQUAKE, TSUNAMI)
-        to: Nomor tujuan WhatsApp (opsional)
     
     Returns:
-        List[str]: List SID dari pesan yang berhasil dikirim
+        str: Isi pesan
     """
-    if not SEND_WA_AVAILABLE:
-        print("❌ Modul WhatsApp tidak tersedia")
-        return []
+    # Tentukan emoji dan header berdasarkan level alert
+    if alert_level == "TSUNAMI":
+        emoji = "🌊"
+        header = "🚨 *ALERT TSUNAMI POTENSIAL!* 🚨"
+        urgency = "⚠️ *SEGERA EVAKUASI KE TEMPAT TINGGI!* ⚠️"
+    else:
+        emoji = "🌍"
+        header = "⚠️ *ALERT GEMPA!* ⚠️"
+        urgency = "📢 *WASPADA DAN SIAP SIAGA!* 📢"
     
-    try:
-        # Tentukan emoji dan header berdasarkan level alert
-        if alert_level == "TSUNAMI":
-            emoji = "🌊"
-            header = "🚨 *ALERT TSUNAMI POTENSIAL!* 🚨"
-            urgency = "⚠️ *SEGERA EVAKUASI KE TEMPAT TINGGI!* ⚠️"
-        else:
-            emoji = "🌍"
-            header = "⚠️ *ALERT GEMPA!* ⚠️"
-            urgency = "📢 *WASPADA DAN SIAP SIAGA!* 📢"
-        
-        # Format pesan alert gempa
-        message = f"""{header}
+    # Format pesan alert gempa
+    return f"""{header}
 
 {emoji} *INFORMASI GEMPA TERBARU*
 
@@ -82,6 +81,27 @@ def send_earthquake_alert_whatsapp(earthquake_data: dict,
 🕐 *Update:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 _Sistem Monitoring Gempa Otomatis_"""
+
+def send_earthquake_alert_whatsapp(earthquake_data: dict, 
+                                 alert_level: str = "EARTHQUAKE",
+                                 to: Optional[str] = None) -> List[str]:
+    """
+    Kirim alert gempa via WhatsApp
+    
+    Args:
+        earthquake_data: Data gempa yang sudah di-parse
+        alert_level: Level alert (EARTHQUAKE, TSUNAMI)
+        to: Nomor tujuan WhatsApp (opsional)
+    
+    Returns:
+        List[str]: List SID dari pesan yang berhasil dikirim
+    """
+    if not SEND_WA_AVAILABLE:
+        print("❌ Modul WhatsApp tidak tersedia")
+        return []
+    
+    try:
+        message = format_earthquake_alert_whatsapp(earthquake_data, alert_level)
         
         # Kirim via WhatsApp
         return send_whatsapp(message, to)
@@ -90,6 +110,19 @@ _Sistem Monitoring Gempa Otomatis_"""
         print(f"❌ Error mengirim alert gempa WhatsApp: {e}")
         return []
 
+def format_earthquake_alert_sms(earthquake_data: dict, alert_level: str = "EARTHQUAKE") -> str:
+    """
+    Format pesan alert gempa untuk SMS (ringkas, GSM-7 tanpa emoji, lihat sms_format.py)
+    
+    Args:
+        earthquake_data: Data gempa yang sudah di-parse
+        alert_level: Level alert (EARTHQUAKE, TSUNAMI)
+    
+    Returns:
+        str: Isi pesan
+    """
+    return format_earthquake_sms(earthquake_data, alert_level)
+
 def send_earthquake_alert_sms(earthquake_data: dict, 
                             alert_level: str = "EARTHQUAKE",
                             to: Optional[str] = None) -> List[str]:
@@ -109,33 +142,9 @@ def send_earthquake_alert_sms(earthquake_data: dict,
         return []
     
     try:
-        # Tentukan header berdasarkan level alert
-        if alert_level == "TSUNAMI":
-            header = "🚨 ALERT TSUNAMI POTENSIAL! 🚨"
-            urgency = "⚠️ SEGERA EVAKUASI KE TEMPAT TINGGI! ⚠️"
-        else:
-            header = "⚠️ ALERT GEMPA! ⚠️"
-            urgency = "📢 WASPADA DAN SIAP SIAGA! 📢"
-        
-        # Format pesan alert gempa (SMS lebih singkat)
-        message = f"""{header}
-
-INFORMASI GEMPA TERBARU
-
-Waktu: {earthquake_data.get('datetime_str', 'N/A')}
-Magnitude: M{earthquake_data.get('magnitude', 'N/A')}
-Kedalaman: {earthquake_data.get('kedalaman', 'N/A')}
-Lokasi: {earthquake_data.get('wilayah', 'N/A')}
-
-Potensi Tsunami: {earthquake_data.get('potensi_tsunami', 'N/A')}
-Dirasakan: {earthquake_data.get('dirasakan', 'N/A')}
-
-{urgency}
-
-Sumber: BMKG
-Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-Sistem Monitoring Gempa Otomatis"""
+        message = format_earthquake_alert_sms(earthquake_data, alert_level)
+        info = sms_segments(message)
+        print(f"📏 SMS gempa: {info['encoding']}, {info['chars']} karakter, {info['segments']} segmen")
         
         # Kirim via SMS
         return send_sms(message, to)
@@ -144,12 +153,27 @@ Sistem Monitoring Gempa Otomatis"""
         print(f"❌ Error mengirim alert gempa SMS: {e}")
         return []
 
+def _send_earthquake_via_outbox(channel: str, message: str, earthquake_data: dict,
+                                alert_level: str, to: Optional[str]) -> dict:
+    """
+    Tulis alert gempa ke outbox lalu coba kirim langsung.
+    Jika gagal, alert tetap di outbox dan dikirim ulang oleh OutboxSender.
+    """
+    outbox = get_outbox()
+    # Gempa yang sama (waktu + magnitude) tidak dikirim dua kali per channel/tujuan
+    key = (f"earthquake:{alert_level}:{earthquake_data.get('datetime_str', '')}:"
+           f"{earthquake_data.get('magnitude', '')}:{channel}:{to or ''}")
+    priority = PRIORITY_TSUNAMI if alert_level == "TSUNAMI" else PRIORITY_EARTHQUAKE
+    alert_id = outbox.enqueue(channel, message, to=to, priority=priority, idempotency_key=key)
+    return outbox.send_now(alert_id)
+
 def send_earthquake_alert(earthquake_data: dict, 
                         alert_level: str = "EARTHQUAKE",
                         enable_whatsapp: bool = True,
                         enable_sms: bool = True,
                         wa_to: Optional[str] = None,
-                        sms_to: Optional[str] = None) -> dict:
+                        sms_to: Optional[str] = None,
+                        use_outbox: bool = True) -> dict:
     """
     Kirim alert gempa via WhatsApp dan/atau SMS
     
@@ -160,10 +184,15 @@ def send_earthquake_alert(earthquake_data: dict,
         enable_sms: Enable notifikasi SMS
         wa_to: Nomor tujuan WhatsApp (opsional)
         sms_to: Nomor tujuan SMS (opsional)
+        use_outbox: Tulis ke outbox dulu; jika kirim gagal, alert di-queue
+                    dan dikirim ulang otomatis (lihat alert_outbox.py)
     
     Returns:
         dict: Hasil pengiriman notifikasi
     """
+    if use_outbox and OUTBOX_AVAILABLE:
+        return _send_earthquake_alert_outbox(earthquake_data, alert_level, enable_whatsapp, enable_sms, wa_to, sms_to)
+    
     result = {
         'success': False,
         'whatsapp_sent': False,
@@ -209,6 +238,55 @@ def send_earthquake_alert(earthquake_data: dict,
         result['errors'].append(f"Error umum: {e}")
         return result
 
+def _send_earthquake_alert_outbox(earthquake_data: dict, alert_level: str,
+                                  enable_whatsapp: bool, enable_sms: bool,
+                                  wa_to: Optional[str], sms_to: Optional[str]) -> dict:
+    """Versi send_earthquake_alert lewat outbox (hasil sama + daftar id outbox yang di-queue)."""
+    result = {
+        'success': False,
+        'whatsapp_sent': False,
+        'sms_sent': False,
+        'whatsapp_sids': [],
+        'sms_sids': [],
+        'queued_ids': [],
+        'errors': []
+    }
+    
+    channels = []
+    # Kredensial dicek dulu supaya alert tidak menumpuk di outbox tanpa bisa terkirim;
+    # channel aktif yang dilewati tetap dilaporkan di errors
+    if enable_whatsapp:
+        if not SEND_WA_AVAILABLE:
+            result['errors'].append("WhatsApp tidak dikirim: modul WhatsApp tidak tersedia")
+        elif not wa_configured():
+            result['errors'].append("WhatsApp tidak dikirim: kredensial WhatsApp belum dikonfigurasi")
+        else:
+            channels.append(('whatsapp', 'WhatsApp', format_earthquake_alert_whatsapp, wa_to))
+    if enable_sms:
+        if not SEND_SMS_AVAILABLE:
+            result['errors'].append("SMS tidak dikirim: modul SMS tidak tersedia")
+        elif not sms_configured():
+            result['errors'].append("SMS tidak dikirim: kredensial SMS belum dikonfigurasi")
+        else:
+            channels.append(('sms', 'SMS', format_earthquake_alert_sms, sms_to))
+    
+    for channel, label, formatter, to in channels:
+        try:
+            message = formatter(earthquake_data, alert_level)
+            sent = _send_earthquake_via_outbox(channel, message, earthquake_data, alert_level, to)
+            if sent['status'] == 'sent':
+                result[f'{channel}_sent'] = True
+                result[f'{channel}_sids'] = sent['sids']
+                print(f"✅ Alert gempa {label} berhasil dikirim: {len(sent['sids'])} pesan")
+            else:
+                result['queued_ids'].append(sent['id'])
+                result['errors'].append(f"Gagal mengirim alert gempa {label} (di-queue untuk dikirim ulang): {sent['error']}")
+        except Exception as e:
+            result['errors'].append(f"Error {label}: {e}")
+    
+    result['success'] = result['whatsapp_sent'] or result['sms_sent']
+    return result
+
 def test_earthquake_notification():
     """Test function untuk notifikasi gempa"""
     print("🔍 Testing Earthquake Notification...")
@@ -1,48 +1,30 @@
-
 # notify_sms.py
 # Helper to send SMS via Twilio.
 # - Prefer "TWILIO_MESSAGING_SERVICE_SID" if available.
 # - Fallback to "TWILIO_SMS_FROM" (Twilio number in E.164 format, e.g., +12025550123).
 # - Trial accounts: only verified numbers can receive SMS.
 # Reads credentials from Streamlit secrets or .env / environment variables.
-import os
-from typing import Optional, Iterable, Union, List
-
-# Try loading from dotenv first
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
-
-# Try loading from Streamlit secrets (for Streamlit Cloud)
-try:
-    import streamlit as st
-    if hasattr(st, 'secrets'):
-        # Override environment variables with Streamlit secrets if available
-        for key in st.secrets:
-            if key not in os.environ or not os.environ[key]:
-                os.environ[key] = st.secrets[key]
-except Exception:
-    pass
-
-from twilio.rest import Client
-
-ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-AUTH_TOKEN  = os.getenv("TWILIO_AUTH_TOKEN")
+# Import is cheap: settings are read and the Twilio client is built on first send.
+from typing import Optional, Iterable, Union, List, Dict
 
-MSID = os.getenv("TWILIO_MESSAGING_SERVICE_SID")  # disarankan untuk produksi
-SMS_FROM = os.getenv("TWILIO_SMS_FROM")           # fallback: nomor Twilio (E.164, mis. +1415...)
+from sms_format import sms_segments
+from notify_bulk import (bulk_dispatch, raise_first_error, get_setting, get_twilio_client,
+                         twilio_configured, DEFAULT_MAX_WORKERS)
 
-if not ACCOUNT_SID or not AUTH_TOKEN:
-    raise RuntimeError("TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN belum di-set. Please configure in Streamlit secrets or .env file.")
+def _sender_settings():
+    msid = get_setting("TWILIO_MESSAGING_SERVICE_SID")  # disarankan untuk produksi
+    sms_from = get_setting("TWILIO_SMS_FROM")           # fallback: nomor Twilio (E.164, mis. +1415...)
+    return msid, sms_from
 
-_client = Client(ACCOUNT_SID, AUTH_TOKEN)
+def is_configured() -> bool:
+    """True jika kredensial Twilio dan pengirim SMS sudah di-set (tanpa membuat client)."""
+    msid, sms_from = _sender_settings()
+    return twilio_configured() and bool(msid or sms_from)
 
 def _normalize_targets(to: Optional[Union[str, Iterable[str]]]) -> List[str]:
     if to is None:
         # try from env
-        env_to = os.getenv("SMS_TO", "").strip()
+        env_to = (get_setting("SMS_TO", "") or "").strip()
         to = env_to
     if isinstance(to, str):
         to_list = [t.strip() for t in to.split(",") if t.strip()]
@@ -56,23 +38,39 @@ def _normalize_targets(to: Optional[Union[str, Iterable[str]]]) -> List[str]:
 def send_sms(message: str, to: Optional[Union[str, Iterable[str]]] = None) -> List[str]:
     """
     Send SMS to one or more numbers (E.164, e.g., +62812xxxxxx).
-    Return: list of message_sid
+    Return: list of message_sid (raises the first error if any recipient failed)
     """
-    if not (MSID or SMS_FROM):
+    return raise_first_error(send_sms_bulk(message, to))
+
+def send_sms_bulk(message: str, to: Optional[Union[str, Iterable[str]]] = None,
+                  max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict]:
+    """
+    Send SMS to many numbers concurrently (E.164, e.g., +62812xxxxxx).
+    Return: list of {"to", "sid", "error"} per recipient (same order as `to`)
+    """
+    msid, sms_from = _sender_settings()
+    if not (msid or sms_from):
         raise RuntimeError("Either TWILIO_MESSAGING_SERVICE_SID or TWILIO_SMS_FROM must be set in .env")
-    sids = []
-    for dest in _normalize_targets(to):
-        if MSID:
-            msg = _client.messages.create(
-                messaging_service_sid=MSID,
+    client = get_twilio_client()  # raise RuntimeError jika kredensial belum di-set
+    targets = _normalize_targets(to)
+    info = sms_segments(message)
+    if info["segments"] > 1:
+        # Pesan panjang / ber-emoji dipecah jadi beberapa segmen (lebih lambat & mahal)
+        print(f"⚠️ SMS {info['encoding']} {info['chars']} char -> {info['segments']} segmen x {len(targets)} tujuan")
+
+    def _send_one(dest: str) -> str:
+        if msid:
+            msg = client.messages.create(
+                messaging_service_sid=msid,
                 to=dest,
                 body=message
             )
         else:
-            msg = _client.messages.create(
-                from_=SMS_FROM,
+            msg = client.messages.create(
+                from_=sms_from,
                 to=dest,
                 body=message
             )
-        sids.append(msg.sid)
-    return sids
+        return msg.sid
+
+    return bulk_dispatch(_send_one, targets, max_workers=max_workers)
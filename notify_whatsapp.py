@@ -1,49 +1,25 @@
 # notify_whatsapp.py
 # Helper to send WhatsApp via Twilio Sandbox/Business
 # Reads credentials from Streamlit secrets or .env / environment variables.
+# Import is cheap: settings are read and the Twilio client is built on first send.
 
-import os
-from typing import Optional, Iterable, Union, List
+from typing import Optional, Iterable, Union, List, Dict
 
-# Try loading from dotenv first
-try:
-    from dotenv import load_dotenv
-    load_dotenv()  # load .env if present
-except Exception:
-    pass
-
-# Try loading from Streamlit secrets (for Streamlit Cloud)
-try:
-    import streamlit as st
-    if hasattr(st, 'secrets'):
-        # Override environment variables with Streamlit secrets if available
-        for key in st.secrets:
-            if key not in os.environ or not os.environ[key]:
-                os.environ[key] = st.secrets[key]
-except Exception:
-    pass
-
-from twilio.rest import Client
-
-# Required (see .env or Streamlit secrets)
-ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-AUTH_TOKEN  = os.getenv("TWILIO_AUTH_TOKEN")
+from notify_bulk import (bulk_dispatch, raise_first_error, get_setting, get_twilio_client,
+                         twilio_configured, DEFAULT_MAX_WORKERS)
 
 # Sender number (Twilio WhatsApp). Sandbox default: whatsapp:+14155238886
-FROM = os.getenv("TWILIO_WHATSAPP_FROM", "whatsapp:+14155238886")
-
-# Default recipient(s) (comma-separated allowed)
-# Format: 'whatsapp:+62xxxxxxxxxx'
-TO_DEFAULT = os.getenv("WHATSAPP_TO", "").strip()
+DEFAULT_FROM = "whatsapp:+14155238886"
 
-if not ACCOUNT_SID or not AUTH_TOKEN:
-    raise RuntimeError("TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN are not set. Please configure in Streamlit secrets or .env file.")
-
-_client = Client(ACCOUNT_SID, AUTH_TOKEN)
+def is_configured() -> bool:
+    """True if Twilio credentials are set (no client is created)."""
+    return twilio_configured()
 
 def _normalize_targets(to: Optional[Union[str, Iterable[str]]]) -> List[str]:
     if to is None or (isinstance(to, str) and not to.strip()):
-        to = TO_DEFAULT
+        # Default recipient(s) (comma-separated allowed)
+        # Format: 'whatsapp:+62xxxxxxxxxx'
+        to = (get_setting("WHATSAPP_TO", "") or "").strip()
     if isinstance(to, str):
         to_list = [t.strip() for t in to.split(",") if t.strip()]
     else:
@@ -64,30 +40,44 @@ def send_whatsapp(message: str, to: Optional[Union[str, Iterable[str]]] = None,
     - message: text content
     - to: single string, comma-separated, or list[str]
     - media_url: optional image/file URL
-    return: list of message_sid
+    return: list of message_sid (raises the first error if any recipient failed)
+    """
+    return raise_first_error(send_whatsapp_bulk(message, to, media_url))
+
+def send_whatsapp_bulk(message: str, to: Optional[Union[str, Iterable[str]]] = None, media_url: Optional[str] = None,
+                       max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict]:
+    """
+    Send WhatsApp message to many recipients concurrently.
+    - message: text content
+    - to: single string, comma-separated, or list[str]
+    - media_url: optional image/file URL
+    - max_workers: max parallel requests
+    return: list of {"to", "sid", "error"} per recipient (same order as `to`)
     """
-    sids = []
-    for dest in _normalize_targets(to):
-        kwargs = {"from_": FROM, "to": dest, "body": message}
+    client = get_twilio_client()  # raises RuntimeError if credentials are missing
+    sender = get_setting("TWILIO_WHATSAPP_FROM", DEFAULT_FROM)
+    targets = _normalize_targets(to)
+
+    def _send_one(dest: str) -> str:
+        kwargs = {"from_": sender, "to": dest, "body": message}
         if media_url:
             kwargs["media_url"] = [media_url]
-        msg = _client.messages.create(**kwargs)
-        sids.append(msg.sid)
-    return sids
+        return client.messages.create(**kwargs).sid
 
-def send_tsunami_alert_whatsapp(extreme_count: int, peak_y: int, frame_idx: int, to: Optional[Union[str, Iterable[str]]] = None, location: Optional[str] = None) -> List[str]:
+    return bulk_dispatch(_send_one, targets, max_workers=max_workers)
+
+def format_tsunami_alert_whatsapp(extreme_count: int, peak_y: int, frame_idx: int, location: Optional[str] = None) -> str:
     """
-    Send dedicated tsunami alert via WhatsApp.
+    Build the tsunami alert WhatsApp message (rich formatting).
     
     Args:
         extreme_count (int): Number of consecutive EXTREME detections
         peak_y (int): Wave peak Y position
         frame_idx (int): Frame number
-        to (str, optional): Destination (+62... or whatsapp:+62...)
         location (str, optional): Camera location (env fallback)
     
     Returns:
-        list[str]: List of message SIDs
+        str: Message body
     """
     
     from datetime import datetime
@@ -97,13 +87,13 @@ def send_tsunami_alert_whatsapp(extreme_count: int, peak_y: int, frame_idx: int,
         location_text = location
     else:
         # Try from environment variable
-        camera_location = os.getenv("CAMERA_LOCATION", "")
+        camera_location = get_setting("CAMERA_LOCATION", "")
         if camera_location:
             location_text = camera_location
         else:
             location_text = "[YOUR CAMERA LOCATION]"
     
-    alert_message = f"""🚨 *POTENTIAL TSUNAMI ALERT!* 🚨
+    return f"""🚨 *POTENTIAL TSUNAMI ALERT!* 🚨
 
 The wave detection system has detected *{extreme_count} consecutive* EXTREME waves (> 4 meters).
 
@@ -117,5 +107,20 @@ The wave detection system has detected *{extreme_count} consecutive* EXTREME wav
 Contact local authorities now!
 
 _Automatic Wave Detection System - Tsunami Alert_"""
+
+def send_tsunami_alert_whatsapp(extreme_count: int, peak_y: int, frame_idx: int, to: Optional[Union[str, Iterable[str]]] = None, location: Optional[str] = None) -> List[str]:
+    """
+    Send dedicated tsunami alert via WhatsApp.
     
-    return send_whatsapp(alert_message, to)
\ No newline at end of file
+    Args:
+        extreme_count (int): Number of consecutive EXTREME detections
+        peak_y (int): Wave peak Y position
+        frame_idx (int): Frame number
+        to (str, optional): Destination (+62... or whatsapp:+62...)
+        location (str, optional): Camera location (env fallback)
+    
+    Returns:
+        list[str]: List of message SIDs
+    """
+    alert_message = format_tsunami_alert_whatsapp(extreme_count, peak_y, frame_idx, location)
+    return send_whatsapp(alert_message, to)
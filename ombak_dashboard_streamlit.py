@@ -7,10 +7,31 @@
 # - Tab "📈 Log & Grafik / Laporan (PDF)"
 # - Persistent Configuration dengan auto-save
 
-import os, io, time, csv, cv2, numpy as np, pandas as pd, streamlit as st, glob, tempfile
+import os, time, streamlit as st, glob, tempfile
 from datetime import datetime, date
+# cv2 / numpy / pandas / plotly di-import lazy di tempat dipakai (cold start lebih cepat)
 from typing import Tuple
-from dashboard_config import load_config, save_config
+from dashboard_config import load_config, save_config, get_config_store, update_config
+from sms_format import format_tsunami_sms, format_wave_sms, sms_segments
+from log_writer import (get_log_writer, make_log_row, STATUS_LEVELS, DEFAULT_FLUSH_INTERVAL_SEC,
+                        DEFAULT_FLUSH_EVERY_ROWS, DEFAULT_FSYNC_INTERVAL_SEC)
+from log_parquet import PARQUET_AVAILABLE, ParquetLogStore
+from log_sqlite import get_sqlite_store
+from log_csv_cache import load_csv_incremental
+from log_aggregate import (LogAggregator, aggregate_file, aggregate_logs, PERIOD_COLUMNS, period_partials,
+                           period_table)
+from log_report import REPORTLAB_AVAILABLE, get_report_service, render_report, report_key
+from report_scheduler import load_index as load_report_index
+from log_rotation import list_segments
+from log_runs import RunLengthStore
+from log_backends import LOG_BACKENDS, sink_factory_for
+from frame_store import FrameStore, get_frame_recorder
+from rtsp_probe import host_port, probe_candidates, tcp_check
+from stream_capture import (LIVE_PARAM_KEYS, connect_with_retries, current_capture, get_live_params,
+                            get_shared_capture, release_shared_capture)
+from stream_health import (HEALTH_COLUMNS, correlate_gaps, detection_gaps, ensure_health_recorder,
+                           get_health_store)
+from log_rollup import RollupStore, rollup_path_for, choose_resolution, span_minutes, summarize_rows
 
 st.set_page_config(page_title="🌊 Wave Dashboard + Tsunami Alert", layout="wide")
 st.title("🌊 Wave Dashboard + Tsunami Alert")
@@ -18,31 +39,18 @@ st.title("🌊 Wave Dashboard + Tsunami Alert")
 # AUTO-RECONNECTION & ERROR HANDLING UTilities
 
 def smart_rtsp_connect(url, max_retries=1, timeout=5):
-    """Smart RTSP connection - minimal and stable"""
-    
-    # Gunakan protocol yang sudah stabil sebelumnya atau default
-    if not hasattr(st.session_state, 'working_rtsp_protocol'):
-        # Protocol standard yang lebih stabil
-        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp|stimeout;5000000|max_delay;500000"
-    else:
-        # Gunakan protocol yang sudah terbukti bekerja
-        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = st.session_state.working_rtsp_protocol
-    
-    os.environ["OPENCV_FFMPEG_LOGLEVEL"] = "quiet"
-    
-    # Coba connect dengan timeout cepat
-    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
-    
-    if cap.isOpened():
-        ret, frame = cap.read()
-        if ret and frame is not None:
-            # Success - simpan protocol yang bekerja
-            if not hasattr(st.session_state, 'working_rtsp_protocol'):
-                st.session_state.working_rtsp_protocol = "rtsp_transport;tcp|stimeout;5000000|max_delay;500000"
-            return cap
-        cap.release()
-    
-    return None
+    """RTSP connect dengan batas waktu per percobaan dan backoff + jitter antar percobaan.
+    Tanpa st.session_state: aman dipanggil dari thread supervisor reconnect."""
+    return connect_with_retries(url, max_retries=max_retries, timeout_sec=timeout,
+                                base_sec=config.get("rtsp_backoff_base_sec", 1.0),
+                                max_sec=config.get("rtsp_backoff_max_sec", 60),
+                                transport=config.get("rtsp_transport", "tcp"))
+
+def open_video_file(path):
+    """Buka file video; None jika tidak bisa dibuka (opener untuk get_shared_capture)."""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    return cap if cap.isOpened() else None
 
 def enhanced_error_diagnosis(rtsp_url):
     """Diagnose RTSP errors with specific solutions"""
@@ -57,6 +65,7 @@ def enhanced_error_diagnosis(rtsp_url):
             parts = rtsp_url.split('@')
             if len(parts) == 2:
                 auth, remote = parts
+                auth = auth.split('://', 1)[-1]  # buang skema: "rtsp://admin" -> "admin"
                 if ':' in auth:
                     username, password = auth.split(':', 1)
                     ip_part = remote.split('/')[0]
@@ -110,6 +119,30 @@ def show_enhanced_error_message(rtsp_url):
     for i, solution in enumerate(diagnosis['solutions'][:5], 1):
         st.markdown(f"{i}. {solution}")
     
+    # Probe paralel (rtsp_probe.py): cek port TCP lalu buka semua kandidat sekaligus (tcp & udp)
+    candidates = [rtsp_url] + diagnosis['alternative_urls']
+    if st.button(f"⚡ Probe {len(candidates)} URL (parallel)", type="primary", key="btn_probe_urls"):
+        with st.spinner("Probing candidate URLs..."):
+            st.session_state.rtsp_probe_results = probe_candidates(
+                candidates, stream_timeout_sec=config.get("rtsp_connect_timeout_sec", 10))
+    probe_results = st.session_state.get("rtsp_probe_results")
+    if probe_results:
+        import pandas as pd
+        st.dataframe(pd.DataFrame(probe_results)[["ok", "url", "transport", "tcp_ms", "open_ms", "first_frame_ms",
+                                                  "total_ms", "error"]], width="stretch", hide_index=True)
+        best = probe_results[0]
+        if best["ok"]:
+            st.success(f"✅ Fastest: {best['url']} ({best['transport']}, {best['total_ms']:.0f} ms)")
+            if st.button("Use fastest URL", key="btn_use_fastest_url"):
+                st.session_state.rtsp_url_session = best["url"]
+                update_config("rtsp_url", best["url"])
+                update_config("rtsp_transport", best["transport"])
+                st.session_state.rtsp_probe_results = None
+                st.session_state.running = True
+                st.rerun()
+        else:
+            st.warning("⚠️ No candidate URL returned a frame")
+
     if diagnosis['alternative_urls']:
         st.markdown("**🔧 Alternative RTSP URLs to Try:**")
         for i, alt_url in enumerate(diagnosis['alternative_urls'], 1):
@@ -137,56 +170,89 @@ def show_enhanced_error_message(rtsp_url):
             ping_test_rtsp(rtsp_url)
 
 def ping_test_rtsp(rtsp_url):
-    """Test basic network connectivity to the camera IP"""
+    """Test basic network connectivity to the camera IP (ping + port TCP stream)"""
     import subprocess
-    ip = rtsp_url.split('@')[1].split(':')[0] if '@' in rtsp_url else ''
+    ip, port = host_port(rtsp_url)
     if ip:
         try:
-            result = subprocess.run(['ping', '-n', '1', ip], capture_output=True, timeout=5)
+            # -n di Windows, -c di Linux / macOS (Raspberry Pi)
+            count_flag = '-n' if os.name == 'nt' else '-c'
+            result = subprocess.run(['ping', count_flag, '1', ip], capture_output=True, timeout=5)
             if result.returncode == 0:
                 st.success(f"✅ IP {ip} is reachable via network")
             else:
                 st.error(f"❌ IP {ip} is not reachable - check network connection")
         except Exception as e:
             st.warning(f"⚠️ Ping test error: {e}")
+        # Kamera sering memblokir ICMP: cek juga port stream langsung
+        check = tcp_check(ip, port)
+        if check["ok"]:
+            st.success(f"✅ Port {port} open ({check['connect_ms']:.0f} ms)")
+        else:
+            st.error(f"❌ Port {port} not reachable: {check['error']}")
     else:
         st.error("❌ Cannot extract IP from RTSP URL")
 
 # Connection Monitor Function
 def show_connection_monitor():
-    """Show connection monitor in the sidebar"""
+    """Show connection monitor in the sidebar (health dari supervisor capture, stream_capture.py)"""
     with st.sidebar.expander("🔍 Connection Monitor", expanded=False):
-        if hasattr(st.session_state, 'running') and st.session_state.running:
-            rtsp_url = st.session_state.get('rtsp_url_session', '')
-            failures = getattr(st.session_state, 'consecutive_failures', 0)
-            last_frame = getattr(st.session_state, 'last_frame_time', 0)
-            time_since_last = time.time() - last_frame if last_frame > 0 else 0
-            
-            st.metric("Consecutive Failures", failures)
-            st.metric("Seconds Since Last Frame", f"{time_since_last:.1f}s")
+        cap = current_capture()
+        if hasattr(st.session_state, 'running') and st.session_state.running and cap is not None and cap.live:
+            health = cap.health()
+            st.metric("State", health["state"])
+            st.metric("Seconds Since Last Frame", f"{health['frame_age_sec'] or 0:.1f}s")
+            c1, c2 = st.columns(2)
+            c1.metric("Reconnects", health["reconnects"])
+            c2.metric("Outages", health["outages"])
+            if health["mean_reconnect_sec"] is not None:
+                st.caption(f"Reconnect latency rata-rata {health['mean_reconnect_sec']:.1f}s · "
+                           f"total outage {health['total_outage_sec']:.0f}s (maks {health['max_outage_sec']:.0f}s)")
             
-            if failures > 0:
-                st.warning("⚠️ Connection issues detected")
+            if health["state"] == "reconnecting":
+                st.warning(f"⚠️ Reconnecting ({health['outage_sec'] or 0:.0f}s, "
+                           f"{health['outage_attempts']} attempts)")
             
             if st.button("🔄 Force Reconnect", key="btn_force_reconnect"):
-                st.session_state.running = False
-                st.rerun()
+                cap.force_reconnect()
 
 # ===== Optional WhatsApp & SMS =====
+# Import murah: client Twilio baru dibuat (sekali, singleton) saat kirim pertama
 SEND_WA_AVAILABLE = False
 try:
-    from notify_whatsapp import send_whatsapp, send_tsunami_alert_whatsapp
-    SEND_WA_AVAILABLE = True
+    from notify_whatsapp import send_whatsapp, send_tsunami_alert_whatsapp, format_tsunami_alert_whatsapp
+    from notify_whatsapp import is_configured as wa_configured
+    SEND_WA_AVAILABLE = wa_configured()
 except Exception:
     SEND_WA_AVAILABLE = False
 
 SEND_SMS_AVAILABLE = False
 try:
     from notify_sms import send_sms
-    SEND_SMS_AVAILABLE = True
+    from notify_sms import is_configured as sms_configured
+    SEND_SMS_AVAILABLE = sms_configured()
 except Exception:
     SEND_SMS_AVAILABLE = False
 
+# ===== Alert Outbox (persisten, kirim di background) =====
+OUTBOX_AVAILABLE = False
+try:
+    from alert_outbox import get_outbox, start_sender, PRIORITY_TSUNAMI, PRIORITY_WAVE
+    start_sender()  # singleton, aman dipanggil setiap rerun
+    OUTBOX_AVAILABLE = True
+except Exception as e:
+    print(f"Alert outbox not available: {e}")
+    OUTBOX_AVAILABLE = False
+    PRIORITY_TSUNAMI, PRIORITY_WAVE = 0, 20
+
+def queue_alert(channel: str, message: str, to=None, priority: int = PRIORITY_WAVE, key=None) -> str:
+    """Tulis alert ke outbox (detection loop tidak menunggu Twilio); fallback kirim langsung."""
+    if OUTBOX_AVAILABLE:
+        alert_id = get_outbox().enqueue(channel, message, to=to, priority=priority, idempotency_key=key)
+        return f"queued #{alert_id}"
+    sender = send_whatsapp if channel == "whatsapp" else send_sms
+    return "SID(s): " + ", ".join(sender(message, to))
+
 
 # ===== Load Configuration =====
 config = load_config()
@@ -195,6 +261,33 @@ config = load_config()
 st.sidebar.header("📄 Data")
 csv_path = st.sidebar.text_input("CSV log path", value=config.get("csv_path", os.getenv("OMBAK_CSV_PATH","deteksi_ombak.csv")))
 sample_every_sec = st.sidebar.number_input("Log write interval (seconds)", 1, 60, config.get("sample_every_sec", 2))
+log_backend = st.sidebar.selectbox(
+    "Log storage backend", LOG_BACKENDS,
+    index=LOG_BACKENDS.index(config.get("log_backend", "csv")) if config.get("log_backend", "csv") in LOG_BACKENDS else 0,
+    help="parquet: file kolumnar per tanggal, query rentang tanggal hanya membaca partisi yang dipilih; "
+         "sqlite: database WAL ber-index, metrik & riwayat alert lewat query ber-index; "
+         "runs: hanya simpan saat status / peak Y berubah atau tiap heartbeat (hemat di jam tenang)"
+)
+parquet_dir = config.get("parquet_dir", "deteksi_ombak_parquet")
+sqlite_path = config.get("sqlite_path", "deteksi_ombak.db")
+runs_path = config.get("runs_path", "deteksi_ombak.runs.db")
+if log_backend == "parquet":
+    parquet_dir = st.sidebar.text_input("Parquet log folder", value=parquet_dir)
+    if not PARQUET_AVAILABLE:
+        st.sidebar.warning("Paket pyarrow belum terpasang (`pip install pyarrow`). Log kembali ke CSV.")
+        log_backend = "csv"
+elif log_backend == "sqlite":
+    sqlite_path = st.sidebar.text_input("SQLite log path", value=sqlite_path)
+elif log_backend == "runs":
+    runs_path = st.sidebar.text_input("Run log path", value=runs_path)
+enable_frame_store = st.sidebar.checkbox(
+    "Record every frame (binary)", value=config.get("enable_frame_store", False),
+    help="Simpan peak Y, status & jumlah garis setiap frame terdeteksi ke file biner harian "
+         "(13 byte/frame), terpisah dari interval log di atas"
+)
+frame_store_dir = config.get("frame_store_dir", "deteksi_ombak_frames")
+if enable_frame_store:
+    frame_store_dir = st.sidebar.text_input("Frame store folder", value=frame_store_dir)
 
 st.sidebar.header("🎥 Video Source")
 
@@ -330,6 +423,8 @@ sms_cooldown_sec = st.sidebar.number_input("SMS cooldown (seconds)", 30, 3600, c
 with st.sidebar.expander("✉️ Send SMS Test", expanded=False):
     sms_to_override = st.text_input("SMS number (optional, E.164: +62...)", value=config.get("sms_to_override", os.getenv("SMS_TO","")), key="sms_to_override")
     sms_test_msg = st.text_area("SMS test message", value="SMS test from wave dashboard ✅", height=80, key="sms_test_msg")
+    _seg = sms_segments(sms_test_msg)
+    st.caption(f"{_seg['encoding']} · {_seg['chars']} chars · {_seg['segments']} segment(s)")
     if st.button("Send SMS Test", key="btn_send_sms_test"):
         if not SEND_SMS_AVAILABLE:
             st.error("notify_sms.py not found / credentials not set.")
@@ -370,35 +465,50 @@ with st.sidebar.expander("🚨 Send WhatsApp Tsunami Alert (Test)", expanded=Fal
                 st.error(f"Failed to send Tsunami Alert: {e}")
 
 # ===== Auto-Save Configuration =====
-def auto_save_config():
-    """Automatically save configuration."""
+def sidebar_config_values() -> dict:
+    """Nilai widget sidebar yang disimpan ke config."""
+    return {
+        "csv_path": csv_path,
+        "sample_every_sec": sample_every_sec,
+        "log_backend": log_backend,
+        "parquet_dir": parquet_dir,
+        "sqlite_path": sqlite_path,
+        "runs_path": runs_path,
+        "enable_frame_store": enable_frame_store,
+        "frame_store_dir": frame_store_dir,
+        "rtsp_url": rtsp_url,
+        "resize_width": resize_width,
+        "camera_location": camera_location,
+        "garis_extreme_y": GARIS_EXTREME_Y,
+        "garis_sangat_tinggi_y": GARIS_SANGAT_TINGGI_Y,
+        "garis_tinggi_y": GARIS_TINGGI_Y,
+        "garis_sedang_y": GARIS_SEDANG_Y,
+        "garis_rendah_y": GARIS_RENDAH_Y,
+        "line_thickness": line_thickness,
+        "peak_thickness": peak_thickness,
+        "font_scale": font_scale,
+        "font_thickness": font_thickness,
+        "enable_wa": enable_wa,
+        "wa_cooldown_sec": wa_cooldown_sec,
+        "enable_sms": enable_sms,
+        "sms_cooldown_sec": sms_cooldown_sec,
+        "extreme_threshold": extreme_threshold,
+        "alert_cooldown_min": alert_cooldown_min,
+        "enable_tsunami_alert": enable_tsunami_alert,
+        "wa_to_override": wa_to_override,
+        "sms_to_override": sms_to_override,
+        "tsunami_wa_to_override": tsunami_wa_to_override
+    }
+
+def auto_save_config(changed_only: bool = False):
+    """Simpan konfigurasi. changed_only: hanya widget yang berubah di rerun ini (sidebar_changed), supaya
+    perubahan file config dari luar (sudah diterapkan listener ConfigStore) tidak ditimpa nilai lama."""
     try:
-        current_config = {
-            "csv_path": csv_path,
-            "sample_every_sec": sample_every_sec,
-            "rtsp_url": rtsp_url,
-            "resize_width": resize_width,
-            "camera_location": camera_location,
-            "garis_extreme_y": GARIS_EXTREME_Y,
-            "garis_sangat_tinggi_y": GARIS_SANGAT_TINGGI_Y,
-            "garis_tinggi_y": GARIS_TINGGI_Y,
-            "garis_sedang_y": GARIS_SEDANG_Y,
-            "garis_rendah_y": GARIS_RENDAH_Y,
-            "line_thickness": line_thickness,
-            "peak_thickness": peak_thickness,
-            "font_scale": font_scale,
-            "font_thickness": font_thickness,
-            "enable_wa": enable_wa,
-            "wa_cooldown_sec": wa_cooldown_sec,
-            "enable_sms": enable_sms,
-            "sms_cooldown_sec": sms_cooldown_sec,
-            "extreme_threshold": extreme_threshold,
-            "alert_cooldown_min": alert_cooldown_min,
-            "enable_tsunami_alert": enable_tsunami_alert,
-            "wa_to_override": wa_to_override,
-            "sms_to_override": sms_to_override,
-            "tsunami_wa_to_override": tsunami_wa_to_override
-        }
+        if changed_only:
+            return get_config_store().update(sidebar_changed) if sidebar_changed else True
+        # Mulai dari config yang dimuat supaya key tanpa widget (mis. log_*) tidak hilang
+        current_config = dict(config)
+        current_config.update(sidebar_config_values())
         save_config(current_config)
         return True
     except Exception as e:
@@ -466,6 +576,23 @@ else:
 if not verbose_debug:
     st.sidebar.info("🔇 Quiet mode: Minimal notifications")
 
+# Parameter deteksi live (stream_capture.py): loop deteksi membaca snapshot ini tiap frame, jadi
+# perubahan garis / resize / overlay berlaku di frame berikutnya tanpa reconnect stream
+# Hanya nilai sidebar yang berubah di rerun ini yang diteruskan (ke live_params & file config);
+# nilai yang tidak disentuh tidak boleh menimpa perubahan config dari luar (listener ConfigStore)
+sidebar_values = sidebar_config_values()
+_prev_sidebar = st.session_state.get("sidebar_values")
+st.session_state.sidebar_values = sidebar_values
+sidebar_changed = {} if _prev_sidebar is None else {
+    k: v for k, v in sidebar_values.items() if _prev_sidebar.get(k) != v}
+live_params = get_live_params()
+live_params.attach(get_config_store())
+_live_now = live_params.get()
+live_params.update(dict(
+    {k: v for k, v in sidebar_values.items()
+     if k in LIVE_PARAM_KEYS and (k in sidebar_changed or k not in _live_now)},
+    detection_mode=detection_mode))
+
 # Show Connection Monitor
 show_connection_monitor()
 
@@ -758,19 +885,28 @@ def classify_main_style(peak_y: int, L: dict) -> Tuple[str, tuple]:
     return status, warna
 
 def detect_peak_y_hough(frame_bgr):
+    import cv2, numpy as np
     gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
     blur = cv2.GaussianBlur(gray, (7,7), 0)
     edges = cv2.Canny(blur, 50, 150)
     lines = cv2.HoughLinesP(edges, 1, np.pi/180, 80, minLineLength=90, maxLineGap=30)
     h = frame_bgr.shape[0]; peak_y = h
     if lines is not None:
-        for l in lines:
-            x1,y1,x2,y2 = l[0]
+        # OpenCV 4 -> (N,1,4), OpenCV 5 -> (N,4)
+        for x1,y1,x2,y2 in lines.reshape(-1, 4):
             peak_y = min(peak_y, y1, y2)
             cv2.line(frame_bgr, (x1,y1),(x2,y2),(0,0,255),2)
     return int(peak_y), lines
 
-def draw_overlay(frame, L, peak_y, status, color, extreme_count=0, alert_sent=False):
+def draw_overlay(frame, L, peak_y, status, color, extreme_count=0, alert_sent=False, style=None):
+    import cv2
+    # style: snapshot live_params (ketebalan / font / threshold terbaru); default nilai sidebar
+    style = style or {}
+    line_thickness = style.get("line_thickness", globals()["line_thickness"])
+    peak_thickness = style.get("peak_thickness", globals()["peak_thickness"])
+    font_scale = style.get("font_scale", globals()["font_scale"])
+    font_thickness = style.get("font_thickness", globals()["font_thickness"])
+    extreme_threshold = style.get("extreme_threshold", globals()["extreme_threshold"])
     h,w = frame.shape[:2]
     cv2.line(frame,(0,L['EXTREME']),(w,L['EXTREME']),(0,0,139),line_thickness)
     cv2.line(frame,(0,L['SANGAT_TINGGI']),(w,L['SANGAT_TINGGI']),(0,0,255),line_thickness)
@@ -795,42 +931,36 @@ def draw_overlay(frame, L, peak_y, status, color, extreme_count=0, alert_sent=Fa
     
     cv2.putText(frame,datetime.now().strftime("%Y-%m-%d %H:%M:%S"),(10,h-10),cv2.FONT_HERSHEY_SIMPLEX,0.6,(255,255,255),2)
 
-# ===== CSV Helpers (diperbarui untuk extreme count) =====
-CSV_FIELDS = [
-    "timestamp","tanggal","jam","frame",
-    "puncak_ombak_y","status_ombak","jumlah_garis_terdeteksi","extreme_count","alert_sent"
-]
-
-def ensure_csv_header(path: str):
-    if not os.path.exists(path):
-        with open(path,"w",newline="",encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-            writer.writeheader()
-
-def append_csv(path: str, frame_idx: int, peak_y: int, status: str, num_lines: int, extreme_count: int = 0, alert_sent: bool = False):
-    """Tulis baris CSV aman (status bisa mengandung koma)."""
-    ensure_csv_header(path)
-    ts = datetime.now()
-    row = {
-        "timestamp": ts.isoformat(),
-        "tanggal": ts.strftime("%Y-%m-%d %H:%M:%S"),
-        "jam": ts.strftime("%H:%M:%S"),
-        "frame": frame_idx,
-        "puncak_ombak_y": peak_y,
-        "status_ombak": status,
-        "jumlah_garis_terdeteksi": num_lines,
-        "extreme_count": extreme_count,
-        "alert_sent": alert_sent,
-    }
-    with open(path,"a",newline="",encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writerow(row)
+# ===== Log Helpers (background writer, lihat log_writer.py / log_parquet.py) =====
+def active_log_path() -> str:
+    """File / folder log mentah untuk backend aktif."""
+    return {"parquet": parquet_dir, "sqlite": sqlite_path, "runs": runs_path}.get(log_backend, csv_path)
+
+def get_detection_writer():
+    """Writer background singleton untuk backend log aktif (CSV, Parquet per tanggal, SQLite atau runs)."""
+    return get_log_writer(
+        active_log_path(),
+        sink_factory=sink_factory_for(log_backend, config),
+        flush_interval_sec=config.get("log_flush_interval_sec", DEFAULT_FLUSH_INTERVAL_SEC),
+        flush_every_rows=config.get("log_flush_every_rows", DEFAULT_FLUSH_EVERY_ROWS),
+        fsync_interval_sec=config.get("log_fsync_interval_sec", DEFAULT_FSYNC_INTERVAL_SEC),
+    )
+
+def append_log(frame_idx: int, peak_y: int, status: str, num_lines: int, extreme_count: int = 0, alert_sent: bool = False):
+    """Antrikan satu row log ke writer background (status bisa mengandung koma, di-quote oleh csv)."""
+    get_detection_writer().write(make_log_row(frame_idx, peak_y, status, num_lines, extreme_count, alert_sent))
+
+def record_frame(peak_y: int, status: str, hough_lines):
+    """Rekam hasil deteksi satu frame ke frame store (jika diaktifkan); buffer NumPy, tulis per blok."""
+    if enable_frame_store:
+        get_frame_recorder(frame_store_dir).record(peak_y, status, 0 if hough_lines is None else len(hough_lines))
 
 # ===== Twilio Helper Functions =====
-def check_tsunami_alert_condition(extreme_count: int, last_alert_time: float, cooldown_minutes: int) -> bool:
-    """Cek apakah perlu mengirim alert tsunami."""
+def check_tsunami_alert_condition(extreme_count: int, last_alert_time: float, cooldown_minutes: int,
+                                  threshold: int) -> bool:
+    """Cek apakah perlu mengirim alert tsunami (threshold = nilai live, sama dengan overlay)."""
     # Cek apakah sudah mencapai threshold
-    if extreme_count < extreme_threshold:
+    if extreme_count < threshold:
         return False
     
     # Cek cooldown
@@ -842,8 +972,8 @@ def check_tsunami_alert_condition(extreme_count: int, last_alert_time: float, co
     return True
 
 with TAB_LIVE:
-    # Auto-save konfigurasi saat ada perubahan
-    auto_save_config()
+    # Auto-save konfigurasi saat ada perubahan (hanya widget yang diubah di rerun ini)
+    auto_save_config(changed_only=True)
     
     c1,c2,_ = st.columns([1,1,6])
     with c1: start_btn = st.button("▶️ Start", key="btn_start_stream")
@@ -865,6 +995,7 @@ with TAB_LIVE:
     
     if stop_btn: 
         st.session_state.running = False
+        release_shared_capture()
 
     frame_holder = st.empty(); info_holder = st.empty()
     
@@ -897,23 +1028,43 @@ with TAB_LIVE:
     cap = None
     source_type = ""
     source_name = ""
+    if st.session_state.running:
+        import cv2
     
+    if not st.session_state.running and rtsp_url and st.session_state.get("rtsp_failed_url") == rtsp_url:
+        # Panel diagnosa tetap tampil setelah rerun (tombol Probe / Try URL / Health Check)
+        show_enhanced_error_message(rtsp_url)
+
     if st.session_state.running and rtsp_url:
-        # Gunakan smart connection dengan auto-retry untuk RTSP
-        cap = smart_rtsp_connect(rtsp_url, max_retries=3, timeout=10)
+        # Koneksi RTSP bersama: rerun karena ubah parameter memakai koneksi yang sama,
+        # negosiasi ulang hanya jika URL berubah. Putus -> supervisor reconnect di thread capture.
+        rtsp_timeout = config.get("rtsp_connect_timeout_sec", 10)
+        cap = get_shared_capture(rtsp_url, lambda url: smart_rtsp_connect(url, max_retries=1, timeout=rtsp_timeout),
+                                 open_retries=config.get("rtsp_connect_retries", 3),
+                                 stall_sec=config.get("rtsp_stall_sec", 60),
+                                 backoff_base_sec=config.get("rtsp_backoff_base_sec", 1.0),
+                                 backoff_max_sec=config.get("rtsp_backoff_max_sec", 60))
         if cap is None:
             # Show enhanced error message dengan diagnosa
             show_enhanced_error_message(rtsp_url)
+            st.session_state.rtsp_failed_url = rtsp_url
             st.session_state.running = False
         else:
+            st.session_state.rtsp_failed_url = None
             source_type = "RTSP Stream"
             source_name = rtsp_url
+            if config.get("stream_health_enabled", True):
+                # Sampel kualitas stream per kamera (thread sendiri, bertahan lintas rerun)
+                try:
+                    host, port = host_port(rtsp_url)
+                    ensure_health_recorder(cap, config.get("stream_health_path", "stream_health.db"),
+                                           config.get("camera_location") or f"{host}:{port}",
+                                           interval_sec=config.get("stream_health_interval_sec", 10),
+                                           keep_days=config.get("stream_health_keep_days", 30))
+                except Exception as e:
+                    print(f"Stream health recorder not available: {e}")
             
             # Initialize connection monitoring dan detection variables
-            if not hasattr(st.session_state, 'consecutive_failures'):
-                st.session_state.consecutive_failures = 0
-            if not hasattr(st.session_state, 'last_frame_time'):
-                st.session_state.last_frame_time = time.time()
             if not hasattr(st.session_state, 'last_peak_y'):
                 st.session_state.last_peak_y = 500  # Default nilai aman
             if not hasattr(st.session_state, 'last_status'):
@@ -924,7 +1075,7 @@ with TAB_LIVE:
     elif st.session_state.running and video_file:
         # Video file mode
         if os.path.exists(video_file):
-            cap = cv2.VideoCapture(video_file)
+            cap = get_shared_capture(video_file, open_video_file, live=False)
             if cap is None or not cap.isOpened():
                 st.error(f"❌ Cannot open video file: {video_file}")
                 st.session_state.running = False
@@ -933,10 +1084,6 @@ with TAB_LIVE:
                 source_name = os.path.basename(video_file)
                 
                 # Initialize detection variables
-                if not hasattr(st.session_state, 'consecutive_failures'):
-                    st.session_state.consecutive_failures = 0
-                if not hasattr(st.session_state, 'last_frame_time'):
-                    st.session_state.last_frame_time = time.time()
                 if not hasattr(st.session_state, 'last_peak_y'):
                     st.session_state.last_peak_y = 500
                 if not hasattr(st.session_state, 'last_status'):
@@ -949,17 +1096,15 @@ with TAB_LIVE:
     
     
     if cap and cap.isOpened():
-        if resize_width>0: cap.set(cv2.CAP_PROP_FRAME_WIDTH, resize_width)
+        # Tanpa cap.set(FRAME_WIDTH): diabaikan backend FFmpeg, frame di-resize sesudah read()
         info_holder.success(f"✅ {source_type} berhasil terhubung: {source_name}")
         info_holder.info("Klik Stop untuk menghentikan stream")
         fail = 0
         while st.session_state.running:
             ok, frame = cap.read()
             
-            # Stable connection monitoring - hanya reconnect jika benar-benar mati 1 menit
+            # Frame kosong: akhir video file, atau stream RTSP sedang putus (lihat supervisor)
             if not ok or frame is None:
-                current_time = time.time()
-                
                 # Handle video file end vs RTSP connection issue
                 if video_file:
                     # Video file reached end - loop back or stop
@@ -978,65 +1123,53 @@ with TAB_LIVE:
                         break
                 
                 elif rtsp_url:
-                    # RTSP stream - handle reconnection
-                    # Initialize last_successful_frame jika belum ada
-                    if not hasattr(st.session_state, 'last_successful_frame'):
-                        st.session_state.last_successful_frame = current_time
-                    
-                    # Update last successful frame time untuk hitung downtime
-                    minutes_without_frame = (current_time - st.session_state.last_successful_frame) / 60
-                    
-                    # Hanya reconnect jika sudah tidak ada frame selama 1+ menit
-                    if minutes_without_frame >= 1.0:
-                        # Hanya show warning sekali per reconnect cycle
-                        if not hasattr(st.session_state, 'reconnect_notified'):
-                            st.warning(f"🔄 Connection lost for {minutes_without_frame:.1f} minutes. Reconnecting...")
-                            st.session_state.reconnect_notified = True
-                        
-                        cap.release()
-                        time.sleep(2)
-                        
-                        # Try reconnect dengan 1 attempt saja
-                        cap = smart_rtsp_connect(rtsp_url, max_retries=1, timeout=3)
-                        if cap is not None:
-                            st.success("✅ Connection restored!")
-                            st.session_state.last_successful_frame = current_time
-                            st.session_state.reconnect_notified = False
-                            continue
-                        else:
-                            # Tunggu 30 detik sebelum coba lagi agar tidak spam
-                            time.sleep(30)
-                            continue
-                    else:
-                        # Connection masih OK, hanya skip frame ini
-                        continue
+                    # RTSP stream: reconnect ditangani supervisor di thread capture (stream_capture.py).
+                    # Loop ini tidak sleep; read() blok maks 1 detik, viewer tetap melihat frame terakhir.
+                    health = cap.health()
+                    if health["state"] == "reconnecting":
+                        last = cap.last_frame()
+                        if last is not None:
+                            cv2.putText(last, f"RECONNECTING... {health['outage_sec'] or 0:.0f}s", (10, 30),
+                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+                            frame_holder.image(cv2.cvtColor(last, cv2.COLOR_BGR2RGB), channels="RGB", width="stretch")
+                        next_in = health["next_attempt_in_sec"]
+                        info_holder.warning(f"🔄 Connection lost for {health['outage_sec'] or 0:.0f}s. "
+                                            f"Reconnecting (attempt {health['outage_attempts']}"
+                                            + (f", next in {next_in:.0f}s" if next_in else "") + ")...")
+                        st.session_state.reconnect_notified = True
+                    continue
                 
             else:
-                # Frame berhasil dibaca - update timestamps
-                st.session_state.last_successful_frame = time.time()
-                if hasattr(st.session_state, 'reconnect_notified'):
-                    delattr(st.session_state, 'reconnect_notified')
+                # Frame berhasil dibaca
+                if st.session_state.get('reconnect_notified'):
+                    outage = (cap.health()["last_outage"] or {}) if rtsp_url else {}
+                    info_holder.success(f"✅ Connection restored! (outage {outage.get('duration_sec', 0):.0f}s)")
+                    st.session_state.reconnect_notified = False
                 
             fail = 0; st.session_state.frame_idx += 1
+            # Snapshot parameter terbaru (bisa berubah di tengah stream tanpa reconnect)
+            p = live_params.get()
+            width = int(p["resize_width"])
             h,w = frame.shape[:2]
-            if resize_width>0 and w != resize_width:
-                ratio = resize_width / float(w)
-                frame = cv2.resize(frame,(resize_width,int(h*ratio)),interpolation=cv2.INTER_AREA)
+            if width>0 and w != width:
+                ratio = width / float(w)
+                frame = cv2.resize(frame,(width,int(h*ratio)),interpolation=cv2.INTER_AREA)
 
-            L = {'EXTREME':int(GARIS_EXTREME_Y),'SANGAT_TINGGI':int(GARIS_SANGAT_TINGGI_Y),
-                 'TINGGI':int(GARIS_TINGGI_Y),'SEDANG':int(GARIS_SEDANG_Y),'RENDAH':int(GARIS_RENDAH_Y)}
+            L = {'EXTREME':int(p["garis_extreme_y"]),'SANGAT_TINGGI':int(p["garis_sangat_tinggi_y"]),
+                 'TINGGI':int(p["garis_tinggi_y"]),'SEDANG':int(p["garis_sedang_y"]),'RENDAH':int(p["garis_rendah_y"])}
             # Smart detection berdasarkan performance mode
-            if detection_mode == "Skip Detection":
+            if p["detection_mode"] == "Skip Detection":
                 # Skip semua detection - hanya stream
                 peak_y = h//2  # Setengah layar
                 status = "Detection Disabled"
                 color = (128, 128, 128)
                 lines = None
-            elif detection_mode == "Fast (Every 2nd Frame)":
+            elif p["detection_mode"] == "Fast (Every 2nd Frame)":
                 # Process setiap 2nd frame saja
                 if st.session_state.frame_idx % 2 == 0:
-                    peak_y,_ = detect_peak_y_hough(frame)
+                    peak_y, hough_lines = detect_peak_y_hough(frame)
                     status,color = classify_main_style(peak_y, L)
+                    record_frame(peak_y, status, hough_lines)
                     # Update dengan hasil terakhir untuk frame yang di-skip
                     st.session_state.last_peak_y = peak_y
                     st.session_state.last_status = status
@@ -1048,8 +1181,9 @@ with TAB_LIVE:
                     color = st.session_state.last_color
             else:
                 # Full detection - process semua frame
-                peak_y,_ = detect_peak_y_hough(frame)
+                peak_y, hough_lines = detect_peak_y_hough(frame)
                 status,color = classify_main_style(peak_y, L)
+                record_frame(peak_y, status, hough_lines)
 
             # ===== TWILIO TSUNAMI ALERT LOGIC =====
             alert_sent = False
@@ -1059,37 +1193,52 @@ with TAB_LIVE:
                 print(f"🚨 EXTREME #{st.session_state.extreme_count} - Puncak Y: {peak_y}")
                 
                 # Cek apakah perlu kirim tsunami alert
-                if (enable_tsunami_alert and SEND_WA_AVAILABLE and 
-                    check_tsunami_alert_condition(st.session_state.extreme_count, st.session_state.last_twilio_alert, alert_cooldown_min)):
-                    
-                    try:
-                        sids = send_tsunami_alert_whatsapp(st.session_state.extreme_count, peak_y, st.session_state.frame_idx, location=camera_location)
+                tsunami_sms = enable_sms and SEND_SMS_AVAILABLE
+                if (enable_tsunami_alert and (SEND_WA_AVAILABLE or tsunami_sms) and
+                    check_tsunami_alert_condition(st.session_state.extreme_count, st.session_state.last_twilio_alert,
+                                                  alert_cooldown_min, p["extreme_threshold"])):
+                    alert_key = f"tsunami:{camera_location}:{int(time.time())}"
+                    if SEND_WA_AVAILABLE:
+                        try:
+                            msg = format_tsunami_alert_whatsapp(st.session_state.extreme_count, peak_y, st.session_state.frame_idx, location=camera_location)
+                            sent = queue_alert("whatsapp", msg, priority=PRIORITY_TSUNAMI, key=alert_key)
+                            alert_sent = True
+                            st.sidebar.success(f"🚨 TSUNAMI ALERT DIKIRIM! {sent}")
+                        except Exception as e:
+                            st.sidebar.error(f"Tsunami Alert error: {e}")
+                    if tsunami_sms:
+                        try:
+                            # SMS 1 segmen GSM-7 (instruksi evakuasi di depan)
+                            msg = format_tsunami_sms(st.session_state.extreme_count, peak_y, st.session_state.frame_idx,
+                                                     location=camera_location)
+                            sent = queue_alert("sms", msg, priority=PRIORITY_TSUNAMI, key=alert_key + ":sms")
+                            alert_sent = True
+                            st.sidebar.success(f"🚨 TSUNAMI ALERT SMS DIKIRIM! {sent}")
+                        except Exception as e:
+                            st.sidebar.error(f"Tsunami Alert SMS error: {e}")
+                    if alert_sent:
                         st.session_state.last_twilio_alert = time.time()
-                        alert_sent = True
-                        st.sidebar.success(f"🚨 TSUNAMI ALERT DIKIRIM! SID(s): {', '.join(sids)}")
-                    except Exception as e:
-                        st.sidebar.error(f"Tsunami Alert error: {e}")
             else:
                 # Reset counter jika bukan extreme
                 if st.session_state.extreme_count > 0:
                     print(f"✅ Status kembali normal. Extreme count direset dari {st.session_state.extreme_count}")
                 st.session_state.extreme_count = 0
 
-            draw_overlay(frame,L,peak_y,status,color,st.session_state.extreme_count,alert_sent)
+            draw_overlay(frame,L,peak_y,status,color,st.session_state.extreme_count,alert_sent,style=p)
 
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             frame_holder.image(rgb, channels="RGB", width="stretch")
 
             now = time.time()
             if now - st.session_state.last_log >= sample_every_sec:
-                    append_csv(csv_path, st.session_state.frame_idx, peak_y, status, 0, 
+                    append_log(st.session_state.frame_idx, peak_y, status, 0,
                              st.session_state.extreme_count, alert_sent)
 
                     # ===== WA alert =====
                     if enable_wa and SEND_WA_AVAILABLE and status in ["2,5 Meter (Tinggi)","4 Meter (SANGAT TINGGI)","> 4 Meter (EXTREME)"]:
                         if now - st.session_state.last_wa_alert >= wa_cooldown_sec:
                             try:
-                                send_whatsapp(
+                                queue_alert("whatsapp",
                                     "⚠️ *PERINGATAN OMBAK TINGGI*\\n\\n"
                                     f"Status: *{status}*\\nWaktu: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\\n"
                                     f"Frame: {st.session_state.frame_idx}\\nPuncak Ombak (Y): {peak_y}\\n"
@@ -1103,22 +1252,20 @@ with TAB_LIVE:
                     if enable_sms and SEND_SMS_AVAILABLE and status in ["2,5 Meter (Tinggi)","4 Meter (SANGAT TINGGI)","> 4 Meter (EXTREME)"]:
                         if now - st.session_state.last_sms_alert >= sms_cooldown_sec:
                             try:
-                                msg = (
-                                    "PERINGATAN OMBAK TINGGI!\n"
-                                    f"Status: {status}\n"
-                                    f"Waktu: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                                    f"Frame: {st.session_state.frame_idx}\n"
-                                    f"PeakY: {peak_y}\n"
-                                    f"Extreme Count: {st.session_state.extreme_count}"
-                                )
-                                send_sms(msg)
+                                # SMS ringkas GSM-7 (1 segmen); WhatsApp tetap format kaya
+                                msg = format_wave_sms(status, peak_y, st.session_state.frame_idx,
+                                                      st.session_state.extreme_count, location=camera_location)
+                                queue_alert("sms", msg)
                                 st.session_state.last_sms_alert = now
                             except Exception as e:
                                 st.sidebar.error(f"SMS error: {e}")
 
             st.session_state.last_log = now
             time.sleep(0.005)
-        cap.release()
+        release_shared_capture()
+        get_detection_writer().flush()
+        if enable_frame_store:
+            get_frame_recorder(frame_store_dir).flush()
         info_holder.success("Stream dihentikan.")
     else:
         if st.session_state.running == False:
@@ -1131,7 +1278,7 @@ with TAB_LIVE:
 
 
 with TAB_LOG:
-    import plotly.express as px
+    import pandas as pd
     st.subheader("📈 Log & Grafik")
 
     def load_df(path: str) -> pd.DataFrame:
@@ -1139,151 +1286,397 @@ with TAB_LOG:
             st.warning("File CSV belum ada. Mulai Live deteksi untuk menghasilkan log.")
             return pd.DataFrame()
         try:
-            df = pd.read_csv(path)
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-                df['waktu'] = df['timestamp']
-            elif {'tanggal','jam'}.issubset(df.columns):
-                df['waktu'] = pd.to_datetime(df['tanggal'].astype(str)+" "+df['jam'].astype(str), errors='coerce')
-            else:
-                df['waktu'] = pd.NaT
-            return df
+            # Inkremental: hanya baris baru sejak rerun sebelumnya yang di-parse (read-only, shared)
+            return load_csv_incremental(path)
         except Exception as e:
             st.error(f"Gagal baca CSV: {e}")
             return pd.DataFrame()
 
-    df = load_df(csv_path)
-    if not df.empty and 'waktu' in df.columns:
-        min_d = df['waktu'].min().date() if pd.notna(df['waktu'].min()) else date.today()
-        max_d = df['waktu'].max().date() if pd.notna(df['waktu'].max()) else date.today()
-
+    def select_date_range(min_d: date, max_d: date) -> Tuple[date, date]:
         # ⛑️ Perbaikan: date_input aman baik satu tanggal atau rentang
         _sel = st.date_input("Rentang tanggal", value=(min_d, max_d))
         if isinstance(_sel, (list, tuple)) and len(_sel) == 2:
-            d1, d2 = _sel
-        else:
-            d1 = d2 = _sel
+            return _sel[0], _sel[1]
+        return _sel, _sel
+
+    def load_parquet_df(root: str, d1: date, d2: date) -> pd.DataFrame:
+        # Hanya partisi d1..d2 dan kolom yang dipakai tab ini yang dibaca
+        try:
+            df = ParquetLogStore(root).read_range(d1, d2, columns=[
+                'timestamp', 'frame', 'puncak_ombak_y', 'status_ombak', 'extreme_count', 'alert_sent'])
+            df['waktu'] = df['timestamp']
+            return df
+        except Exception as e:
+            st.error(f"Gagal baca log Parquet: {e}")
+            return pd.DataFrame()
 
-        mask = (df['waktu'] >= pd.to_datetime(d1)) & (df['waktu'] <= pd.to_datetime(d2) + pd.Timedelta(days=1))
-        dff = df.loc[mask].copy()
+    # latest / alerts diisi query ber-index (backend sqlite) atau agregasi per chunk (csv); None = hitung dari dff
+    latest = alerts = None
+    log_agg = None  # LogAggregator (backend csv): total, ringkasan & tail dihitung dari semua row
+    if log_backend == "sqlite":
+        try:
+            log_store = get_sqlite_store(sqlite_path)
+            bounds = log_store.date_bounds()
+        except Exception as e:
+            st.error(f"Gagal baca log SQLite: {e}")
+            bounds = None
+        if bounds:
+            d1, d2 = select_date_range(*bounds)
+            dff = log_store.read_range(d1, d2)
+            dff['waktu'] = dff['timestamp']
+            latest = log_store.latest(d1, d2)
+            alerts = log_store.read_range(d1, d2, alerts_only=True)
+            alerts['waktu'] = alerts['timestamp']
+        else:
+            st.warning("Log SQLite belum ada. Mulai Live deteksi untuk menghasilkan log.")
+            dff = pd.DataFrame()
+    elif log_backend == "runs":
+        try:
+            run_store = RunLengthStore(runs_path)
+            bounds = run_store.date_bounds()
+        except Exception as e:
+            st.error(f"Gagal baca log run: {e}")
+            bounds = None
+        if bounds:
+            d1, d2 = select_date_range(*bounds)
+            # Run dikembangkan kembali ke deret reguler sesuai interval log
+            dff = run_store.expand_range(d1, d2, freq_sec=sample_every_sec)
+            st.caption(f"{len(run_store.read_runs(d1, d2))} run → {len(dff)} row (interval {sample_every_sec} detik).")
+        else:
+            st.warning("Log run belum ada. Mulai Live deteksi untuk menghasilkan log.")
+            dff = pd.DataFrame()
+    elif log_backend == "parquet":
+        days = ParquetLogStore(parquet_dir).partition_dates()
+        if days:
+            d1, d2 = select_date_range(days[0], days[-1])
+            dff = load_parquet_df(parquet_dir, d1, d2)
+        else:
+            st.warning("Log Parquet belum ada. Mulai Live deteksi untuk menghasilkan log.")
+            dff = pd.DataFrame()
     else:
-        dff = df.copy()
+        df = load_df(csv_path)  # file aktif
+        # Segmen hasil rotasi: rentang waktu dari manifest, hanya segmen di rentang terpilih yang dibaca
+        segments = list_segments(csv_path)
+        has_active = not df.empty and 'waktu' in df.columns and pd.notna(df['waktu'].min())
+        if has_active or segments:
+            bounds = [datetime.fromisoformat(seg[k]).date() for seg in segments for k in ('start', 'end')]
+            if has_active:
+                bounds += [df['waktu'].min().date(), df['waktu'].max().date()]
+            d1, d2 = select_date_range(min(bounds), max(bounds))
+            # Agregasi per chunk (memori terbatas): segmen immutable di-cache, file aktif dari cache inkremental.
+            # dff = row untuk grafik (dikecilkan per bucket waktu jika melebihi batas, lihat log_aggregate.py)
+            log_agg = LogAggregator()
+            for seg in list_segments(csv_path, d1, d2):
+                log_agg.merge(aggregate_file(seg['path'], d1, d2))
+            if has_active:
+                log_agg.add(df.loc[(df['waktu'] >= pd.Timestamp(d1)) & (df['waktu'] < pd.Timestamp(d2) + pd.Timedelta(days=1))])
+            dff = log_agg.frame()
+            latest, alerts = log_agg.latest, log_agg.alert_rows()
+        else:
+            dff = df
 
     colA, colB, colC, colD, colE = st.columns(5)
     if not dff.empty:
-        latest = dff.sort_values('waktu').tail(1).iloc[0]
+        if latest is None:
+            latest = dff.sort_values('waktu').tail(1).iloc[0]
         colA.metric("Status Terbaru", str(latest.get('status_ombak','—')))
         colB.metric("Frame Terbaru", int(latest.get('frame',0)) if pd.notna(latest.get('frame',None)) else 0)
         colC.metric("Peak Y Terbaru", int(latest.get('puncak_ombak_y',0)) if pd.notna(latest.get('puncak_ombak_y',None)) else 0)
         colD.metric("Extreme Count", int(latest.get('extreme_count',0)) if pd.notna(latest.get('extreme_count',None)) else 0)
-        colE.metric("Jumlah Data", len(dff))
+        colE.metric("Jumlah Data", log_agg.total if log_agg is not None else len(dff))
     else:
         st.info("Belum ada data untuk ditampilkan.")
 
+    # Rollup dipakai jika mencakup semua row mentah di rentang ini (rollup bisa lebih baru dari
+    # log mentah yang belum di-flush, tapi tidak boleh kurang: berarti rollup baru diaktifkan)
+    rollups, rollup_summary = None, None
+    if not dff.empty and 'waktu' in dff.columns and os.path.exists(rollup_path_for(active_log_path())):
+        try:
+            rollups = RollupStore(rollup_path_for(active_log_path()))
+            rollup_summary = rollups.summary(dff['waktu'].min().date(), dff['waktu'].max().date())
+            if rollup_summary["total"] < (log_agg.total if log_agg is not None else len(dff)):
+                rollups, rollup_summary = None, None
+        except Exception as e:
+            print(f"Rollup tidak bisa dibaca, pakai row mentah: {e}")
+            rollups, rollup_summary = None, None
+
     st.divider()
     if not dff.empty:
-        if 'waktu' in dff.columns and 'puncak_ombak_y' in dff.columns:
-            fig_ts = px.line(dff.sort_values('waktu'), x='waktu', y='puncak_ombak_y', markers=True,
-                             title="Pergerakan Puncak Ombak (Y) vs Waktu",
-                             labels={'waktu':'Waktu','puncak_ombak_y':'Puncak Ombak (Y)'})
-            st.plotly_chart(fig_ts, width="stretch")
-        
-        # Grafik Extreme Count
-        if 'extreme_count' in dff.columns:
-            fig_extreme = px.line(dff.sort_values('waktu'), x='waktu', y='extreme_count', markers=True,
-                                 title="Extreme Count vs Waktu (Tsunami Alert Tracking)",
-                                 labels={'waktu':'Waktu','extreme_count':'Extreme Count'})
-            # Tambahkan garis threshold
-            fig_extreme.add_hline(y=extreme_threshold, line_dash="dash", line_color="red", 
-                                 annotation_text=f"Alert Threshold: {extreme_threshold}")
-            st.plotly_chart(fig_extreme, width="stretch")
-        
-        if 'status_ombak' in dff.columns:
+        import plotly.express as px
+        from chart_downsample import DEFAULT_POINT_BUDGET, downsample_frame, series_figure
+
+        # ===== Zoom: box select di grafik -> query ulang jendela itu dengan resolusi lebih tinggi =====
+        if "log_zoom" not in st.session_state:
+            st.session_state.log_zoom = None
+            st.session_state.log_zoom_gen = 0  # ganti key grafik supaya seleksi lama tidak terpakai ulang
+        view = dff
+        zoom = st.session_state.log_zoom
+        if zoom is not None and 'waktu' in dff.columns:
+            view = dff[(dff['waktu'] >= zoom[0]) & (dff['waktu'] <= zoom[1])]
+            if view.empty:  # rentang tanggal berubah, jendela zoom sudah tidak relevan
+                st.session_state.log_zoom = zoom = None
+                view = dff
+            elif log_agg is not None and log_agg.reduced:
+                # dff sudah dikecilkan: baca ulang jendela zoom dari file (per chunk) dengan resolusi penuh
+                z0, z1 = pd.Timestamp(zoom[0]).to_pydatetime(), pd.Timestamp(zoom[1]).to_pydatetime()
+                zoom_agg = aggregate_logs([seg['path'] for seg in list_segments(csv_path, z0.date(), z1.date())], z0, z1)
+                if has_active:
+                    zoom_agg.add(df.loc[(df['waktu'] >= zoom[0]) & (df['waktu'] <= zoom[1])])
+                view = zoom_agg.frame()
+        if zoom is not None:
+            zc1, zc2 = st.columns([4, 1])
+            zc1.caption(f"🔍 Zoom: {zoom[0]:%Y-%m-%d %H:%M:%S} s/d {zoom[1]:%Y-%m-%d %H:%M:%S} ({len(view)} row)")
+            if zc2.button("Reset zoom", key="btn_reset_zoom"):
+                st.session_state.log_zoom = None
+                st.session_state.log_zoom_gen += 1
+                st.rerun()
+        else:
+            st.caption("Tip: drag (box select) di grafik untuk zoom; data jendela itu di-query ulang lebih detail.")
+
+        def zoomable_chart(fig, name: str):
+            event = st.plotly_chart(fig, width="stretch", key=f"{name}_{st.session_state.log_zoom_gen}",
+                                    on_select="rerun", selection_mode="box")
+            boxes = (event.get("selection") or {}).get("box") or [] if event else []
+            if boxes and boxes[0].get("x"):
+                xs = pd.to_datetime(boxes[0]["x"])
+                st.session_state.log_zoom = (xs.min(), xs.max())
+                st.session_state.log_zoom_gen += 1
+                st.rerun()
+
+        # Titik EXTREME / alert selalu digambar (tidak ikut dibuang downsampling)
+        is_extreme = (view['status_ombak'].astype(str) == STATUS_LEVELS[-1]) if 'status_ombak' in view.columns \
+            else pd.Series(False, index=view.index)
+        is_alert = (view['alert_sent'] == True) if 'alert_sent' in view.columns else pd.Series(False, index=view.index)
+
+        def highlight_points(y_col: str):
+            points = []
+            if y_col == 'puncak_ombak_y':
+                points.append({"x": view.loc[is_extreme, 'waktu'], "y": view.loc[is_extreme, y_col],
+                               "name": "EXTREME", "color": "darkred"})
+            points.append({"x": view.loc[is_alert, 'waktu'], "y": view.loc[is_alert, y_col],
+                           "name": "Alert", "color": "orange"})
+            return points
+
+        v_start, v_end = view['waktu'].min().to_pydatetime(), view['waktu'].max().to_pydatetime()
+        # Rentang panjang: rollup (min/mean/max per bucket); jendela pendek: row mentah + LTTB
+        use_rollup = rollups is not None and span_minutes(v_start, v_end) > DEFAULT_POINT_BUDGET
+        if use_rollup:
+            rollup_res = choose_resolution(v_start, v_end, DEFAULT_POINT_BUDGET)
+            rollup_df = rollups.read(rollup_res, v_start, v_end)
+            st.caption(f"Grafik dari rollup per {rollup_res} ({len(rollup_df)} titik, {len(view)} row).")
+            fig_ts = series_figure(rollup_df['waktu'], rollup_df['mean_y'], "Pergerakan Puncak Ombak (Y) vs Waktu",
+                                   "Puncak Ombak (Y)", name="mean",
+                                   lines=[{"x": rollup_df['waktu'], "y": rollup_df['min_y'], "name": "min"},
+                                          {"x": rollup_df['waktu'], "y": rollup_df['max_y'], "name": "max"}],
+                                   highlights=highlight_points('puncak_ombak_y'))
+            zoomable_chart(fig_ts, "chart_peak_y")
+
+            fig_extreme = series_figure(rollup_df['waktu'], rollup_df['max_extreme'],
+                                        "Extreme Count vs Waktu (Tsunami Alert Tracking)", "Extreme Count",
+                                        name="max", highlights=highlight_points('extreme_count'),
+                                        threshold=extreme_threshold)
+            zoomable_chart(fig_extreme, "chart_extreme")
+        else:
+            if 'waktu' in view.columns and 'puncak_ombak_y' in view.columns:
+                ds = downsample_frame(view, 'waktu', 'puncak_ombak_y', DEFAULT_POINT_BUDGET, is_extreme | is_alert)
+                if len(ds) < len(view):
+                    st.caption(f"Grafik di-downsample (LTTB): {len(ds)} dari {len(view)} titik.")
+                fig_ts = series_figure(ds['waktu'], ds['puncak_ombak_y'], "Pergerakan Puncak Ombak (Y) vs Waktu",
+                                       "Puncak Ombak (Y)", highlights=highlight_points('puncak_ombak_y'))
+                zoomable_chart(fig_ts, "chart_peak_y")
+
+            # Grafik Extreme Count
+            if 'extreme_count' in view.columns:
+                ds = downsample_frame(view, 'waktu', 'extreme_count', DEFAULT_POINT_BUDGET, is_alert)
+                fig_extreme = series_figure(ds['waktu'], ds['extreme_count'],
+                                            "Extreme Count vs Waktu (Tsunami Alert Tracking)", "Extreme Count",
+                                            highlights=highlight_points('extreme_count'),
+                                            threshold=extreme_threshold)
+                zoomable_chart(fig_extreme, "chart_extreme")
+
+        # ===== Peak Y per frame (frame store biner, slice via memmap tanpa parsing) =====
+        frame_store = FrameStore(frame_store_dir)
+        if frame_store.days():
+            with st.expander("🎞️ Peak Y per frame (full frame rate)", expanded=False):
+                if zoom is not None:
+                    f_start, f_end = pd.Timestamp(zoom[0]).to_pydatetime(), pd.Timestamp(zoom[1]).to_pydatetime()
+                else:
+                    f_end = frame_store.last_timestamp() or v_end
+                    f_start = f_end - pd.Timedelta(minutes=10)
+                frames_df = frame_store.read_range(f_start, f_end)
+                if frames_df.empty:
+                    st.info("Tidak ada record per frame di jendela ini.")
+                else:
+                    ds = downsample_frame(frames_df, 'waktu', 'puncak_ombak_y', DEFAULT_POINT_BUDGET,
+                                          frames_df['status_ombak'] == STATUS_LEVELS[-1])
+                    st.caption(f"{len(frames_df)} frame ({f_start:%Y-%m-%d %H:%M:%S} s/d {f_end:%H:%M:%S}), "
+                               f"{len(ds)} titik digambar. Zoom grafik di atas untuk memilih jendela.")
+                    st.plotly_chart(series_figure(ds['waktu'], ds['puncak_ombak_y'], "Peak Y per Frame",
+                                                  "Puncak Ombak (Y)", name="frame"),
+                                    width="stretch", key="chart_frames")
+
+        if rollup_summary is not None:
+            status_counts = pd.DataFrame(list(rollup_summary['status_counts'].items()),
+                                         columns=['status_ombak','jumlah'])
+        elif log_agg is not None:
+            status_counts = pd.DataFrame(list(log_agg.status_counts.items()), columns=['status_ombak','jumlah'])
+        elif 'status_ombak' in dff.columns:
             status_counts = dff['status_ombak'].value_counts().reset_index()
             status_counts.columns = ['status_ombak','jumlah']
+        else:
+            status_counts = None
+        if status_counts is not None:
             fig_bar = px.bar(status_counts, x='status_ombak', y='jumlah', title="Distribusi Status Ombak",
                              labels={'status_ombak':'Status','jumlah':'Jumlah'})
             st.plotly_chart(fig_bar, width="stretch")
 
         # Alert History
         if 'alert_sent' in dff.columns:
-            alerts = dff[dff['alert_sent'] == True]
+            if alerts is None:
+                alerts = dff[dff['alert_sent'] == True]
             if not alerts.empty:
                 st.subheader("🚨 Riwayat Alert Tsunami")
                 st.dataframe(alerts[['waktu', 'status_ombak', 'puncak_ombak_y', 'extreme_count']], 
                            width="stretch", height=200)
 
         st.subheader("Data (terbatas 500 baris)")
-        st.dataframe(dff.tail(500), width="stretch", height=420)
+        st.dataframe((log_agg.tail() if log_agg is not None else dff).tail(500), width="stretch", height=420)
 
         # ========== Laporan (PDF) ==========
+        # Dibuat di thread background, di-cache per (log, rentang, versi data): unduh ulang langsung dari file
         st.subheader("📄 Laporan (PDF)")
-        st.caption("Butuh paket `reportlab` (install: `pip install reportlab`).")
-        def make_report_bytes(d: pd.DataFrame) -> bytes:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.units import cm
-
-            buff = io.BytesIO()
-            c = canvas.Canvas(buff, pagesize=A4)
-            W, H = A4
-
-            def line(y): c.line(1.5*cm, y, W-1.5*cm, y)
-
-            # Header
-            c.setFont("Helvetica-Bold", 16)
-            c.drawString(2*cm, H-2*cm, "Laporan Deteksi Ombak + Tsunami Alert")
-            c.setFont("Helvetica", 10)
-            c.drawString(2*cm, H-2.6*cm, f"Dibuat: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            line(H-2.8*cm)
-
-            # Ringkasan
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(2*cm, H-3.6*cm, "Ringkasan")
-            c.setFont("Helvetica", 10)
-
-            waktu_min = str(d['waktu'].min()) if 'waktu' in d.columns else "-"
-            waktu_max = str(d['waktu'].max()) if 'waktu' in d.columns else "-"
-            total = len(d)
-
-            y = H-4.2*cm
-            c.drawString(2*cm, y, f"Rentang data : {waktu_min}  s/d  {waktu_max}"); y -= 0.6*cm
-            c.drawString(2*cm, y, f"Jumlah entri : {total}"); y -= 0.6*cm
-
-            if 'puncak_ombak_y' in d.columns and len(d)>0:
-                c.drawString(2*cm, y, f"Peak Y  (min/mean/max) : {int(d['puncak_ombak_y'].min())} / {round(d['puncak_ombak_y'].mean(),1)} / {int(d['puncak_ombak_y'].max())}")
-                y -= 0.6*cm
-
-            if 'extreme_count' in d.columns and len(d)>0:
-                max_extreme = int(d['extreme_count'].max())
-                c.drawString(2*cm, y, f"Maximum Extreme Count : {max_extreme}")
-                y -= 0.6*cm
-
-            if 'alert_sent' in d.columns and len(d)>0:
-                alert_count = len(d[d['alert_sent'] == True])
-                c.drawString(2*cm, y, f"Jumlah Alert Tsunami : {alert_count}")
-                y -= 0.6*cm
-
-            if 'status_ombak' in d.columns and len(d)>0:
-                c.drawString(2*cm, y, "Distribusi status:"); y -= 0.5*cm
-                counts = d['status_ombak'].value_counts()
-                for s, n in counts.items():
-                    c.drawString(2.5*cm, y, f"- {s}: {n}")
-                    y -= 0.5*cm
-
-            # Footer
-            line(2*cm)
-            c.setFont("Helvetica-Oblique", 9)
-            c.drawString(2*cm, 1.5*cm, "Generated by Ombak Dashboard + Tsunami Alert")
-
-            c.showPage(); c.save()
-            return buff.getvalue()
-
-        if st.button("📄 Unduh Laporan (PDF)", key="btn_download_pdf"):
-            try:
-                pdf_bytes = make_report_bytes(dff)
-                st.download_button("Download sekarang", data=pdf_bytes, file_name="laporan_ombak_tsunami_alert.pdf", mime="application/pdf", key="btn_download_pdf_file")
-            except Exception as e:
-                st.error(f"Gagal membuat PDF. Pastikan reportlab terpasang. Error: {e}")
+        if not REPORTLAB_AVAILABLE:
+            st.caption("Butuh paket `reportlab` (install: `pip install reportlab`).")
+        else:
+            # Ringkasan dari rollup / agregasi per chunk jika tersedia (tidak perlu agregasi ulang row mentah)
+            report_summary = rollup_summary or (log_agg.summary() if log_agg is not None else summarize_rows(dff))
+            r_start, r_end = dff['waktu'].min().to_pydatetime(), dff['waktu'].max().to_pydatetime()
+            period_res = "hour" if span_minutes(r_start, r_end) <= 14 * 24 * 60 else "day"
+            report_service = get_report_service(config.get("report_dir", "reports"))
+            report_id = report_key(active_log_path(), r_start.date(), r_end.date(), report_summary,
+                                   extreme_threshold, period_res)
+
+            def build_report(path: str, summary=report_summary, rollups=rollups, log_agg=log_agg,
+                             series=dff, alerts=alerts):
+                if rollups is not None:
+                    periods = rollups.read(period_res, r_start.date(), r_end.date())[PERIOD_COLUMNS]
+                elif log_agg is not None:
+                    periods = log_agg.period_table(period_res)
+                else:
+                    periods = period_table(period_partials(series), period_res)
+                if alerts is None and 'alert_sent' in series.columns:
+                    alerts = series[series['alert_sent'] == True]
+                render_report(path, summary, series, periods, alerts,
+                              period_label="Per jam" if period_res == "hour" else "Per hari",
+                              extreme_threshold=extreme_threshold)
+
+            report_state = report_service.status(report_id)
+            report_pdf = report_service.read(report_id) if report_state == "done" else None
+            if report_state == "done" and report_pdf is None:
+                report_state = "missing"
+            if report_state == "done":
+                st.download_button("📄 Unduh Laporan (PDF)", data=report_pdf,
+                                   file_name=f"laporan_ombak_{r_start:%Y%m%d}_{r_end:%Y%m%d}.pdf",
+                                   mime="application/pdf", key="btn_download_pdf_file")
+            elif report_state == "running":
+                st.info("⏳ Laporan sedang dibuat di background...")
+                st.button("🔄 Cek laporan", key="btn_check_pdf")
+            else:
+                if report_state == "failed":
+                    st.error(f"Gagal membuat PDF: {report_service.error(report_id)}")
+                if st.button("📄 Buat Laporan (PDF)", key="btn_download_pdf"):
+                    report_service.submit(report_id, build_report)
+                    st.rerun()
     else:
         st.info("Tidak ada data untuk grafik/laporan.")
+
+    # ===== Kualitas stream per kamera (stream_health.py): FPS, jitter, drop, reconnect, umur frame =====
+    health_path = config.get("stream_health_path", "stream_health.db")
+    st.subheader("📶 Kualitas Stream per Kamera")
+    health_store = get_health_store(health_path) if os.path.exists(health_path) else None
+    health_cameras = health_store.cameras() if health_store is not None else []
+    if health_cameras:
+        from chart_downsample import DEFAULT_POINT_BUDGET, downsample_frame, series_figure
+        hc1, hc2 = st.columns([2, 1])
+        h_camera = hc1.selectbox("Kamera", health_cameras, key="sel_health_camera")
+        h_hours = hc2.selectbox("Jendela", [1, 6, 24, 24 * 7, 24 * 30], index=2, key="sel_health_hours",
+                                format_func=lambda h: f"{h} jam" if h < 24 else f"{h // 24} hari")
+        h_end = datetime.now()
+        h_start = h_end - pd.Timedelta(hours=h_hours).to_pytimedelta()
+        summary_rows = health_store.summary(h_start, h_end)
+        if summary_rows:
+            # Sizing bandwidth per lokasi: bitrate rata-rata dari FFmpeg -> GB per hari
+            st.dataframe(pd.DataFrame(summary_rows)[[
+                'camera', 'uptime_pct', 'mean_fps', 'min_fps', 'mean_jitter_ms', 'max_jitter_ms', 'dropped',
+                'drop_pct', 'reconnects', 'mean_frame_age_ms', 'max_frame_age_ms', 'mean_bitrate_kbps',
+                'gb_per_day', 'width', 'height']], width="stretch", hide_index=True)
+        hdf = health_store.read_range(h_start, h_end, h_camera)
+        if hdf.empty:
+            st.info("Tidak ada sampel stream di jendela ini.")
+        else:
+            outage = (hdf['state'] != 'connected') | (hdf['frames'] == 0)
+            reconnect = hdf['reconnects'] > 0
+            ds = downsample_frame(hdf, 'timestamp', 'decode_fps', DEFAULT_POINT_BUDGET, outage | reconnect)
+            ds_outage, ds_reconnect = outage.loc[ds.index], reconnect.loc[ds.index]
+            st.plotly_chart(series_figure(
+                ds['timestamp'], ds['decode_fps'], "Decode FPS", "FPS", name="decode",
+                lines=[{"x": ds['timestamp'], "y": ds['nominal_fps'], "name": "nominal"}],
+                highlights=[{"x": ds.loc[ds_outage, 'timestamp'], "y": ds.loc[ds_outage, 'decode_fps'],
+                             "name": "Outage", "color": "red"},
+                            {"x": ds.loc[ds_reconnect, 'timestamp'], "y": ds.loc[ds_reconnect, 'decode_fps'],
+                             "name": "Reconnect", "color": "orange"}]), width="stretch", key="chart_health_fps")
+            ds = downsample_frame(hdf, 'timestamp', 'jitter_ms', DEFAULT_POINT_BUDGET, hdf['dropped'] > 0)
+            st.plotly_chart(series_figure(
+                ds['timestamp'], ds['jitter_ms'], "Jitter antar Frame", "ms", name="jitter",
+                lines=[{"x": ds['timestamp'], "y": ds['max_gap_ms'], "name": "gap maks"}],
+                highlights=[{"x": ds.loc[ds['dropped'] > 0, 'timestamp'],
+                             "y": ds.loc[ds['dropped'] > 0, 'jitter_ms'], "name": "Frame drop", "color": "purple"}]),
+                width="stretch", key="chart_health_jitter")
+            age_col = 'frame_age_ms' if hdf['frame_age_ms'].notna().any() else 'since_last_frame_ms'
+            ds = downsample_frame(hdf, 'timestamp', age_col, DEFAULT_POINT_BUDGET)
+            st.plotly_chart(series_figure(
+                ds['timestamp'], ds[age_col], "Umur Frame" if age_col == 'frame_age_ms'
+                else "Umur Frame (tanpa timestamp container: sejak frame terakhir)", "ms", name="umur",
+                lines=[{"x": ds['timestamp'], "y": ds['max_frame_age_ms'], "name": "maks"}]
+                if age_col == 'frame_age_ms' else ()), width="stretch", key="chart_health_age")
+
+            # Gap log deteksi vs kondisi stream: jaringan (outage / degradasi) atau loop deteksi
+            if 'waktu' in dff.columns and not (log_agg is not None and log_agg.reduced):
+                interval = config.get("stream_health_interval_sec", 10)
+                min_gap = st.number_input("Gap deteksi minimal (detik)", 1, 3600,
+                                          int(max(30, 5 * sample_every_sec)), key="num_health_gap")
+                waktu = dff['waktu'][(dff['waktu'] >= pd.Timestamp(h_start)) & (dff['waktu'] <= pd.Timestamp(h_end))]
+                gaps = correlate_gaps(detection_gaps(waktu, min_gap), hdf, interval)
+                if gaps:
+                    gap_df = pd.DataFrame(gaps)
+                    st.caption(" · ".join(f"{cause}: {n}" for cause, n in gap_df['cause'].value_counts().items()))
+                    st.dataframe(gap_df, width="stretch", hide_index=True, height=220)
+                else:
+                    st.caption(f"Tidak ada gap deteksi > {min_gap} detik di jendela ini.")
+            st.download_button("⬇️ Unduh sampel stream (CSV)", data=hdf[HEALTH_COLUMNS].to_csv(index=False),
+                               file_name=f"stream_health_{h_camera}_{h_end:%Y%m%d_%H%M}.csv".replace(":", "-"),
+                               mime="text/csv", key="btn_health_csv")
+    else:
+        st.caption("Belum ada sampel kualitas stream. Sampel dicatat otomatis selama Live RTSP berjalan "
+                   "(`stream_health_enabled`).")
+
+    # ===== Laporan terjadwal (dibuat headless oleh report_scheduler.py, disajikan langsung dari file) =====
+    report_dir = config.get("report_dir", "reports")
+    scheduled = load_report_index(report_dir)
+    st.subheader("🗓️ Laporan Harian & Mingguan")
+    if scheduled:
+        options = {f"{'Harian' if e['kind'] == 'daily' else 'Mingguan'} {e['label']} — "
+                   f"{e['total']} row, {e['alerts'] or 0} alert": e for e in scheduled}
+        picked = options[st.selectbox("Pilih laporan", list(options), key="sel_scheduled_report")]
+        st.caption(f"Dibuat {picked['generated_at']} dari log {picked['backend']}.")
+        rc1, rc2 = st.columns(2)
+        for col, fmt, label, mime in ((rc1, "pdf", "📄 Unduh PDF", "application/pdf"),
+                                      (rc2, "json", "🧾 Unduh ringkasan JSON", "application/json")):
+            artifact = os.path.join(report_dir, picked[fmt]) if picked.get(fmt) else None
+            if artifact and os.path.exists(artifact):
+                with open(artifact, "rb") as f:
+                    col.download_button(label, data=f.read(), mime=mime, key=f"btn_scheduled_{fmt}",
+                                        file_name=f"laporan_{picked['kind']}_{picked['label']}.{fmt}")
+    else:
+        st.caption("Belum ada laporan terjadwal. Jalankan `python report_scheduler.py` (service) "
+                   "untuk membuat laporan harian & mingguan otomatis.")
@@ -0,0 +1,175 @@
+# report_scheduler.py
+# Scheduler laporan harian & mingguan (headless, terpisah dari dashboard Streamlit).
+# - Beberapa menit setelah periode ditutup (00:00 + grace), laporan hari kemarin dan minggu
+#   ISO yang baru selesai dihitung sekali dari log mentah backend aktif
+# - Artefak: <report_dir>/daily/YYYY-MM-DD.pdf + .json, <report_dir>/weekly/YYYY-Www.pdf + .json
+# - Index <report_dir>/index.json (ditulis atomik) dibaca Logs tab untuk daftar & unduhan instan
+# - Periode yang terlewat (mesin mati) dikejar saat start, dibatasi catchup_days
+#
+# Jalankan: python report_scheduler.py          (loop, untuk systemd)
+#           python report_scheduler.py --once   (sekali, untuk cron)
+
+import json
+import os
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+INDEX_FILE = "index.json"
+DEFAULT_GRACE_MIN = 10
+DEFAULT_CATCHUP_DAYS = 14
+KINDS = ("daily", "weekly")
+
+
+def index_path_for(report_dir: str) -> str:
+    return os.path.join(report_dir, INDEX_FILE)
+
+
+def load_index(report_dir: str) -> List[Dict]:
+    """Daftar laporan terjadwal (terbaru dulu); [] jika belum ada."""
+    try:
+        with open(index_path_for(report_dir), "r", encoding="utf-8") as f:
+            return json.load(f).get("reports", [])
+    except FileNotFoundError:
+        return []
+
+
+def _save_index(report_dir: str, entries: List[Dict]):
+    path = index_path_for(report_dir)
+    tmp = path + ".tmp"
+    entries = sorted(entries, key=lambda e: (e["end"], e["kind"]), reverse=True)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"reports": entries}, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def closed_periods(now: datetime, catchup_days: int = DEFAULT_CATCHUP_DAYS,
+                   grace_min: int = DEFAULT_GRACE_MIN) -> List[Tuple[str, str, date, date]]:
+    """(kind, label, start, end) untuk hari & minggu ISO yang sudah ditutup (plus grace) di jendela catch-up."""
+    closed_at = (now - timedelta(minutes=grace_min)).date()  # hari sebelum tanggal ini sudah lengkap
+    periods = []
+    for back in range(1, catchup_days + 1):
+        day = closed_at - timedelta(days=back)
+        periods.append(("daily", day.isoformat(), day, day))
+        if day.isoweekday() == 7:  # Minggu: minggu ISO selesai
+            year, week, _ = day.isocalendar()
+            periods.append(("weekly", f"{year}-W{week:02d}", day - timedelta(days=6), day))
+    return periods
+
+
+def next_run_at(now: datetime, grace_min: int = DEFAULT_GRACE_MIN) -> datetime:
+    """Jadwal berikutnya: 00:00 + grace (hari ini jika belum lewat, selain itu besok)."""
+    run = datetime.combine(now.date(), dtime.min) + timedelta(minutes=grace_min)
+    return run if run > now else run + timedelta(days=1)
+
+
+def _json_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    try:
+        if value != value:  # NaN
+            return None
+        return value.item() if hasattr(value, "item") else value
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def build_period_report(kind: str, label: str, start: date, end: date, backend: str, path: str,
+                        config: Dict[str, Any], report_dir: str) -> Optional[Dict]:
+    """Hitung satu periode dari log mentah, tulis PDF + JSON. None jika periode tidak punya data."""
+    from log_aggregate import LogAggregator, PERIOD_COLUMNS
+    from log_backends import iter_backend_chunks
+    from log_report import REPORTLAB_AVAILABLE, render_report
+
+    agg = LogAggregator()
+    for chunk in iter_backend_chunks(backend, path, start, end, config):
+        agg.add(chunk)
+    if not agg.total:
+        return None
+
+    resolution = "hour" if kind == "daily" else "day"
+    summary = agg.summary()
+    periods = agg.period_table(resolution)
+    folder = os.path.join(report_dir, kind)
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, label)
+
+    entry = {"kind": kind, "label": label, "start": start.isoformat(), "end": end.isoformat(),
+             "generated_at": datetime.now().isoformat(timespec="seconds"), "backend": backend,
+             "total": summary["total"], "alerts": summary["alerts"], "max_extreme": summary["max_extreme"],
+             "json": os.path.relpath(base + ".json", report_dir), "pdf": None}
+    if REPORTLAB_AVAILABLE:
+        title = f"Laporan {'Harian' if kind == 'daily' else 'Mingguan'} Deteksi Ombak ({label})"
+        render_report(base + ".pdf.tmp", summary, agg.frame(), periods, agg.alert_rows(),
+                      period_label="Per jam" if resolution == "hour" else "Per hari",
+                      extreme_threshold=config.get("extreme_threshold"), title=title)
+        os.replace(base + ".pdf.tmp", base + ".pdf")
+        entry["pdf"] = os.path.relpath(base + ".pdf", report_dir)
+
+    payload = dict(entry, summary=summary, periods=[
+        {c: _json_value(v) for c, v in zip(PERIOD_COLUMNS, row)} for row in periods.itertuples(index=False)])
+    with open(base + ".json.tmp", "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1, ensure_ascii=False, default=_json_value)
+    os.replace(base + ".json.tmp", base + ".json")
+    return entry
+
+
+def run_due(config: Optional[Dict[str, Any]] = None, now: Optional[datetime] = None,
+            rebuild: bool = False) -> List[Dict]:
+    """Buat semua laporan periode tertutup yang belum ada di index. Return entri yang baru dibuat."""
+    from log_backends import backend_path
+    if config is None:
+        from dashboard_config import load_config
+        config = load_config()
+    now = now or datetime.now()
+    report_dir = config.get("report_dir", "reports")
+    backend = config.get("log_backend", "csv")
+    path = backend_path(backend, config)
+    os.makedirs(report_dir, exist_ok=True)
+
+    entries = load_index(report_dir)
+    done = {(e["kind"], e["label"]) for e in entries}
+    built = []
+    for kind, label, start, end in closed_periods(now, config.get("report_catchup_days", DEFAULT_CATCHUP_DAYS),
+                                                  config.get("report_grace_min", DEFAULT_GRACE_MIN)):
+        if (kind, label) in done and not rebuild:
+            continue
+        try:
+            entry = build_period_report(kind, label, start, end, backend, path, config, report_dir)
+        except Exception as e:
+            print(f"❌ Laporan {kind} {label} gagal: {e}")
+            continue
+        if entry is None:
+            continue
+        entries = [e for e in entries if (e["kind"], e["label"]) != (kind, label)] + [entry]
+        _save_index(report_dir, entries)  # simpan per laporan: progres tidak hilang jika proses berhenti
+        built.append(entry)
+        print(f"📄 Laporan {kind} {label}: {entry['total']} row, {entry['alerts']} alert")
+    return built
+
+
+def run_forever(config: Optional[Dict[str, Any]] = None):
+    """Loop scheduler: kejar periode yang terlewat, lalu tidur sampai 00:00 + grace berikutnya."""
+    from dashboard_config import load_config
+    while True:
+        cfg = config or load_config()  # config dibaca ulang tiap siklus (backend / folder bisa berubah)
+        run_due(cfg)
+        wake = next_run_at(datetime.now(), cfg.get("report_grace_min", DEFAULT_GRACE_MIN))
+        print(f"⏰ Laporan berikutnya: {wake:%Y-%m-%d %H:%M}")
+        while datetime.now() < wake:
+            time.sleep(min(300.0, max(1.0, (wake - datetime.now()).total_seconds())))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Scheduler laporan harian & mingguan deteksi ombak")
+    parser.add_argument("--once", action="store_true", help="buat laporan yang jatuh tempo lalu keluar")
+    parser.add_argument("--rebuild", action="store_true", help="buat ulang laporan di jendela catch-up")
+    args = parser.parse_args()
+    print("🔍 Scheduler laporan deteksi ombak...")
+    if args.once or args.rebuild:
+        print(f"   {len(run_due(rebuild=args.rebuild))} laporan dibuat")
+    else:
+        run_forever()
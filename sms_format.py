@@ -0,0 +1,163 @@
+# sms_format.py
+# SMS formatter yang sadar segmen (GSM-7 vs UCS-2).
+# - Satu emoji / karakter non-GSM membuat SEMUA pesan jadi UCS-2 (70 char/segmen, bukan 160)
+# - Template alert ringkas, murni GSM-7, biasanya muat 1 segmen
+# - sms_segments(): hitung encoding + jumlah segmen sebelum kirim
+# WhatsApp tetap memakai format kaya (emoji, *bold*) di notify_whatsapp / notify_earthquake.
+
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, Optional
+
+# GSM 03.38 basic character set (tanpa ESC)
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+# Extension table: tiap karakter memakan 2 septet (ESC + char)
+GSM7_EXTENDED = set("^{}\\[~]|€\f")
+
+# Batas per segmen
+GSM7_SINGLE, GSM7_MULTI = 160, 153
+UCS2_SINGLE, UCS2_MULTI = 70, 67
+
+# Pengganti umum untuk karakter non-GSM
+_REPLACEMENTS = {
+    "‘": "'", "’": "'", "‚": "'", "“": '"', "”": '"', "„": '"',
+    "–": "-", "—": "-", "−": "-", "…": "...", "•": "-", "·": "-",
+    "×": "x", "≥": ">=", "≤": "<=", "→": "->", "←": "<-", "°": " derajat",
+    "\t": " ", " ": " ",
+}
+
+
+def is_gsm7(text: str) -> bool:
+    """True jika seluruh teks bisa dikirim dengan encoding GSM-7."""
+    return all(ch in GSM7_BASIC or ch in GSM7_EXTENDED for ch in text)
+
+
+def sms_segments(text: str) -> Dict:
+    """
+    Hitung encoding dan jumlah segmen SMS.
+
+    Returns:
+        Dict: {"encoding": "GSM-7"|"UCS-2", "chars": int, "units": int, "segments": int}
+        units = septet (GSM-7) atau code unit UTF-16 (UCS-2)
+    """
+    if is_gsm7(text):
+        units = sum(2 if ch in GSM7_EXTENDED else 1 for ch in text)
+        single, multi, encoding = GSM7_SINGLE, GSM7_MULTI, "GSM-7"
+    else:
+        units = len(text.encode("utf-16-le")) // 2  # emoji = 2 unit (surrogate pair)
+        single, multi, encoding = UCS2_SINGLE, UCS2_MULTI, "UCS-2"
+    if units <= single:
+        segments = 1 if units else 0
+    else:
+        segments = -(-units // multi)
+    return {"encoding": encoding, "chars": len(text), "units": units, "segments": segments}
+
+
+def to_gsm7(text: str) -> str:
+    """
+    Ubah teks bebas menjadi GSM-7: emoji dibuang, tanda baca unicode diganti,
+    huruf beraksen non-GSM di-transliterasi, spasi/baris kosong dirapikan.
+    """
+    out = []
+    for ch in text:
+        if ch in GSM7_BASIC or ch in GSM7_EXTENDED:
+            out.append(ch)
+        elif ch in _REPLACEMENTS:
+            out.append(_REPLACEMENTS[ch])
+        else:
+            ascii_part = unicodedata.normalize("NFKD", ch).encode("ascii", "ignore").decode("ascii")
+            out.append(ascii_part if is_gsm7(ascii_part) else "")
+    text = "".join(out)
+    text = re.sub(r"[ ]{2,}", " ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def truncate_to_segments(text: str, max_segments: int = 1) -> str:
+    """Potong teks (GSM-7) agar muat di max_segments segmen."""
+    text = to_gsm7(text)
+    if sms_segments(text)["segments"] <= max_segments:
+        return text
+    limit = GSM7_SINGLE if max_segments == 1 else GSM7_MULTI * max_segments
+    while text and sms_segments(text + "..")["units"] > limit:
+        text = text[:-1]
+    return text.rstrip() + ".."
+
+
+def _with_location(text: str, location: Optional[str], max_segments: int = 1) -> str:
+    """
+    Tambah lokasi (teks bebas) di akhir pesan; hanya lokasi yang dipotong agar muat max_segments,
+    isi penting (status, instruksi, nilai) tidak pernah terpotong.
+    """
+    text = to_gsm7(text)
+    loc = to_gsm7(location or "")
+    if not loc:
+        return truncate_to_segments(text, max_segments)
+    limit = GSM7_SINGLE if max_segments == 1 else GSM7_MULTI * max_segments
+    full = f"{text}\nLokasi: {loc}"
+    if sms_segments(full)["units"] <= limit:
+        return full
+    while loc and sms_segments(f"{text}\nLokasi: {loc}..")["units"] > limit:
+        loc = loc[:-1]
+    return f"{text}\nLokasi: {loc.rstrip()}.." if loc.strip() else truncate_to_segments(text, max_segments)
+
+
+# ===== Template alert ringkas (GSM-7) =====
+def format_wave_sms(status: str, peak_y: int, frame_idx: int, extreme_count: int = 0,
+                    location: Optional[str] = None, when: Optional[datetime] = None) -> str:
+    """Alert ombak tinggi dari live loop, target 1 segmen (lokasi di akhir, dipotong duluan)."""
+    when = when or datetime.now()
+    text = (f"PERINGATAN OMBAK TINGGI\n"
+            f"{status}\n"
+            f"{when.strftime('%d/%m %H:%M:%S')} Y={peak_y} F={frame_idx} EXT={extreme_count}")
+    return _with_location(text, location, 1)
+
+
+def format_tsunami_sms(extreme_count: int, peak_y: int, frame_idx: int,
+                       location: Optional[str] = None, when: Optional[datetime] = None) -> str:
+    """Alert potensi tsunami (EXTREME beruntun), target 1 segmen; instruksi evakuasi di depan."""
+    when = when or datetime.now()
+    text = (f"AWAS POTENSI TSUNAMI! SEGERA EVAKUASI KE TEMPAT TINGGI! "
+            f"{extreme_count}x ombak EXTREME (>4m) {when.strftime('%d/%m %H:%M')} Y={peak_y} F={frame_idx}")
+    return _with_location(text, location, 1)
+
+
+def format_earthquake_sms(earthquake_data: dict, alert_level: str = "EARTHQUAKE",
+                          max_segments: int = 2) -> str:
+    """Alert gempa BMKG ringkas; instruksi evakuasi di depan, detail dipotong duluan jika kepanjangan."""
+    if alert_level == "TSUNAMI":
+        header, urgency = "AWAS POTENSI TSUNAMI!", "SEGERA EVAKUASI KE TEMPAT TINGGI!"
+    else:
+        header, urgency = "ALERT GEMPA!", "Waspada dan siap siaga."
+    parts = [
+        f"{header} M{earthquake_data.get('magnitude', 'N/A')} {earthquake_data.get('wilayah', 'N/A')}.",
+        urgency,
+        f"{earthquake_data.get('datetime_str', 'N/A')}, kedalaman {earthquake_data.get('kedalaman', 'N/A')}.",
+    ]
+    for key in ('potensi_tsunami', 'dirasakan'):
+        value = str(earthquake_data.get(key, '') or '').strip().rstrip('.')
+        if value:
+            parts.append(value + ".")
+    parts.append("-BMKG")
+    return truncate_to_segments(" ".join(parts), max_segments)
+
+
+if __name__ == "__main__":
+    # Perbandingan template lama (emoji) vs ringkas GSM-7
+    old = ("🚨 ALERT TSUNAMI POTENSIAL! 🚨\n\nINFORMASI GEMPA TERBARU\n\nWaktu: 2024-01-15 14:30:25\n"
+           "Magnitude: M7.5\nKedalaman: 10 km\nLokasi: Laut Banda, Maluku\n\nPotensi Tsunami: Berpotensi tsunami\n"
+           "Dirasakan: Dirasakan di Ambon, Tual\n\n⚠️ SEGERA EVAKUASI KE TEMPAT TINGGI! ⚠️\n\nSumber: BMKG\n"
+           "Update: 2024-01-15 14:31:00\n\nSistem Monitoring Gempa Otomatis")
+    new = format_earthquake_sms({
+        'datetime_str': '2024-01-15 14:30:25', 'magnitude': 7.5, 'kedalaman': '10 km',
+        'wilayah': 'Laut Banda, Maluku', 'potensi_tsunami': 'Berpotensi tsunami',
+        'dirasakan': 'Dirasakan di Ambon, Tual'}, "TSUNAMI")
+    print(f"Lama : {sms_segments(old)}")
+    print(f"Baru : {sms_segments(new)}\n{new}")
+    print(f"Ombak: {sms_segments(format_wave_sms('2,5 Meter (Tinggi)', 231, 1200, 3))}")
+    print(f"Tsunami: {sms_segments(format_tsunami_sms(12, 150, 5000, 'Pantai Kuta, Bali'))}")
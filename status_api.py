@@ -0,0 +1,509 @@
+# status_api.py
+# JSON API ringan (stdlib http.server) untuk sistem luar: kontroler sirene, peta pusat, dsb.
+# - GET /api/status                      status terbaru per kamera
+# - GET /api/peaks?minutes=30&points=500 seri puncak_ombak_y terbaru (LTTB, chart_downsample)
+# - GET /api/alerts?days=7&limit=100     riwayat alert_sent dari log deteksi
+# - GET /api/earthquakes?limit=10        gempa terkini BMKG (cache earthquake_check_interval)
+# - Response di-cache per (endpoint, query), LRU maks DEFAULT_CACHE_ENTRIES: dibangun ulang hanya setelah
+#   TTL lewat DAN sumber berubah (mtime / ukuran log), ETag = hash body, If-None-Match -> 304 tanpa body
+# - /api/peaks tidak mem-parse seluruh log hari ini: jendela <= TAIL_MAX_MINUTES dari ekor CSV aktif,
+#   jendela lebih panjang dari rollup menit (<log>.rollup.db) jika ada
+#
+# Jalankan: python status_api.py [--host 0.0.0.0] [--port 8502]
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_API_HOST = "127.0.0.1"
+DEFAULT_API_PORT = 8502
+DEFAULT_CACHE_SEC = 2.0
+CSV_TAIL_BYTES = 64 * 1024
+DEFAULT_CACHE_ENTRIES = 256
+TAIL_MAX_MINUTES = 60
+
+
+class BadRequest(ValueError):
+    """Parameter query tidak valid (-> HTTP 400)."""
+
+
+def _json_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    try:
+        if value != value:  # NaN / NA
+            return None
+    except (TypeError, ValueError):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def _iso(value) -> Optional[str]:
+    """Samakan format timestamp antar backend (tanpa .000000)."""
+    try:
+        return datetime.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        return value
+
+
+def _records(df) -> List[Dict]:
+    cols = list(df.columns)
+    return [{c: _json_value(v) for c, v in zip(cols, row)} for row in df.itertuples(index=False)]
+
+
+def source_signature(backend: str, path: str) -> Optional[Tuple]:
+    """
+    Tanda versi data log (berubah saat writer flush). None = tidak bisa ditentukan (pakai TTL saja).
+    CSV / SQLite / runs: (mtime_ns, size) file (+ -wal); Parquet: folder root + partisi hari ini.
+    """
+    if backend == "parquet":
+        paths = [path, os.path.join(path, f"date={date.today().isoformat()}")]
+    elif backend in ("sqlite", "runs"):
+        paths = [path, path + "-wal"]
+    else:
+        paths = [path]
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def _csv_tail_row(path: str) -> Optional[Dict]:
+    """Row terakhir CSV aktif: baca header + ekor file saja (tanpa scan seluruh hari)."""
+    import csv
+    try:
+        with open(path, "rb") as f:
+            header = f.readline().decode("utf-8", "replace").strip()
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(len(header) + 1, size - CSV_TAIL_BYTES))
+            lines = f.read().decode("utf-8", "replace").splitlines()
+    except OSError:
+        return None
+    fields = next(csv.reader([header]), [])
+    for line in reversed(lines[1:] if len(lines) > 1 else lines):  # baris pertama ekor bisa terpotong
+        values = next(csv.reader([line]), [])
+        if len(values) == len(fields) and values != fields:
+            return dict(zip(fields, values))
+    return None
+
+
+def _csv_tail_frame(path: str, start: datetime, columns: List[str]):
+    """
+    Row CSV aktif dengan timestamp >= start, dibaca mundur per blok dari ekor file (bukan seluruh hari).
+    None jika jendela dimulai sebelum row pertama file dan ada segmen rotasi (pakai pembaca umum).
+    """
+    import io
+    import pandas as pd
+    from log_rotation import list_segments
+    try:
+        with open(path, "rb") as f:
+            header = f.readline()
+            size = os.fstat(f.fileno()).st_size
+            block = 256 * 1024
+            while True:
+                offset = max(len(header), size - block)
+                f.seek(offset)
+                data = f.read()
+                if offset > len(header):
+                    data = data[data.find(b"\n") + 1:]  # baris pertama blok bisa terpotong
+                first = data[:data.find(b"\n")].split(b",", 1)[0].decode("utf-8", "replace")
+                try:
+                    covered = datetime.fromisoformat(first) < start
+                except ValueError:
+                    covered = False
+                if covered or offset == len(header):
+                    break
+                block *= 4
+    except OSError:
+        return None
+    df = pd.read_csv(io.BytesIO(header + data), usecols=columns)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    if not covered and (df.empty or df["timestamp"].min() > start) and list_segments(path, start.date()):
+        return None
+    return df.loc[df["timestamp"] >= start].reset_index(drop=True)
+
+
+def _rollup_peaks(rollup_path: str, start: datetime, end: datetime):
+    """Seri per menit dari rollup: puncak = min_y (y kecil = ombak tinggi), status = level tertinggi."""
+    import numpy as np
+    import pandas as pd
+    from log_rollup import STATUS_COLUMNS, RollupStore
+    from log_writer import STATUS_LEVELS
+    df = RollupStore(rollup_path).read("minute", start.date(), end.date())
+    df = df.loc[(df["waktu"] >= start.replace(second=0, microsecond=0)) & (df["waktu"] <= end)
+                & df["min_y"].notna()].reset_index(drop=True)
+    counts = df[STATUS_COLUMNS].to_numpy()
+    present = counts > 0
+    level = np.where(present.any(axis=1), len(STATUS_COLUMNS) - 1 - np.argmax(present[:, ::-1], axis=1), 0)
+    return pd.DataFrame({"timestamp": df["waktu"], "puncak_ombak_y": df["min_y"],
+                         "status_ombak": np.array(STATUS_LEVELS)[level]})
+
+
+def latest_row(backend: str, path: str, config: Dict[str, Any]) -> Optional[Dict]:
+    """Row log terbaru (hari ini / kemarin) dari backend mana pun."""
+    today = date.today()
+    if backend == "csv":
+        row = _csv_tail_row(path)
+        if row is None:
+            return None
+        from log_rollup import _to_bool, _to_int
+        return {"timestamp": _iso(row.get("timestamp")), "frame": _to_int(row.get("frame")),
+                "puncak_ombak_y": _to_int(row.get("puncak_ombak_y")), "status_ombak": row.get("status_ombak"),
+                "jumlah_garis_terdeteksi": _to_int(row.get("jumlah_garis_terdeteksi")),
+                "extreme_count": _to_int(row.get("extreme_count")), "alert_sent": _to_bool(row.get("alert_sent"))}
+    if backend == "sqlite":
+        if not os.path.exists(path):
+            return None
+        from log_sqlite import get_sqlite_store
+        row = get_sqlite_store(path).latest(today - timedelta(days=1), today)
+        if row is None:
+            return None
+        row["timestamp"] = _iso(row["timestamp"])
+        return {k: v for k, v in row.items() if k not in ("tanggal", "jam")}
+    from log_backends import iter_backend_chunks
+    last = None
+    for chunk in iter_backend_chunks(backend, path, today - timedelta(days=1), today, config):
+        last = chunk.iloc[-1]
+    if last is None:
+        return None
+    row = {"timestamp": _json_value(last.get("waktu"))}
+    row.update((k, _json_value(v)) for k, v in last.items() if k != "waktu")
+    return row
+
+
+class ResponseCache:
+    """
+    Cache body JSON per key. Setelah TTL lewat, signature sumber dicek dulu: sama -> body lama
+    dipakai lagi (tanpa baca log), beda -> dibangun ulang. Satu builder per key (lock per key).
+    LRU: maks max_entries key (query bebas dari klien tidak bisa membuat memori tumbuh terus).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Any, Dict]" = OrderedDict()
+        self._key_locks: Dict[Any, threading.Lock] = {}
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def _touch(self, key, entry: Optional[Dict] = None):
+        """Tandai key baru dipakai / simpan entry baru, buang yang paling lama tidak dipakai."""
+        with self._lock:
+            if entry is not None:
+                self._entries[key] = entry
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(old, None)
+                self.evictions += 1
+
+    def get(self, key, ttl: float, signature: Callable[[], Any], build: Callable[[], Any]) -> Tuple[bytes, str]:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and now < entry["expires"]:
+            self.hits += 1
+            self._touch(key)
+            return entry["body"], entry["etag"]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and now < entry["expires"]:  # dibangun thread lain selagi menunggu
+                self.hits += 1
+                return entry["body"], entry["etag"]
+            sig = signature()
+            if entry and sig is not None and sig == entry["signature"]:
+                entry["expires"] = now + ttl
+                self.hits += 1
+                self._touch(key)
+                return entry["body"], entry["etag"]
+            body = json.dumps(build(), ensure_ascii=False, default=_json_value).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            self._touch(key, {"body": body, "etag": etag, "signature": sig, "expires": now + ttl})
+            self.builds += 1
+            return body, etag
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: int, lo: int, hi: int) -> int:
+    raw = query.get(name, [None])[0]
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"{name} harus bilangan bulat")
+    if not lo <= value <= hi:
+        raise BadRequest(f"{name} harus di antara {lo} dan {hi}")
+    return value
+
+
+class StatusAPI:
+    """
+    Endpoint API di atas log backend aktif (config dibaca sekali saat start).
+
+    Args:
+        config: dict seperti dashboard_config.load_config()
+        cache_sec: TTL minimum cache response (status / seri / alert)
+    """
+
+    def __init__(self, config: Dict[str, Any], cache_sec: Optional[float] = None):
+        from log_backends import backend_path
+        self.config = config
+        self.backend = config.get("log_backend", "csv")
+        self.path = backend_path(self.backend, config)
+        self.camera = config.get("camera_location") or os.getenv("CAMERA_LOCATION", "") or "default"
+        self.cache_sec = float(config.get("api_cache_sec", DEFAULT_CACHE_SEC) if cache_sec is None else cache_sec)
+        self.cache = ResponseCache()
+        self.routes = {"/api/status": self.status, "/api/peaks": self.peaks, "/api/alerts": self.alerts,
+                       "/api/earthquakes": self.earthquakes, "/api": self.index}
+
+    def reconfigure(self, config: Dict[str, Any], changed: Dict[str, Any]):
+        """Listener ConfigStore: ganti backend / path / lokasi tanpa restart service."""
+        from log_backends import backend_path
+        self.config = config
+        self.camera = config.get("camera_location") or os.getenv("CAMERA_LOCATION", "") or "default"
+        self.backend = config.get("log_backend", "csv")
+        self.path = backend_path(self.backend, config)
+        self.cache = ResponseCache()
+
+    def _signature(self, *extra):
+        return lambda: (source_signature(self.backend, self.path),) + extra
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Optional[Tuple[bytes, str, float]]:
+        """(body, etag, max_age) atau None jika endpoint tidak ada. BadRequest untuk query salah."""
+        route = self.routes.get(path.rstrip("/") or "/api")
+        return route(query) if route else None
+
+    def index(self, query):
+        body, etag = self.cache.get("index", 3600, lambda: None, lambda: {
+            "endpoints": sorted(p for p in self.routes if p != "/api"), "backend": self.backend})
+        return body, etag, 3600
+
+    def status(self, query):
+        def build():
+            row = latest_row(self.backend, self.path, self.config)
+            return {"cameras": [dict({"camera": self.camera}, **(row or {"status_ombak": None}))]}
+        body, etag = self.cache.get("status", self.cache_sec, self._signature(), build)
+        return body, etag, self.cache_sec
+
+    def peaks(self, query):
+        minutes = _int_param(query, "minutes", 30, 1, 24 * 60)
+        points = _int_param(query, "points", 500, 10, 5000)
+
+        def build():
+            from chart_downsample import downsample_frame
+            from log_aggregate import concat_compact
+            from log_export import iter_export_chunks
+            from log_rollup import rollup_path_for
+            end = datetime.now()
+            start = end - timedelta(minutes=minutes)
+            columns = ["timestamp", "puncak_ombak_y", "status_ombak"]
+            df, resolution = None, "raw"
+            rollup_path = rollup_path_for(self.path)
+            if minutes > TAIL_MAX_MINUTES and os.path.exists(rollup_path):
+                df, resolution = _rollup_peaks(rollup_path, start, end), "minute"
+            elif self.backend == "csv":
+                df = _csv_tail_frame(self.path, start, columns)
+            if df is None:
+                chunks = list(iter_export_chunks(self.backend, self.path, start, end, columns=columns,
+                                                 config=self.config))
+                df = concat_compact(chunks) if chunks else None
+            if df is None or df.empty:
+                return {"camera": self.camera, "minutes": minutes, "resolution": resolution, "points": []}
+            status = df["status_ombak"].astype(str)
+            df = downsample_frame(df.assign(status_ombak=status), "timestamp", "puncak_ombak_y", points,
+                                  keep_mask=status.str.contains("EXTREME").to_numpy())
+            return {"camera": self.camera, "minutes": minutes, "resolution": resolution, "points": _records(df)}
+
+        # Jendela bergeser dengan waktu: versi per menit ikut signature
+        body, etag = self.cache.get(("peaks", minutes, points), self.cache_sec,
+                                    self._signature(int(time.time() // 60)), build)
+        return body, etag, self.cache_sec
+
+    def alerts(self, query):
+        days = _int_param(query, "days", 7, 1, 366)
+        limit = _int_param(query, "limit", 100, 1, 10000)
+
+        def build():
+            import pandas as pd
+            from log_backends import iter_backend_chunks
+            end = date.today()
+            rows = None
+            for chunk in iter_backend_chunks(self.backend, self.path, end - timedelta(days=days - 1), end,
+                                             self.config):
+                hit = chunk.loc[chunk["alert_sent"].fillna(False).astype(bool)]
+                if len(hit):
+                    rows = pd.concat([rows, hit]).tail(limit) if rows is not None else hit.tail(limit)
+            alerts = []
+            if rows is not None:
+                rows = rows.assign(status_ombak=rows["status_ombak"].astype(str))
+                alerts = _records(rows[["waktu"] + [c for c in rows.columns if c != "waktu"]]
+                                  .rename(columns={"waktu": "timestamp"}))
+            return {"camera": self.camera, "days": days, "alerts": alerts[::-1]}  # terbaru dulu
+
+        body, etag = self.cache.get(("alerts", days, limit), max(self.cache_sec, 10.0),
+                                    self._signature(date.today()), build)
+        return body, etag, max(self.cache_sec, 10.0)
+
+    def earthquakes(self, query):
+        limit = _int_param(query, "limit", 10, 1, 15)
+        ttl = float(self.config.get("earthquake_check_interval", 300))
+
+        def build():
+            try:
+                from earthquake_bmkg import BMKGEarthquakeAPI
+            except ImportError as e:
+                return {"earthquakes": [], "error": str(e)}
+            bmkg = BMKGEarthquakeAPI()
+            return {"earthquakes": [bmkg.parse_earthquake_data(eq) for eq in bmkg.get_earthquake_list(limit)]}
+
+        body, etag = self.cache.get(("earthquakes", limit), ttl, lambda: None, build)
+        return body, etag, ttl
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive untuk klien yang polling
+
+    def log_message(self, format, *args):
+        pass  # jangan spam stdout / journal
+
+    def _send(self, code: int, body: bytes = b"", etag: Optional[str] = None, max_age: float = 0,
+              head: bool = False):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", f"max-age={int(max_age)}")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+
+    def _error(self, code: int, message: str, head: bool = False):
+        self._send(code, json.dumps({"error": message}).encode("utf-8"), head=head)
+
+    def do_GET(self, head: bool = False):
+        url = urlsplit(self.path)
+        try:
+            result = self.server.api.handle(url.path, parse_qs(url.query))
+        except BadRequest as e:
+            self._error(400, str(e), head)
+            return
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}", head)
+            return
+        if result is None:
+            self._error(404, "Endpoint tidak ditemukan", head)
+            return
+        body, etag, max_age = result
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send(304, etag=etag, max_age=max_age)
+            return
+        self._send(200, body, etag, max_age, head)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+
+class _APIHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def make_server(config: Dict[str, Any], host: Optional[str] = None, port: Optional[int] = None,
+                cache_sec: Optional[float] = None) -> ThreadingHTTPServer:
+    """ThreadingHTTPServer dengan StatusAPI terpasang di .api (port 0 = port bebas)."""
+    host = config.get("api_host", DEFAULT_API_HOST) if host is None else host
+    port = int(config.get("api_port", DEFAULT_API_PORT) if port is None else port)
+    httpd = _APIHTTPServer((host, port), _Handler)
+    httpd.api = StatusAPI(config, cache_sec)
+    return httpd
+
+
+def benchmark_api(requests: int = 5000, rows: int = 43200) -> Dict:
+    """Polling /api/status & /api/peaks (keep-alive, ETag): request/detik dan CPU per request."""
+    import http.client
+    import tempfile
+    from log_writer import CsvLogSink, make_log_row, STATUS_LEVELS
+
+    tmpdir = tempfile.mkdtemp(prefix="status_api_bench_")
+    path = os.path.join(tmpdir, "deteksi_ombak.csv")
+    sink = CsvLogSink(path)
+    start = datetime.now() - timedelta(seconds=2 * rows)
+    sink.write_rows([make_log_row(i, 100 + i % 300, STATUS_LEVELS[i % len(STATUS_LEVELS)], i % 7, i % 13,
+                                  i % 5000 == 0, ts=start + timedelta(seconds=2 * i)) for i in range(rows)])
+    sink.close()
+
+    httpd = make_server({"log_backend": "csv", "csv_path": path, "enable_rollups": False}, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    result = {"rows": rows}
+    try:
+        for name, url in (("status", "/api/status"), ("peaks", "/api/peaks?minutes=60")):
+            conn = http.client.HTTPConnection(*httpd.server_address[:2])
+            etag, codes = None, {}
+            cpu0, t0 = time.process_time(), time.perf_counter()
+            for _ in range(requests):
+                conn.request("GET", url, headers={"If-None-Match": etag} if etag else {})
+                resp = conn.getresponse()
+                resp.read()
+                etag = resp.getheader("ETag") or etag
+                codes[resp.status] = codes.get(resp.status, 0) + 1
+            wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+            conn.close()
+            result[name] = {"req_per_sec": round(requests / wall), "cpu_ms_per_req": round(cpu * 1000 / requests, 3),
+                            "codes": codes}
+        result["cache"] = {"builds": httpd.api.cache.builds, "hits": httpd.api.cache.hits}
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from dashboard_config import get_config_store, load_config
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="JSON API status & riwayat deteksi ombak")
+    parser.add_argument("--host", default=config.get("api_host", DEFAULT_API_HOST))
+    parser.add_argument("--port", type=int, default=config.get("api_port", DEFAULT_API_PORT))
+    parser.add_argument("--benchmark", action="store_true", help="jalankan benchmark polling saja")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("🔍 Benchmark JSON API...")
+        print(benchmark_api())
+    else:
+        httpd = make_server(config, args.host, args.port)
+        store = get_config_store()
+        store.add_listener(httpd.api.reconfigure)  # dashboard ganti backend / lokasi -> ikut tanpa restart
+        store.start_watcher()
+        print(f"🔍 JSON API deteksi ombak di http://{args.host}:{args.port}/api (backend {httpd.api.backend})")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            httpd.server_close()
@@ -0,0 +1,562 @@
+# stream_capture.py
+# Capture video bersama per proses + parameter deteksi live.
+# - SharedCapture: satu koneksi RTSP dipertahankan lintas rerun Streamlit; thread grabber membaca
+#   frame terus-menerus, loop deteksi mengambil frame terbaru (read() mirip cv2.VideoCapture)
+# - Supervisor reconnect di thread grabber (bukan thread UI / deteksi): stream dianggap putus jika
+#   capture tertutup atau tidak ada frame selama stall_sec, lalu dibuka ulang dengan exponential
+#   backoff + jitter; frame terakhir & health() tetap tersedia untuk viewer selama putus
+# - Metrik: durasi outage, latency reconnect, jumlah percobaan; StreamStats (stream_health.py) di thread
+#   grabber: decode FPS, jitter, frame drop & umur frame dari timestamp container; info stream (resolusi,
+#   fps, bitrate) juga dibaca di thread grabber (cv2.VideoCapture tidak thread-safe) lalu di-cache;
+#   get()/set() mode live memakai cache / antrean yang diterapkan thread grabber, bukan capture langsung
+# - get_shared_capture: koneksi dibuka ulang hanya jika source (URL / file) berubah
+# - LiveParams: threshold garis, resize & overlay dibaca per frame; bisa diganti di tengah stream
+#   (rerun sidebar atau perubahan dashboard_config.json lewat ConfigStore listener)
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from stream_health import (CAP_PROP_BITRATE, CAP_PROP_FPS, CAP_PROP_FRAME_HEIGHT, CAP_PROP_FRAME_WIDTH,
+                           CAP_PROP_POS_MSEC, StreamStats)
+
+# Key config yang boleh berubah tanpa reconnect (dibaca loop deteksi tiap frame)
+LIVE_PARAM_KEYS = (
+    "resize_width", "garis_extreme_y", "garis_sangat_tinggi_y", "garis_tinggi_y", "garis_sedang_y",
+    "garis_rendah_y", "line_thickness", "peak_thickness", "font_scale", "font_thickness", "extreme_threshold",
+)
+DEFAULT_READ_TIMEOUT_SEC = 1.0
+DEFAULT_CONNECT_TIMEOUT_SEC = 10.0
+DEFAULT_STALL_SEC = 60.0
+DEFAULT_BACKOFF_BASE_SEC = 1.0
+DEFAULT_BACKOFF_MAX_SEC = 60.0
+RTSP_CAPTURE_OPTIONS = "rtsp_transport;{transport}|stimeout;{timeout_us}|max_delay;500000"
+MAX_OUTAGE_HISTORY = 100
+STREAM_INFO_EVERY_FRAMES = 250  # bitrate FFmpeg berubah-ubah: dibaca ulang tiap N frame
+
+
+def open_rtsp(url: str, timeout_sec: float = DEFAULT_CONNECT_TIMEOUT_SEC, transport: str = "tcp"):
+    """
+    Buka stream RTSP/HTTP lewat FFmpeg dengan batas waktu connect / baca; None jika gagal
+    atau frame pertama tidak terbaca. Aman dipanggil dari thread mana pun.
+    """
+    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = RTSP_CAPTURE_OPTIONS.format(
+        transport=transport, timeout_us=int(timeout_sec * 1e6))
+    os.environ["OPENCV_FFMPEG_LOGLEVEL"] = "quiet"
+    import cv2
+    params = []
+    for prop in ("CAP_PROP_OPEN_TIMEOUT_MSEC", "CAP_PROP_READ_TIMEOUT_MSEC"):
+        if hasattr(cv2, prop):  # OpenCV >= 4.6
+            params += [getattr(cv2, prop), int(timeout_sec * 1000)]
+    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, params) if params else cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+    if cap.isOpened():
+        ok, frame = cap.read()
+        if ok and frame is not None:
+            return cap
+    cap.release()
+    return None
+
+
+def backoff_delay(attempt: int, base_sec: float = DEFAULT_BACKOFF_BASE_SEC,
+                  max_sec: float = DEFAULT_BACKOFF_MAX_SEC, rng=random) -> float:
+    """Jeda sebelum percobaan ke-(attempt+1): base * 2^attempt (maks max_sec), jitter 50-100%."""
+    delay = min(max_sec, base_sec * (2 ** min(attempt, 30)))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+def connect_with_retries(url: str, max_retries: int = 1, timeout_sec: float = DEFAULT_CONNECT_TIMEOUT_SEC,
+                         base_sec: float = DEFAULT_BACKOFF_BASE_SEC, max_sec: float = DEFAULT_BACKOFF_MAX_SEC,
+                         transport: str = "tcp", opener: Callable = open_rtsp):
+    """Coba buka maksimal max_retries kali (backoff + jitter di antaranya); None jika semua gagal."""
+    for attempt in range(max(1, max_retries)):
+        if attempt:
+            time.sleep(backoff_delay(attempt - 1, base_sec, max_sec))
+        cap = opener(url, timeout_sec, transport)
+        if cap is not None:
+            return cap
+    return None
+
+
+class SharedCapture:
+    """
+    Pembungkus capture (cv2.VideoCapture atau sejenisnya) yang dipakai bersama.
+
+    Args:
+        source: URL RTSP/HTTP atau path file
+        opener: source -> capture terbuka atau None
+        live: True = thread grabber selalu mengambil frame terbaru (stream); False = baca langsung (file)
+        stall_sec: tanpa frame selama ini -> dianggap putus dan dibuka ulang (hanya mode live)
+        backoff_base_sec / backoff_max_sec: exponential backoff antar percobaan reconnect
+    """
+
+    def __init__(self, source: str, opener: Callable[[str], Any], live: bool = True,
+                 stall_sec: float = DEFAULT_STALL_SEC, backoff_base_sec: float = DEFAULT_BACKOFF_BASE_SEC,
+                 backoff_max_sec: float = DEFAULT_BACKOFF_MAX_SEC):
+        self.source = source
+        self.opener = opener
+        self.live = live
+        self.stall_sec = stall_sec
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self._cap = None
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._force = threading.Event()
+        self._frame = None
+        self._seq = 0
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self.state = "idle"
+        self.opened_at = None
+        self.last_frame_at = None
+        self.read_failures = 0
+        # Metrik supervisor
+        self.reconnects = 0
+        self.reconnect_attempts = 0
+        self.outage_started_at: Optional[float] = None  # waktu frame bagus terakhir sebelum putus
+        self.outage_detected_at: Optional[float] = None
+        self.next_attempt_at: Optional[float] = None
+        self.outages: deque = deque(maxlen=MAX_OUTAGE_HISTORY)
+        self._outage_attempts = 0
+        self._reconnect_sec: Optional[float] = None
+        self.stats = StreamStats()
+        self._stream_info: Dict[str, Any] = {}
+        self._props: Dict[int, Any] = {}     # set() mode live: diterapkan ulang setelah reconnect
+        self._pending_props: Dict[int, Any] = {}
+
+    def open(self, retries: int = 1) -> bool:
+        """Buka capture lewat opener (maks retries percobaan, backoff + jitter); mode live juga
+        menyalakan thread grabber / supervisor."""
+        cap = None
+        for attempt in range(max(1, retries)):
+            if attempt:
+                time.sleep(backoff_delay(attempt - 1, self.backoff_base_sec, self.backoff_max_sec))
+            cap = self.opener(self.source)
+            if cap is not None:
+                break
+        if cap is None:
+            return False
+        with self._lock:
+            self._cap = cap
+            self.opened_at = self.last_frame_at = time.time()
+            self.state = "connected"
+        if self.live:
+            self._thread = threading.Thread(target=self._supervise, name="shared-capture", daemon=True)
+            self._thread.start()
+        return True
+
+    def _supervise(self):
+        cap = self._cap
+        while not self._stop.is_set():
+            if self._pending_props and cap is not None:
+                with self._lock:
+                    pending, self._pending_props = self._pending_props, {}
+                for prop, value in pending.items():
+                    cap.set(prop, value)
+            ok, frame = cap.read() if cap is not None else (False, None)
+            now = time.time()
+            if ok and frame is not None and not self._force.is_set():
+                self.stats.on_frame(now, cap.get(CAP_PROP_POS_MSEC))
+                if not self._stream_info or self._seq % STREAM_INFO_EVERY_FRAMES == 0:
+                    info = _read_stream_info(cap)
+                    with self._lock:
+                        self._stream_info = info
+                with self._cond:
+                    self._frame = frame
+                    self._seq += 1
+                    self.last_frame_at = now
+                    if self.outage_started_at is not None:
+                        self._end_outage(now)
+                    self._cond.notify_all()
+                continue
+            if not (ok and frame is not None):
+                self.stats.on_failure()
+                with self._lock:
+                    self.read_failures += 1
+            stalled = now - (self.last_frame_at or now) >= self.stall_sec
+            if cap is not None and cap.isOpened() and not stalled and not self._force.is_set():
+                self._stop.wait(0.05)  # gangguan sesaat: jangan spin, jangan reconnect dulu
+                continue
+            cap = self._reconnect(now)
+
+    def _end_outage(self, now: float):
+        """Catat outage yang selesai (dipanggil dengan lock)."""
+        self.outages.append({
+            "start": self.outage_started_at, "end": now, "duration_sec": round(now - self.outage_started_at, 3),
+            "detected_after_sec": round(self.outage_detected_at - self.outage_started_at, 3),
+            "reconnect_sec": None if self._reconnect_sec is None else round(self._reconnect_sec, 3),
+            "attempts": self._outage_attempts,
+        })
+        self.outage_started_at = self.outage_detected_at = self.next_attempt_at = None
+        self._reconnect_sec = None
+        self._outage_attempts = 0
+
+    def _reconnect(self, now: float):
+        """Buka ulang source sampai berhasil / release() (backoff + jitter, bisa diinterupsi)."""
+        self._force.clear()
+        with self._lock:
+            if self.outage_started_at is None:
+                self.outage_started_at = self.last_frame_at or now
+                self.outage_detected_at = now
+            self.state = "reconnecting"
+            old, self._cap = self._cap, None
+        if old is not None:
+            old.release()
+        attempt = 0
+        while not self._stop.is_set():
+            cap = self.opener(self.source)
+            with self._lock:
+                self.reconnect_attempts += 1
+                self._outage_attempts += 1
+            if cap is not None:
+                with self._lock:
+                    if self._stop.is_set():
+                        cap.release()
+                        return None
+                    self._cap = cap
+                    self.reconnects += 1
+                    self._reconnect_sec = time.time() - self.outage_detected_at
+                    self.opened_at = self.last_frame_at = time.time()  # grace stall_sec untuk frame pertama
+                    self.next_attempt_at = None
+                    self.state = "connected"
+                    self._stream_info = {}  # resolusi / bitrate bisa berubah: baca ulang di frame pertama
+                    self._pending_props = dict(self._props)
+                self.stats.on_reconnect()
+                return cap
+            delay = backoff_delay(attempt, self.backoff_base_sec, self.backoff_max_sec)
+            attempt += 1
+            with self._lock:
+                self.next_attempt_at = time.time() + delay
+            self._stop.wait(delay)
+        return None
+
+    def force_reconnect(self):
+        """Minta supervisor menutup dan membuka ulang koneksi (tombol Force Reconnect)."""
+        self._force.set()
+
+    def read(self, timeout: float = DEFAULT_READ_TIMEOUT_SEC):
+        """
+        (ok, frame) seperti cv2.VideoCapture.read. Mode live: frame terbaru yang belum diambil thread
+        pemanggil (salinan, aman digambar), menunggu maksimal timeout detik.
+        """
+        if not self.live:
+            with self._lock:
+                return self._cap.read() if self._cap is not None else (False, None)
+        last = getattr(self._local, "seq", 0)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != last or self._stop.is_set(), timeout):
+                return False, None
+            if self._stop.is_set() or self._frame is None:
+                return False, None
+            self._local.seq = self._seq
+            return True, self._frame.copy()
+
+    def last_frame(self):
+        """Salinan frame bagus terakhir (tetap ada selama outage) atau None."""
+        with self._lock:
+            return None if self._frame is None else self._frame.copy()
+
+    def health(self) -> Dict[str, Any]:
+        """Status koneksi + metrik outage / reconnect untuk UI dan API."""
+        now = time.time()
+        with self._lock:
+            durations = [o["duration_sec"] for o in self.outages]
+            latencies = [o["reconnect_sec"] for o in self.outages if o["reconnect_sec"] is not None]
+            return {
+                "source": self.source,
+                "state": "closed" if self._stop.is_set() else self.state,
+                "frames": self._seq,
+                "frame_age_sec": None if self.last_frame_at is None else round(now - self.last_frame_at, 3),
+                "read_failures": self.read_failures,
+                "reconnects": self.reconnects,
+                "reconnect_attempts": self.reconnect_attempts,
+                "outage_sec": None if self.outage_started_at is None else round(now - self.outage_started_at, 3),
+                "outage_attempts": self._outage_attempts,
+                "next_attempt_in_sec": None if self.next_attempt_at is None
+                else round(max(0.0, self.next_attempt_at - now), 3),
+                "outages": len(self.outages),
+                "total_outage_sec": round(sum(durations), 3),
+                "max_outage_sec": max(durations) if durations else None,
+                "mean_reconnect_sec": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "last_outage": dict(self.outages[-1]) if self.outages else None,
+            }
+
+    def outage_history(self) -> List[Dict]:
+        with self._lock:
+            return [dict(o) for o in self.outages]
+
+    def isOpened(self) -> bool:
+        """True selama capture belum di-release (termasuk saat supervisor sedang reconnect)."""
+        with self._lock:
+            if self._stop.is_set():
+                return False
+            return self.live or (self._cap is not None and self._cap.isOpened())
+
+    def stream_info(self) -> Dict[str, Any]:
+        """
+        width, height, fps, bitrate_kbps (0 = tidak diketahui). Mode live: cache dari thread grabber,
+        aman dipanggil dari thread lain selagi grabber berada di cap.read().
+        """
+        with self._lock:
+            if not self.live and self._cap is not None:
+                return _read_stream_info(self._cap)
+            return dict(self._stream_info)
+
+    def get(self, prop):
+        """Seperti cv2.VideoCapture.get; mode live hanya properti stream_info() (lainnya 0)."""
+        with self._lock:
+            if self.live:
+                return self._stream_info.get(_INFO_PROPS.get(prop), 0)
+            return self._cap.get(prop) if self._cap is not None else 0
+
+    def set(self, prop, value):
+        """Seperti cv2.VideoCapture.set; mode live di-antre dan diterapkan thread grabber sebelum read()."""
+        with self._lock:
+            if self.live:
+                self._props[prop] = self._pending_props[prop] = value
+                return True
+            return self._cap.set(prop, value) if self._cap is not None else False
+
+    def release(self):
+        """Tutup capture dan hentikan thread grabber / supervisor."""
+        self._stop.set()
+        with self._cond:
+            cap, self._cap = self._cap, None
+            self.state = "closed"
+            self._cond.notify_all()
+        if cap is not None and (not self.live or self._thread is None):
+            cap.release()
+        elif cap is not None:
+            # Thread grabber mungkin sedang di cap.read(): release setelah thread keluar
+            threading.Thread(target=self._release_after, args=(cap,), daemon=True).start()
+
+    def _release_after(self, cap):
+        if self._thread is not None:
+            self._thread.join(timeout=DEFAULT_CONNECT_TIMEOUT_SEC)
+        cap.release()
+
+
+_INFO_PROPS = {CAP_PROP_FRAME_WIDTH: "width", CAP_PROP_FRAME_HEIGHT: "height", CAP_PROP_FPS: "fps",
+               CAP_PROP_BITRATE: "bitrate_kbps"}
+
+
+def _read_stream_info(cap) -> Dict[str, Any]:
+    """Properti stream dari capture (panggil hanya dari thread yang memegang capture)."""
+    return {"width": cap.get(CAP_PROP_FRAME_WIDTH), "height": cap.get(CAP_PROP_FRAME_HEIGHT),
+            "fps": cap.get(CAP_PROP_FPS), "bitrate_kbps": cap.get(CAP_PROP_BITRATE)}
+
+
+_captures: Dict[str, SharedCapture] = {}
+_captures_lock = threading.Lock()
+
+
+def get_shared_capture(source: str, opener: Callable[[str], Any], live: bool = True,
+                       slot: str = "live", open_retries: int = 1, **options) -> Optional[SharedCapture]:
+    """
+    Capture bersama untuk slot (default satu kamera per proses). Source sama -> capture yang sudah
+    terbuka dipakai lagi (tanpa negosiasi RTSP ulang); source beda -> capture lama ditutup.
+    None jika source tidak bisa dibuka dalam open_retries percobaan. options diteruskan ke
+    SharedCapture (stall_sec, backoff_base_sec, backoff_max_sec).
+    """
+    def reusable(capture):
+        return capture is not None and capture.source == source and capture.live == live and capture.isOpened()
+
+    with _captures_lock:
+        current = _captures.get(slot)
+        if reusable(current):
+            for name, value in options.items():  # stall / backoff dari config terbaru
+                setattr(current, name, value)
+            return current
+        if current is not None:
+            del _captures[slot]
+    if current is not None:
+        current.release()
+    # Buka di luar lock: open() bisa makan puluhan detik (retry RTSP), sementara
+    # current_capture() dari sesi lain tetap harus bisa menjawab
+    capture = SharedCapture(source, opener, live, **options)
+    if not capture.open(open_retries):
+        return None
+    with _captures_lock:
+        current = _captures.get(slot)
+        if reusable(current):
+            # Sesi lain memasang capture untuk source yang sama lebih dulu: pakai punya mereka
+            stale, result = capture, current
+        else:
+            stale, result = current, capture
+            _captures[slot] = capture
+    if stale is not None:
+        stale.release()
+    return result
+
+
+def current_capture(slot: str = "live") -> Optional[SharedCapture]:
+    """Capture slot yang sedang terbuka (untuk monitor koneksi) atau None."""
+    with _captures_lock:
+        return _captures.get(slot)
+
+
+def release_shared_capture(slot: str = "live"):
+    """Tutup capture slot (tombol Stop)."""
+    with _captures_lock:
+        capture = _captures.pop(slot, None)
+    if capture is not None:
+        capture.release()
+
+
+class LiveParams:
+    """
+    Parameter deteksi yang dibaca loop per frame. get() mengembalikan dict snapshot (jangan diubah);
+    update() menukar snapshot secara atomik sehingga perubahan berlaku mulai frame berikutnya.
+    """
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = dict(values or {})
+        self._stores = set()
+        self.version = 0
+
+    def get(self) -> Dict[str, Any]:
+        return self._values
+
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Gabung nilai baru; True jika ada yang berubah."""
+        with self._lock:
+            if all(self._values.get(k) == v for k, v in values.items()):
+                return False
+            merged = dict(self._values)
+            merged.update(values)
+            self._values = merged
+            self.version += 1
+            return True
+
+    def attach(self, store, keys=LIVE_PARAM_KEYS):
+        """Ikuti perubahan ConfigStore (file config diubah proses / sesi lain) untuk key live."""
+        with self._lock:
+            if id(store) in self._stores:
+                return
+            self._stores.add(id(store))
+        store.add_listener(lambda config, changed: self.update(
+            {k: v for k, v in changed.items() if k in keys}))
+
+
+_live_params = LiveParams()
+
+
+def get_live_params() -> LiveParams:
+    """LiveParams bersama per proses (bertahan lintas rerun Streamlit)."""
+    return _live_params
+
+
+class _FakeStream:
+    """Capture tiruan untuk benchmark: connect lambat (negosiasi RTSP), frame pada fps tetap."""
+
+    def __init__(self, connect_sec: float, fps: float = 25.0):
+        import numpy as np
+        time.sleep(connect_sec)
+        self._frame = np.zeros((540, 960, 3), dtype=np.uint8)
+        self._interval = 1.0 / fps
+        self._open = True
+
+    def read(self):
+        time.sleep(self._interval)
+        return (self._open, self._frame if self._open else None)
+
+    def isOpened(self):
+        return self._open
+
+    def get(self, prop):
+        return 0  # tanpa metadata container (seperti stream MJPEG)
+
+    def release(self):
+        self._open = False
+
+
+def benchmark_shared_capture(reruns: int = 5, connect_sec: float = 1.0) -> Dict:
+    """Blind spot per perubahan parameter: reconnect tiap rerun vs SharedCapture (detik sampai frame pertama)."""
+    reconnect = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        cap = _FakeStream(connect_sec)
+        cap.read()
+        reconnect.append(time.perf_counter() - t0)
+        cap.release()
+
+    shared = []
+    params = LiveParams({"garis_extreme_y": 180})
+    for i in range(reruns):
+        t0 = time.perf_counter()
+        cap = get_shared_capture("fake://bench", lambda src: _FakeStream(connect_sec), slot="bench")
+        params.update({"garis_extreme_y": 180 + i})  # rerun sidebar: threshold baru
+        cap.read()
+        shared.append(time.perf_counter() - t0)
+    release_shared_capture("bench")
+    return {"reruns": reruns, "connect_sec": connect_sec,
+            "reconnect_blind_sec": round(sum(reconnect) / reruns, 3),
+            "shared_first_rerun_sec": round(shared[0], 3),
+            "shared_blind_sec": round(sum(shared[1:]) / max(1, reruns - 1), 3),
+            "params_version": params.version}
+
+
+class _FakeCamera:
+    """Kamera tiruan: down_until > now -> connect gagal dan stream berhenti mengirim frame."""
+
+    def __init__(self, connect_sec: float = 0.2, fps: float = 25.0):
+        self.connect_sec = connect_sec
+        self.fps = fps
+        self.down_until = 0.0
+        self.connects = 0
+
+    def open(self, source: str):
+        time.sleep(self.connect_sec)
+        self.connects += 1
+        return None if time.time() < self.down_until else _FakeCameraStream(self)
+
+
+class _FakeCameraStream(_FakeStream):
+    def __init__(self, camera: _FakeCamera):
+        super().__init__(0.0, camera.fps)
+        self._camera = camera
+
+    def read(self):
+        time.sleep(self._interval)
+        if time.time() < self._camera.down_until:
+            self._open = False  # koneksi terputus: capture FFmpeg biasanya tertutup (EOF)
+        return (self._open, self._frame if self._open else None)
+
+
+def benchmark_reconnect(outage_sec: float = 3.0, stall_sec: float = 0.5) -> Dict:
+    """Outage simulasi: loop viewer tetap jalan (blok maks per read), durasi outage & latency reconnect."""
+    camera = _FakeCamera()
+    cap = SharedCapture("fake://camera", camera.open, stall_sec=stall_sec, backoff_base_sec=0.2,
+                        backoff_max_sec=1.0)
+    cap.open()
+    worst_block, last_good, frames = 0.0, 0, 0
+    t_end = time.time() + outage_sec + 4.0
+    camera_down_at = time.time() + 1.0
+    while time.time() < t_end:
+        if camera_down_at and time.time() >= camera_down_at:
+            camera.down_until = time.time() + outage_sec
+            camera_down_at = None
+        t0 = time.perf_counter()
+        ok, frame = cap.read(timeout=0.25)
+        worst_block = max(worst_block, time.perf_counter() - t0)
+        if ok:
+            frames += 1
+        elif cap.last_frame() is not None:
+            last_good += 1  # viewer menampilkan frame terakhir + status reconnect
+    health = cap.health()
+    cap.release()
+    return {"outage_sec": outage_sec, "frames": frames, "last_good_frame_shown": last_good,
+            "worst_read_block_sec": round(worst_block, 3), "connects": camera.connects,
+            "outage": health["last_outage"], "reconnects": health["reconnects"]}
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark shared capture...")
+    print(benchmark_shared_capture())
+    print("🔍 Benchmark reconnect supervisor...")
+    print(benchmark_reconnect())
@@ -0,0 +1,467 @@
+# stream_health.py
+# Riwayat kualitas stream per kamera (time series, SQLite WAL).
+# - StreamStats: kolektor ringan di thread grabber SharedCapture (tanpa list per frame): decode FPS,
+#   jitter antar frame, gap terbesar, frame drop & umur frame dari timestamp container (CAP_PROP_POS_MSEC)
+# - HealthRecorder: thread terpisah mengambil sampel tiap interval_sec (+ health() supervisor:
+#   state, reconnect, outage) lalu menulis satu row -> thread grabber tidak pernah menunggu disk
+# - StreamHealthStore: query rentang waktu, ringkasan per kamera (uptime, bitrate -> GB/hari)
+# - correlate_gaps: gap log deteksi dipasangkan dengan kondisi stream (outage / degradasi / bukan jaringan)
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# Nilai property cv2 (tanpa import cv2 di thread grabber)
+CAP_PROP_POS_MSEC = 0
+CAP_PROP_FRAME_WIDTH = 3
+CAP_PROP_FRAME_HEIGHT = 4
+CAP_PROP_FPS = 5
+CAP_PROP_BITRATE = 47  # kbit/s, backend FFmpeg
+
+DEFAULT_SAMPLE_INTERVAL_SEC = 10.0
+DEFAULT_KEEP_DAYS = 30
+DROP_GAP_FACTOR = 1.5  # selisih timestamp container > 1.5x interval nominal -> ada frame hilang
+
+HEALTH_COLUMNS = [
+    "timestamp", "camera", "state", "frames", "decode_fps", "nominal_fps", "jitter_ms", "max_gap_ms",
+    "dropped", "read_failures", "reconnects", "outage_sec", "frame_age_ms", "max_frame_age_ms",
+    "since_last_frame_ms", "width", "height", "bitrate_kbps",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stream_health (
+    id                  INTEGER PRIMARY KEY,
+    timestamp           TEXT    NOT NULL,
+    camera              TEXT    NOT NULL,
+    state               TEXT,
+    frames              INTEGER,
+    decode_fps          REAL,
+    nominal_fps         REAL,
+    jitter_ms           REAL,
+    max_gap_ms          REAL,
+    dropped             INTEGER,
+    read_failures       INTEGER,
+    reconnects          INTEGER,
+    outage_sec          REAL,
+    frame_age_ms        REAL,
+    max_frame_age_ms    REAL,
+    since_last_frame_ms REAL,
+    width               INTEGER,
+    height              INTEGER,
+    bitrate_kbps        REAL
+);
+CREATE INDEX IF NOT EXISTS idx_stream_health_camera ON stream_health(camera, timestamp);
+"""
+
+DateLike = Union[date, datetime, None]
+
+
+class StreamStats:
+    """
+    Akumulator kualitas stream per jendela sampel (dipanggil dari thread grabber).
+
+    on_frame(now, pos_msec): interval kedatangan (jitter = standar deviasi), dan jika timestamp container
+    tersedia: frame drop (lompatan timestamp) serta umur frame = keterlambatan relatif terhadap frame
+    paling "segar" sejak connect (jam kamera tidak diketahui, jadi acuan = lag minimum yang teramati).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._reset_window()
+        self._reset_media()
+
+    def _reset_window(self):
+        self._frames = 0
+        self._failures = 0
+        self._dropped = 0
+        self._n_int = 0
+        self._sum_int = 0.0
+        self._sumsq_int = 0.0
+        self._max_int = 0.0
+        self._n_age = 0
+        self._sum_age = 0.0
+        self._max_age = 0.0
+
+    def _reset_media(self):
+        self._last_arrival: Optional[float] = None
+        self._last_pos: Optional[float] = None
+        self._min_lag: Optional[float] = None
+        self._media_interval: Optional[float] = None  # interval nominal dari timestamp container (EMA)
+
+    def on_frame(self, now: float, pos_msec: Optional[float] = None):
+        with self._lock:
+            self._frames += 1
+            if self._last_arrival is not None:
+                dt = now - self._last_arrival
+                self._n_int += 1
+                self._sum_int += dt
+                self._sumsq_int += dt * dt
+                self._max_int = max(self._max_int, dt)
+            self._last_arrival = now
+            if not pos_msec or pos_msec <= 0:
+                return
+            pos = pos_msec / 1000.0
+            if self._last_pos is not None and pos > self._last_pos:
+                step = pos - self._last_pos
+                if self._media_interval is None:
+                    self._media_interval = step
+                elif step <= DROP_GAP_FACTOR * self._media_interval:
+                    self._media_interval += 0.05 * (step - self._media_interval)
+                else:
+                    self._dropped += max(0, int(round(step / self._media_interval)) - 1)
+            elif self._last_pos is not None and pos < self._last_pos:
+                self._min_lag = None  # timestamp mulai ulang (stream baru / wrap)
+            self._last_pos = pos
+            lag = now - pos
+            if self._min_lag is None or lag < self._min_lag:
+                self._min_lag = lag
+            age = lag - self._min_lag
+            self._n_age += 1
+            self._sum_age += age
+            self._max_age = max(self._max_age, age)
+
+    def on_failure(self):
+        with self._lock:
+            self._failures += 1
+
+    def on_reconnect(self):
+        """Koneksi baru: timestamp container & interval kedatangan mulai dari nol."""
+        with self._lock:
+            self._reset_media()
+
+    def sample(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Statistik jendela sejak sampel sebelumnya, lalu jendela direset."""
+        now = now or time.time()
+        with self._lock:
+            elapsed = max(1e-6, now - self._window_start)
+            mean = self._sum_int / self._n_int if self._n_int else None
+            var = max(0.0, self._sumsq_int / self._n_int - mean * mean) if self._n_int else None
+            result = {
+                "frames": self._frames,
+                "decode_fps": round(self._frames / elapsed, 2),
+                "nominal_fps": round(1.0 / self._media_interval, 2) if self._media_interval else None,
+                "jitter_ms": round(math.sqrt(var) * 1000, 2) if var is not None else None,
+                "max_gap_ms": round(self._max_int * 1000, 1) if self._n_int else None,
+                "dropped": self._dropped,
+                "read_failures": self._failures,
+                "frame_age_ms": round(self._sum_age / self._n_age * 1000, 1) if self._n_age else None,
+                "max_frame_age_ms": round(self._max_age * 1000, 1) if self._n_age else None,
+            }
+            self._window_start = now
+            self._reset_window()
+            return result
+
+
+def _ts_text(value) -> str:
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat(timespec="microseconds")
+
+
+def _range_clause(start: DateLike, end: DateLike, camera: Optional[str] = None) -> Tuple[str, list]:
+    """WHERE untuk rentang (date = satu hari penuh, datetime = presisi waktu) + filter kamera."""
+    where, args = [], []
+    if camera:
+        where.append("camera = ?")
+        args.append(camera)
+    if start is not None:
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time())
+        where.append("timestamp >= ?")
+        args.append(_ts_text(start))
+    if end is not None:
+        if isinstance(end, datetime):
+            where.append("timestamp <= ?")
+        else:
+            end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+            where.append("timestamp < ?")
+        args.append(_ts_text(end))
+    return (" WHERE " + " AND ".join(where)) if where else "", args
+
+
+class StreamHealthStore:
+    """
+    Time series kualitas stream (satu koneksi per thread).
+
+    Args:
+        path: file database SQLite
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def write_samples(self, rows: List[Dict]):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                f"INSERT INTO stream_health ({', '.join(HEALTH_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(HEALTH_COLUMNS))})",
+                [tuple(_ts_text(r["timestamp"]) if c == "timestamp" else r.get(c) for c in HEALTH_COLUMNS)
+                 for r in rows],
+            )
+
+    def prune(self, keep_days: int = DEFAULT_KEEP_DAYS) -> int:
+        """Hapus sampel lebih tua dari keep_days; jumlah row terhapus."""
+        cutoff = _ts_text(datetime.now() - timedelta(days=keep_days))
+        return self._conn().execute("DELETE FROM stream_health WHERE timestamp < ?", (cutoff,)).rowcount
+
+    def cameras(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT camera FROM stream_health ORDER BY camera")]
+
+    def time_bounds(self, camera: Optional[str] = None) -> Optional[Tuple[datetime, datetime]]:
+        where, args = _range_clause(None, None, camera)
+        row = self._conn().execute(f"SELECT MIN(timestamp) AS lo, MAX(timestamp) AS hi FROM stream_health{where}",
+                                   args).fetchone()
+        if row["lo"] is None:
+            return None
+        return datetime.fromisoformat(row["lo"]), datetime.fromisoformat(row["hi"])
+
+    def read_range(self, start: DateLike = None, end: DateLike = None, camera: Optional[str] = None):
+        """DataFrame sampel di rentang (kolom HEALTH_COLUMNS, timestamp datetime), urut waktu."""
+        import pandas as pd
+        where, args = _range_clause(start, end, camera)
+        df = pd.read_sql_query(f"SELECT {', '.join(HEALTH_COLUMNS)} FROM stream_health{where} ORDER BY timestamp",
+                               self._conn(), params=args)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df
+
+    def summary(self, start: DateLike = None, end: DateLike = None) -> List[Dict]:
+        """
+        Ringkasan per kamera: uptime (% sampel connected dengan frame), FPS, jitter, drop, reconnect,
+        bitrate rata-rata dan estimasi volume data per hari (sizing bandwidth per lokasi).
+        """
+        where, args = _range_clause(start, end)
+        rows = self._conn().execute(f"""
+            SELECT camera, COUNT(*) AS samples,
+                   100.0 * SUM(state = 'connected' AND frames > 0) / COUNT(*) AS uptime_pct,
+                   AVG(decode_fps) AS mean_fps, MIN(decode_fps) AS min_fps,
+                   AVG(jitter_ms) AS mean_jitter_ms, MAX(jitter_ms) AS max_jitter_ms,
+                   SUM(dropped) AS dropped, SUM(frames) AS frames, SUM(reconnects) AS reconnects,
+                   AVG(frame_age_ms) AS mean_frame_age_ms, MAX(max_frame_age_ms) AS max_frame_age_ms,
+                   AVG(CASE WHEN bitrate_kbps > 0 THEN bitrate_kbps END) AS mean_bitrate_kbps,
+                   MAX(width) AS width, MAX(height) AS height
+            FROM stream_health{where} GROUP BY camera ORDER BY camera""", args).fetchall()
+        result = []
+        for r in rows:
+            item = {k: (round(r[k], 2) if isinstance(r[k], float) else r[k]) for k in r.keys()}
+            total = (item["frames"] or 0) + (item["dropped"] or 0)
+            item["drop_pct"] = round(100.0 * (item["dropped"] or 0) / total, 2) if total else None
+            kbps = item["mean_bitrate_kbps"]
+            item["gb_per_day"] = round(kbps * 86400 / 8 / 1e6, 2) if kbps else None
+            result.append(item)
+        return result
+
+
+_stores: Dict[str, StreamHealthStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_health_store(path: str) -> StreamHealthStore:
+    """Store singleton per path (dipakai ulang lintas rerun Streamlit)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = StreamHealthStore(path)
+            _stores[key] = store
+        return store
+
+
+def build_sample(capture, camera: str, last_reconnects: int = 0) -> Dict[str, Any]:
+    """Satu row: StreamStats jendela ini + health() supervisor + info stream (resolusi, bitrate)."""
+    health = capture.health()
+    row = capture.stats.sample()
+    info = capture.stream_info()  # di-cache thread grabber: jangan capture.get() selagi grabber di read()
+    bitrate = info.get("bitrate_kbps") or None
+    row.update({
+        "timestamp": datetime.now(),
+        "camera": camera,
+        "state": health["state"],
+        "reconnects": max(0, health["reconnects"] - last_reconnects),
+        "outage_sec": health["outage_sec"],
+        "since_last_frame_ms": None if health["frame_age_sec"] is None else round(health["frame_age_sec"] * 1000, 1),
+        "width": int(info.get("width") or 0) or None,
+        "height": int(info.get("height") or 0) or None,
+        "bitrate_kbps": round(bitrate, 1) if bitrate and bitrate > 0 else None,
+    })
+    if row["nominal_fps"] is None:
+        fps = info.get("fps")
+        row["nominal_fps"] = round(fps, 2) if fps and 0 < fps < 1000 else None
+    return row
+
+
+class HealthRecorder:
+    """
+    Thread pengambil sampel untuk satu SharedCapture; berhenti sendiri setelah capture di-release
+    (sampel terakhir tetap ditulis).
+
+    Args:
+        capture: SharedCapture (mode live)
+        store: StreamHealthStore
+        camera: nama kamera / lokasi (kunci time series)
+        interval_sec: jarak antar sampel
+        keep_days: sampel lebih tua dihapus (dicek sekali per hari)
+    """
+
+    def __init__(self, capture, store: StreamHealthStore, camera: str,
+                 interval_sec: float = DEFAULT_SAMPLE_INTERVAL_SEC, keep_days: int = DEFAULT_KEEP_DAYS):
+        self.capture = capture
+        self.store = store
+        self.camera = camera
+        self.interval_sec = interval_sec
+        self.keep_days = keep_days
+        self.samples = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._reconnects = capture.health()["reconnects"]
+        self._next_prune = 0.0
+        self._thread = threading.Thread(target=self._run, name="stream-health", daemon=True)
+
+    def start(self) -> "HealthRecorder":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def record_once(self):
+        row = build_sample(self.capture, self.camera, self._reconnects)
+        self._reconnects += row["reconnects"]
+        self.store.write_samples([row])
+        self.samples += 1
+        if self.keep_days and time.time() >= self._next_prune:
+            self.store.prune(self.keep_days)
+            self._next_prune = time.time() + 86400
+        return row
+
+    def _run(self):
+        while True:
+            stopped = self._stop.wait(self.interval_sec)
+            closed = self.capture.health()["state"] == "closed"
+            try:
+                self.record_once()
+                self.last_error = None
+            except Exception as e:  # disk penuh / DB terkunci: coba lagi di sampel berikutnya
+                self.last_error = f"{type(e).__name__}: {e}"
+            if stopped or closed:
+                return
+
+
+_recorders: Dict[str, HealthRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def ensure_health_recorder(capture, path: str, camera: str, interval_sec: float = DEFAULT_SAMPLE_INTERVAL_SEC,
+                           keep_days: int = DEFAULT_KEEP_DAYS, slot: str = "live") -> HealthRecorder:
+    """
+    Recorder untuk capture slot (aman dipanggil tiap rerun): capture sama -> recorder yang berjalan
+    dipakai (interval / nama kamera dari config terbaru); capture baru -> recorder lama dihentikan.
+    """
+    with _recorders_lock:
+        current = _recorders.get(slot)
+        if current is not None and current.capture is capture and current.is_alive() \
+                and current.store.path == path:
+            current.interval_sec, current.camera, current.keep_days = interval_sec, camera, keep_days
+            return current
+        if current is not None:
+            current.stop()
+        recorder = HealthRecorder(capture, get_health_store(path), camera, interval_sec, keep_days).start()
+        _recorders[slot] = recorder
+        return recorder
+
+
+def detection_gaps(timestamps, min_gap_sec: float) -> List[Dict]:
+    """Rentang tanpa row deteksi lebih lama dari min_gap_sec: list dict start, end, gap_sec."""
+    import pandas as pd
+    ts = pd.Series(pd.to_datetime(timestamps)).dropna().sort_values().reset_index(drop=True)
+    if len(ts) < 2:
+        return []
+    delta = ts.diff().dt.total_seconds()
+    idx = delta.index[delta > min_gap_sec]
+    return [{"start": ts[i - 1].to_pydatetime(), "end": ts[i].to_pydatetime(), "gap_sec": round(delta[i], 1)}
+            for i in idx]
+
+
+def correlate_gaps(gaps: Sequence[Dict], health_df, interval_sec: float = DEFAULT_SAMPLE_INTERVAL_SEC,
+                   low_fps_ratio: float = 0.5) -> List[Dict]:
+    """
+    Pasangkan tiap gap deteksi dengan sampel stream yang tumpang tindih (sampel merangkum interval_sec
+    sebelum timestamp-nya). Sebab: "outage" (reconnect / tanpa frame), "degradasi" (FPS < low_fps_ratio x
+    median, atau ada drop), "bukan jaringan" (stream sehat: loop deteksi / proses berhenti),
+    "tanpa data stream" (recorder tidak berjalan).
+    """
+    if health_df is None or health_df.empty:
+        return [dict(g, cause="tanpa data stream", samples=0) for g in gaps]
+    import pandas as pd
+    median_fps = health_df.loc[health_df["frames"] > 0, "decode_fps"].median()
+    result = []
+    for g in gaps:
+        window = health_df[(health_df["timestamp"] > pd.Timestamp(g["start"]))
+                           & (health_df["timestamp"] <= pd.Timestamp(g["end"]) + pd.Timedelta(seconds=interval_sec))]
+        if window.empty:
+            cause = "tanpa data stream"
+        elif ((window["state"] != "connected") | (window["frames"] == 0) | (window["reconnects"] > 0)).any():
+            cause = "outage"
+        elif (pd.notna(median_fps) and (window["decode_fps"] < low_fps_ratio * median_fps).any()) \
+                or (window["dropped"] > 0).any():
+            cause = "degradasi"
+        else:
+            cause = "bukan jaringan"
+        result.append(dict(g, cause=cause, samples=len(window),
+                           min_fps=None if window.empty else window["decode_fps"].min(),
+                           dropped=None if window.empty else int(window["dropped"].sum()),
+                           reconnects=None if window.empty else int(window["reconnects"].sum())))
+    return result
+
+
+def benchmark_collector(frames: int = 200000, fps: float = 25.0, drop_every: int = 50) -> Dict:
+    """
+    Overhead on_frame per frame (thread grabber) + akurasi deteksi drop dan jitter pada stream sintetis:
+    jitter kedatangan ±4 ms, satu frame hilang tiap drop_every frame, keterlambatan bertahap 0..500 ms.
+    """
+    import random
+    rng = random.Random(1)
+    stats = StreamStats()
+    interval = 1.0 / fps
+    t0 = time.time()
+    true_dropped = 0
+    pos, now = 0.0, t0
+    start = time.perf_counter()
+    for i in range(frames):
+        pos += interval
+        if i and i % drop_every == 0:
+            pos += interval  # frame hilang di jaringan: timestamp container melompat
+            true_dropped += 1
+        now = t0 + pos + 0.5 * i / frames + rng.uniform(-0.004, 0.004)
+        stats.on_frame(now, pos * 1000)
+    per_frame_us = (time.perf_counter() - start) / frames * 1e6
+    sample = stats.sample(now)
+    return {"frames": frames, "per_frame_us": round(per_frame_us, 2), "true_dropped": true_dropped,
+            "detected_dropped": sample["dropped"], "nominal_fps": sample["nominal_fps"],
+            "jitter_ms": sample["jitter_ms"], "max_frame_age_ms": sample["max_frame_age_ms"]}
+
+
+if __name__ == "__main__":
+    print("🔍 Benchmark kolektor stream health...")
+    print(benchmark_collector())